@@ -1,98 +1,203 @@
-from flask import Flask, render_template, request, jsonify
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager
-from flask_bcrypt import Bcrypt
-from datetime import timedelta
-import os
-from dotenv import load_dotenv
-from models import db, User, MonitorPoint, FireData, FireThreshold
-
-# 加载环境变量
-load_dotenv()
-
-# 初始化Flask应用
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev_secret_key')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///forest_fire.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt_secret_key')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-# 配置JWT错误处理
-app.config['JWT_ERROR_MESSAGE_KEY'] = 'message'
-app.config['PROPAGATE_EXCEPTIONS'] = True  # 允许异常传播
-
-# 跨域支持
-CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
-
-# 初始化数据库
-db.init_app(app)
-
-# 初始化Bcrypt
-bcrypt = Bcrypt(app)
-
-# 初始化JWT
-jwt = JWTManager(app)
-
-# 主页路由
-@app.route('/')
-def index():
-    return render_template('index.html')
-
-# 错误处理
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'message': 'Not found'}), 404
-
-@app.errorhandler(500)
-def server_error(error):
-    return jsonify({'message': 'Server error'}), 500
-
-# JWT错误处理
-@jwt.unauthorized_loader
-def unauthorized_callback(callback):
-    return jsonify({'message': '未授权访问，请先登录'}), 401
-
-@jwt.invalid_token_loader
-def invalid_token_callback(callback):
-    return jsonify({'message': '无效的认证令牌'}), 401
-
-@jwt.expired_token_loader
-def expired_token_callback(jwt_header, jwt_payload):
-    return jsonify({'message': '认证令牌已过期，请重新登录'}), 401
-
-# 导入并注册蓝图
-def register_blueprints(app):
-    from routes.auth_routes import auth_routes
-    from routes.user_routes import user_routes
-    from routes.monitor_routes import monitor_routes
-    from routes.fire_routes import fire_routes
-    from routes.stat_routes import stat_routes
-    
-    app.register_blueprint(auth_routes)
-    app.register_blueprint(user_routes)
-    app.register_blueprint(monitor_routes)
-    app.register_blueprint(fire_routes)
-    app.register_blueprint(stat_routes)
-    
-    # 创建数据库表
-    with app.app_context():
-        db.create_all()
-        
-        # 检查是否已有用户，如果没有则创建默认管理员
-        if User.query.count() == 0:
-            admin_password = bcrypt.generate_password_hash('111').decode('utf-8')
-            admin_user = User(
-                username='admin',
-                password=admin_password,
-                email='admin@example.com',
-                role='admin'
-            )
-            db.session.add(admin_user)
-            db.session.commit()
-            print("创建默认管理员账号: admin/111")
-
-if __name__ == '__main__':
-    # 注册蓝图
-    register_blueprints(app)
-    # 运行应用
+from flask import Flask, render_template, request, jsonify
+from flask_cors import CORS
+from datetime import timedelta
+import os
+from dotenv import load_dotenv
+from models import db, User, MonitorPoint, FireData, FireThreshold
+from extensions import bcrypt, jwt
+import db_config
+import metrics
+import sql_profiler
+import password_hashing
+import conditional
+import json_support
+import compression
+from migrations import upgrade_database
+from ingest import parse_timestamp
+import exporter
+import archive
+import click
+import sys
+
+# 加载环境变量
+load_dotenv()
+
+def create_app(config=None, instance_path=None):
+    """
+    创建并配置Flask应用
+
+    每个 worker 进程调用一次，只做配置、扩展初始化和蓝图注册，不访问数据库；
+    创建表、数据迁移和默认管理员由 flask init-db 一次性完成
+
+    参数:
+    - config: 覆盖默认配置的字典 (可选)
+    - instance_path: 实例目录 (可选)，默认为项目下的 instance 目录；
+      缓存版本号、归档文件和监控指标都保存在实例目录中
+    """
+    app = Flask(__name__, instance_path=instance_path)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev_secret_key')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///forest_fire.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt_secret_key')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    # bcrypt 哈希强度，修改后用户下次登录时按新强度重新哈希 (见 password_hashing.py)
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # 配置JWT错误处理
+    app.config['JWT_ERROR_MESSAGE_KEY'] = 'message'
+    app.config['PROPAGATE_EXCEPTIONS'] = True  # 允许异常传播
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.getenv('ARCHIVE_AFTER_DAYS', 90))  # 监测记录在数据库中保留的天数
+    # 监测数据写入模式: sync 同步提交，async 放入队列由后台线程批量写入 (见 write_behind.py)
+    app.config['INGEST_MODE'] = os.getenv('INGEST_MODE', 'sync')
+    app.config['WRITE_BEHIND_QUEUE_SIZE'] = int(os.getenv('WRITE_BEHIND_QUEUE_SIZE', 50000))
+    app.config['WRITE_BEHIND_BATCH_SIZE'] = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 500))
+    app.config['WRITE_BEHIND_FLUSH_INTERVAL_MS'] = int(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL_MS', 200))
+    app.config['WRITE_BEHIND_ENQUEUE_TIMEOUT_MS'] = int(os.getenv('WRITE_BEHIND_ENQUEUE_TIMEOUT_MS', 100))
+    if config:
+        app.config.update(config)
+
+    # 跨域支持
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
+
+    # 初始化数据库 (按数据库类型设置连接池和 SQLite PRAGMA)、Bcrypt和JWT
+    db_config.init_app(app)
+    db.init_app(app)
+    with app.app_context():
+        # 只创建引擎并注册连接初始化和 SQL 计时，不连接数据库
+        db_config.configure_engine(db.engine)
+        metrics.instrument_engine(db.engine)
+        # 按配置开启请求级 SQL 分析 (SQL_PROFILER)
+        sql_profiler.init_app(app, db.engine)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    # 登录、注册等接口的密码哈希在有界进程池中计算
+    password_hashing.init_app(app)
+    # 读多写少接口的 ETag/304
+    conditional.init_app(app)
+    # orjson 编码 JSON，按 Accept-Encoding 压缩响应
+    json_support.init_app(app)
+    compression.init_app(app)
+
+    # 主页路由
+    @app.route('/')
+    def index():
+        return render_template('index.html')
+
+    # 错误处理
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({'message': 'Not found'}), 404
+
+    @app.errorhandler(500)
+    def server_error(error):
+        return jsonify({'message': 'Server error'}), 500
+
+    # 请求计时和 /metrics
+    metrics.init_app(app)
+
+    register_commands(app)
+    register_blueprints(app)
+    return app
+
+# JWT错误处理
+@jwt.unauthorized_loader
+def unauthorized_callback(callback):
+    return jsonify({'message': '未授权访问，请先登录'}), 401
+
+@jwt.invalid_token_loader
+def invalid_token_callback(callback):
+    return jsonify({'message': '无效的认证令牌'}), 401
+
+@jwt.expired_token_loader
+def expired_token_callback(jwt_header, jwt_payload):
+    return jsonify({'message': '认证令牌已过期，请重新登录'}), 401
+
+def setup_database():
+    """创建数据库表，补建缺失的索引、执行未完成的数据迁移，并在没有用户时创建默认管理员"""
+    upgrade_database()
+
+    # 检查是否已有用户，如果没有则创建默认管理员
+    if User.query.count() == 0:
+        admin_password = bcrypt.generate_password_hash('111').decode('utf-8')
+        admin_user = User(
+            username='admin',
+            password=admin_password,
+            email='admin@example.com',
+            role='admin'
+        )
+        db.session.add(admin_user)
+        db.session.commit()
+        print("创建默认管理员账号: admin/111")
+
+def register_commands(app):
+    # 命令行: flask init-db (部署时执行一次，启动 worker 之前)
+    @app.cli.command('init-db')
+    def init_db_command():
+        """初始化数据库: 创建表和索引、执行数据迁移、创建默认管理员"""
+        setup_database()
+        print("数据库初始化完成")
+
+    # 命令行: flask upgrade-db
+    @app.cli.command('upgrade-db')
+    def upgrade_db_command():
+        """升级数据库结构(创建缺失的表和索引)"""
+        upgrade_database()
+        print("数据库升级完成")
+
+    # 命令行: flask export-data records --format csv --since 2024-01-01 --output records.csv
+    @app.cli.command('export-data')
+    @click.argument('table', type=click.Choice(list(exporter.EXPORT_TABLES)))
+    @click.option('--format', 'fmt', type=click.Choice(list(exporter.EXPORT_FORMATS)), default='csv', help='导出格式')
+    @click.option('--since', type=parse_timestamp, help='起始时间(含)')
+    @click.option('--until', type=parse_timestamp, help='结束时间(不含)')
+    @click.option('--point', 'point_ids', type=int, multiple=True, help='监测点ID，可指定多个')
+    @click.option('--output', type=click.Path(dir_okay=False), help='输出文件，默认输出到标准输出')
+    def export_data_command(table, fmt, since, until, point_ids, output):
+        """流式导出监测记录(records)或火灾数据(fire-data)"""
+        try:
+            chunks = exporter.export(table, fmt, since, until, list(point_ids))
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    
+        out = open(output, 'wb') if output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if output:
+                out.close()
+
+    # 命令行: flask archive-records --days 90
+    @app.cli.command('archive-records')
+    @click.option('--days', type=int, help='数据库中保留的天数，默认使用 ARCHIVE_AFTER_DAYS 配置')
+    def archive_records_command(days):
+        """把早于保留期限的监测记录移入列式归档文件"""
+        if days is None:
+            days = app.config['ARCHIVE_AFTER_DAYS']
+        archived = archive.archive_records(days)
+        print(f"归档完成: {len(archived)} 个监测点，共 {sum(archived.values())} 条记录")
+
+# 导入并注册蓝图
+def register_blueprints(app):
+    from routes.auth_routes import auth_routes
+    from routes.user_routes import user_routes
+    from routes.monitor_routes import monitor_routes
+    from routes.fire_routes import fire_routes
+    from routes.stat_routes import stat_routes
+    from routes.stream_routes import stream_routes
+    from routes.export_routes import export_routes
+    
+    app.register_blueprint(auth_routes)
+    app.register_blueprint(user_routes)
+    app.register_blueprint(monitor_routes)
+    app.register_blueprint(fire_routes)
+    app.register_blueprint(stat_routes)
+    app.register_blueprint(stream_routes)
+    app.register_blueprint(export_routes)
+
+if __name__ == '__main__':
+    app = create_app()
+    # 开发服务器为单进程，启动前直接初始化数据库
+    with app.app_context():
+        setup_database()
+    # 运行应用
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+监测记录的列式归档
+
+分钟级的监测记录会让 monitor_record 表持续膨胀，拖慢写入和最新数据查询。
+归档任务把早于保留期限的记录按 "监测点/月份" 写入 NumPy .npy 文件
+(instance/archive/monitor_record/<监测点ID>/<YYYY-MM>.npy，每个文件是按时间排序的结构化数组)，
+然后从数据库中删除这些记录，数据库中只保留近期数据。
+
+读取历史数据时 read_history() 以内存映射方式打开相关月份的归档文件，按时间二分查找截取范围，
+再合并数据库中的记录，调用方无需关心数据位于哪一层。
+
+保留期限按天对齐，因此小时/天聚合表的每个时间桶要么全部在归档中，要么全部在数据库中。
+聚合表和最新数据快照在归档时保持不变。
+
+归档后早于截止时间的记录只在归档文件中，最近一次归档的截止时间记录在归档目录下的
+archived_before 文件中 (见 archived_before())，只查询数据库的接口据此告知客户端数据范围。
+
+用法:
+    FLASK_APP=app.py flask archive-records --days 90
+"""
+import os
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from models import MonitorRecord, db
+
+# 归档文件所在的子目录 (位于实例目录下)
+ARCHIVE_DIR = os.path.join('archive', 'monitor_record')
+
+# 归档文件的结构化数组格式
+ARCHIVE_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('timestamp', '<M8[us]'),
+    ('wind_speed', '<f8'),
+    ('temperature', '<f8'),
+    ('humidity', '<f8')
+])
+
+# 归档时每次从数据库读取的行数
+CHUNK_SIZE = 5000
+
+# 删除已归档记录时每条 DELETE 语句携带的ID个数
+DELETE_CHUNK_SIZE = 500
+
+# 记录归档截止时间的文件 (位于归档目录下)
+CUTOFF_FILE = 'archived_before'
+
+def _point_dir(point_id):
+    return os.path.join(current_app.instance_path, ARCHIVE_DIR, str(int(point_id)))
+
+def _month_path(point_id, year, month):
+    return os.path.join(_point_dir(point_id), f'{year:04d}-{month:02d}.npy')
+
+def _month_start(year, month):
+    return datetime(year, month, 1)
+
+def _next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+def archive_cutoff(days):
+    """保留期限对应的归档截止时间 (按天对齐): 早于该时间的记录会被归档"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _cutoff_path():
+    return os.path.join(current_app.instance_path, ARCHIVE_DIR, CUTOFF_FILE)
+
+def archived_before():
+    """早于该时间的监测记录已移入归档文件、不在数据库中；从未归档过时返回 None"""
+    try:
+        with open(_cutoff_path(), encoding='utf-8') as f:
+            return datetime.fromisoformat(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _save_cutoff(cutoff):
+    """记录归档截止时间 (只会后移: 改用更长的保留期限时，更早的记录仍在归档中)"""
+    previous = archived_before()
+    if previous and previous >= cutoff:
+        return
+    path = _cutoff_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(cutoff.isoformat())
+    os.replace(temp_path, path)
+
+def _write_month(point_id, year, month, rows):
+    """
+    把一个监测点一个月的记录合并进归档文件
+
+    已有文件时与其中的数据合并并去除完全相同的行 (上次归档在删除数据库记录前中断时会重复)，
+    写入临时文件后原子替换。不按ID去重: 旧版 SQLite 表和重启后的 MySQL 可能复用已删除的ID
+    """
+    data = np.array(rows, dtype=ARCHIVE_DTYPE)
+    path = _month_path(point_id, year, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if os.path.exists(path):
+        data = np.unique(np.concatenate([np.load(path), data]))
+
+    data = data[np.lexsort((data['id'], data['timestamp']))]
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        np.save(f, data)
+    os.replace(temp_path, path)
+
+def _archive_point(point_id, cutoff):
+    """归档一个监测点早于截止时间的记录，返回已归档的记录ID列表"""
+    query = db.session.query(
+        MonitorRecord.id,
+        MonitorRecord.timestamp,
+        MonitorRecord.wind_speed,
+        MonitorRecord.temperature,
+        MonitorRecord.humidity
+    ).filter(
+        MonitorRecord.monitor_point_id == point_id,
+        MonitorRecord.timestamp < cutoff
+    ).order_by(MonitorRecord.timestamp, MonitorRecord.id)
+
+    # 按时间顺序逐块读取，每凑满一个月写入一个文件，内存中最多保留一个月的数据
+    result = db.session.execute(query.statement.execution_options(stream_results=True))
+    current_month = None
+    rows = []
+    archived_ids = []
+    try:
+        for chunk in result.partitions(CHUNK_SIZE):
+            for row in chunk:
+                month = (row.timestamp.year, row.timestamp.month)
+                if month != current_month:
+                    if rows:
+                        _write_month(point_id, *current_month, rows)
+                    current_month = month
+                    rows = []
+                rows.append(tuple(row))
+                archived_ids.append(row.id)
+    finally:
+        result.close()
+
+    if rows:
+        _write_month(point_id, *current_month, rows)
+    return archived_ids
+
+def archive_records(days):
+    """
+    归档所有监测点早于保留期限的监测记录，并从数据库中删除
+
+    先写归档文件，再按ID删除已写入归档的记录 (归档期间新写入的旧时间记录留到下次归档)，
+    每个监测点单独提交；中途失败时重新执行即可
+
+    参数:
+    - days: 数据库中保留的天数
+
+    返回:
+    - archived: {监测点ID: 归档的记录数}
+    """
+    cutoff = archive_cutoff(days)
+    point_ids = [point_id for (point_id,) in db.session.query(
+        MonitorRecord.monitor_point_id
+    ).filter(
+        MonitorRecord.timestamp < cutoff
+    ).distinct()]
+
+    archived = {}
+    for point_id in point_ids:
+        archived_ids = _archive_point(point_id, cutoff)
+        for start in range(0, len(archived_ids), DELETE_CHUNK_SIZE):
+            chunk = archived_ids[start:start + DELETE_CHUNK_SIZE]
+            MonitorRecord.query.filter(MonitorRecord.id.in_(chunk)).delete(synchronize_session=False)
+        db.session.commit()
+        archived[point_id] = len(archived_ids)
+
+    if archived:
+        _save_cutoff(cutoff)
+    return archived
+
+def _archived_months(point_id, since, until):
+    """列出监测点在时间范围内的归档文件"""
+    directory = _point_dir(point_id)
+    if not os.path.isdir(directory):
+        return []
+
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.npy'):
+            continue
+        try:
+            year, month = (int(part) for part in name[:-4].split('-'))
+        except ValueError:
+            continue
+        if since and _month_start(*_next_month(year, month)) <= since:
+            continue
+        if until and _month_start(year, month) >= until:
+            continue
+        paths.append(os.path.join(directory, name))
+    return paths
+
+def _read_month(path, since=None, until=None):
+    """以内存映射方式打开一个归档文件，按时间二分查找截取 [since, until) 范围"""
+    data = np.load(path, mmap_mode='r')
+    timestamps = data['timestamp']
+    start = np.searchsorted(timestamps, np.datetime64(since, 'us')) if since else 0
+    end = np.searchsorted(timestamps, np.datetime64(until, 'us')) if until else len(data)
+    return np.array(data[start:end])
+
+def has_archive(point_id):
+    """监测点是否有归档数据"""
+    return bool(_archived_months(point_id, None, None))
+
+def read_archive(point_id, since=None, until=None):
+    """
+    读取监测点在时间范围 [since, until) 内的归档数据
+
+    返回:
+    - 按时间排序的结构化数组 (ARCHIVE_DTYPE)
+    """
+    parts = [_read_month(path, since, until) for path in _archived_months(point_id, since, until)]
+    if not parts:
+        return np.empty(0, dtype=ARCHIVE_DTYPE)
+    return np.concatenate(parts)
+
+def read_live(point_id, since=None, until=None):
+    """读取数据库中监测点在时间范围内的记录，返回格式与 read_archive 相同"""
+    query = db.session.query(
+        MonitorRecord.id,
+        MonitorRecord.timestamp,
+        MonitorRecord.wind_speed,
+        MonitorRecord.temperature,
+        MonitorRecord.humidity
+    ).filter(MonitorRecord.monitor_point_id == point_id)
+    if since:
+        query = query.filter(MonitorRecord.timestamp >= since)
+    if until:
+        query = query.filter(MonitorRecord.timestamp < until)
+
+    rows = [tuple(row) for row in query.order_by(MonitorRecord.timestamp, MonitorRecord.id)]
+    return np.array(rows, dtype=ARCHIVE_DTYPE)
+
+def read_history(point_id, since=None, until=None):
+    """
+    读取监测点在时间范围 [since, until) 内的全部历史数据 (归档 + 数据库)
+
+    返回:
+    - 按 (timestamp, id) 排序的结构化数组 (ARCHIVE_DTYPE)
+    """
+    archived = read_archive(point_id, since, until)
+    live = read_live(point_id, since, until)
+    if not len(archived):
+        return live
+    if not len(live):
+        return archived
+
+    # 归档之后才写入的旧时间记录会与归档数据交错
+    data = np.concatenate([archived, live])
+    if live['timestamp'][0] < archived['timestamp'][-1]:
+        data = data[np.lexsort((data['id'], data['timestamp']))]
+    return data
+
+def iter_archive_rows(point_ids=None, since=None, until=None):
+    """
+    按监测点、时间顺序分块读取归档数据 (用于导出)
+
+    返回:
+    - 生成器，每次产生 (id, monitor_point_id, timestamp, wind_speed, temperature, humidity) 元组列表
+    """
+    if not point_ids:
+        root = os.path.join(current_app.instance_path, ARCHIVE_DIR)
+        names = os.listdir(root) if os.path.isdir(root) else []
+        point_ids = sorted(int(name) for name in names if name.isdigit())
+
+    for point_id in point_ids:
+        for path in _archived_months(point_id, since, until):
+            data = _read_month(path, since, until)
+            for start in range(0, len(data), CHUNK_SIZE):
+                part = data[start:start + CHUNK_SIZE]
+                yield list(zip(
+                    part['id'].tolist(),
+                    [point_id] * len(part),
+                    part['timestamp'].tolist(),
+                    part['wind_speed'].tolist(),
+                    part['temperature'].tolist(),
+                    part['humidity'].tolist()
+                ))
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+性能基准测试
+
+测量预测模型 (FirePredictor) 和主要接口在不同数据规模下的耗时，结果写入JSON文件，
+便于比较不同版本之间热点路径变快还是变慢。
+
+用法 (在项目目录下执行):
+    python -m benchmarks.run
+    python -m benchmarks.run --quick
+    python -m benchmarks.run --compare benchmarks/results/上一次的结果.json
+
+每个数据集在临时目录中生成独立的 SQLite 数据库和实例目录，不会影响项目自身的数据库、缓存版本号和监控指标。
+"""
\ No newline at end of file
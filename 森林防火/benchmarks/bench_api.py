@@ -0,0 +1,60 @@
+"""
+接口基准测试
+
+使用 Flask 测试客户端在不同规模的数据集上请求主要接口，测量包括路由、查询、
+序列化在内的完整处理时间 (不含网络传输)。
+"""
+from benchmarks.datasets import DATASETS, build_app
+from benchmarks.timing import measure
+
+# 测试的接口: (名称, URL, 是否需要登录)
+ENDPOINTS = [
+    ('latest', '/api/monitor/latest', False),
+    ('predict', '/api/fire/predict', False),
+    ('stats_summary', '/api/stats/summary', False),
+    ('records', '/api/monitor/records', True),
+    ('records_by_point', '/api/monitor/records?point_id=1', True),
+    ('fire_data', '/api/fire/data', True)
+]
+
+def _login(client):
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': '111'})
+    return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+
+def run(datasets=tuple(DATASETS), repeat=20, data_dir='.'):
+    """
+    执行接口基准测试
+
+    参数:
+    - datasets: 数据集名称列表 (见 DATASETS)
+    - repeat: 每个接口的计时次数
+    - data_dir: 数据库目录
+
+    返回:
+    - 结果字典列表
+    """
+    results = []
+    for dataset in datasets:
+        spec = DATASETS[dataset]
+        app = build_app(dataset, data_dir, **spec)
+        client = app.test_client()
+        headers = _login(client)
+
+        for name, url, auth in ENDPOINTS:
+            def request():
+                response = client.get(url, headers=headers if auth else None)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} 返回 {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+            result = {
+                'group': 'api',
+                'name': name,
+                'url': url,
+                'dataset': dataset,
+                'records': spec['points'] * spec['readings_per_point']
+            }
+            result.update(measure(request, repeat))
+            results.append(result)
+            print(f"  {dataset} GET {url}: {result['median_ms']:.2f} ms")
+
+    return results
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+预测模型基准测试
+
+- predict_risk / predict_fire_area: 逐条调用 (接口中单条预测的用法)，N 条记录计一次时间
+- predict_batch: 同样 N 条记录的向量化计算，作为逐条调用的对照
+- analyze_monitor_data: 数据库中有 N 个监测点 (各有最新数据) 时分析全部监测点，包含查询最新数据快照的时间
+"""
+import numpy as np
+from fire_prediction import FirePredictor
+from benchmarks.datasets import build_app
+from benchmarks.timing import measure
+
+# 默认测试的记录数
+SIZES = (10, 1000, 100000)
+
+# 与默认阈值设置相同，逐条预测时不查询数据库
+THRESHOLDS = {
+    'wind_speed_threshold': 10.0,
+    'temperature_threshold': 30.0,
+    'humidity_threshold': 30.0
+}
+
+def _inputs(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(0.0, 20.0, size).round(1).tolist(),
+        rng.uniform(5.0, 40.0, size).round(1).tolist(),
+        rng.uniform(10.0, 90.0, size).round(1).tolist()
+    )
+
+def _result(name, size, stats):
+    result = {'group': 'predictor', 'name': name, 'size': size}
+    result.update(stats)
+    result['per_record_us'] = round(stats['median_ms'] * 1000 / size, 4)
+    return result
+
+def run(sizes=SIZES, repeat=5, data_dir=None):
+    """
+    执行预测模型基准测试
+
+    参数:
+    - sizes: 记录数列表
+    - repeat: 每项的计时次数
+    - data_dir: analyze_monitor_data 使用的数据库目录
+
+    返回:
+    - 结果字典列表
+    """
+    results = []
+    for size in sizes:
+        wind_speed, temperature, humidity = _inputs(size)
+        risk_levels = [FirePredictor.predict_risk(w, t, h, THRESHOLDS)
+                       for w, t, h in zip(wind_speed, temperature, humidity)]
+
+        def predict_risk():
+            for w, t, h in zip(wind_speed, temperature, humidity):
+                FirePredictor.predict_risk(w, t, h, THRESHOLDS)
+
+        def predict_fire_area():
+            for w, t, h, level in zip(wind_speed, temperature, humidity, risk_levels):
+                FirePredictor.predict_fire_area(w, t, h, level)
+
+        def predict_batch():
+            FirePredictor.predict_batch(wind_speed, temperature, humidity, THRESHOLDS)
+
+        for name, func in (('predict_risk', predict_risk),
+                           ('predict_fire_area', predict_fire_area),
+                           ('predict_batch', predict_batch)):
+            results.append(_result(name, size, measure(func, repeat)))
+            print(f"  {name} × {size}: {results[-1]['median_ms']:.2f} ms")
+
+        if data_dir is not None:
+            app = build_app(f'points-{size}', data_dir, points=size)
+            with app.app_context():
+                stats = measure(FirePredictor.analyze_monitor_data, repeat)
+            results.append(_result('analyze_monitor_data', size, stats))
+            print(f"  analyze_monitor_data × {size}: {stats['median_ms']:.2f} ms")
+
+    return results
\ No newline at end of file
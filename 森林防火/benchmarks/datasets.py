@@ -0,0 +1,108 @@
+"""
+基准测试数据集
+
+监测点和监测记录使用 generate_data 按气象规律生成，火灾数据在监测点附近随机生成。
+"""
+import os
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import inspect
+from app import create_app, setup_database
+from models import db, MonitorPoint, FireData
+from generate_data import generate
+import fire_stats
+
+# 接口基准测试使用的数据集: 监测点数、每个监测点的监测记录数、火灾数据条数
+DATASETS = {
+    'small': {'points': 10, 'readings_per_point': 100, 'fire_data': 100},
+    'medium': {'points': 100, 'readings_per_point': 1000, 'fire_data': 10000},
+    'large': {'points': 1000, 'readings_per_point': 1000, 'fire_data': 100000}
+}
+
+# 数据覆盖的时间范围 (截止到生成时)
+HISTORY_DAYS = 30
+
+# 每次 executemany 插入的行数
+INSERT_CHUNK_SIZE = 10000
+
+RISK_LEVELS = ['low', 'medium', 'high', 'extreme']
+
+def _insert(model, rows):
+    table = model.__table__
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(table.insert(), rows[start:start + INSERT_CHUNK_SIZE])
+
+def _insert_fire_data(rng, count, latitudes, longitudes, end):
+    if count <= 0:
+        return
+    point_index = rng.integers(0, len(latitudes), count).tolist()
+    seconds = rng.uniform(0, HISTORY_DAYS * 86400, count).tolist()
+    risk_index = rng.integers(0, len(RISK_LEVELS), count).tolist()
+    wind_speed = rng.uniform(0.0, 20.0, count).round(1).tolist()
+    temperature = rng.uniform(5.0, 40.0, count).round(1).tolist()
+    humidity = rng.uniform(10.0, 90.0, count).round(1).tolist()
+    area_factor = rng.uniform(0.5, 2.0, count).tolist()
+    _insert(FireData, [
+        {
+            'monitor_point_id': point_index[i] + 1,
+            'wind_speed': wind_speed[i],
+            'temperature': temperature[i],
+            'humidity': humidity[i],
+            'risk_level': RISK_LEVELS[risk_index[i]],
+            'predicted_area': round(risk_index[i] * area_factor[i], 2),
+            'timestamp': end - timedelta(seconds=seconds[i]),
+            'latitude': latitudes[point_index[i]],
+            'longitude': longitudes[point_index[i]]
+        }
+        for i in range(count)
+    ])
+
+def seed(points, readings_per_point, fire_data, random_seed=0):
+    """
+    向当前应用的空数据库写入基准数据 (需在应用上下文中调用)
+
+    监测点和监测记录由 generate_data 生成 (同时写入最新数据快照和聚合表)，
+    火灾数据直接插入后重建每日统计
+    """
+    # 创建表、索引和默认管理员
+    setup_database()
+
+    end = datetime.utcnow().replace(microsecond=0)
+    interval = timedelta(days=HISTORY_DAYS) / max(readings_per_point, 1)
+    generate(points, readings_per_point, interval, end, random_seed, defer_indexes=True)
+
+    rng = np.random.default_rng(random_seed)
+    locations = db.session.query(MonitorPoint.latitude, MonitorPoint.longitude).order_by(MonitorPoint.id).all()
+    _insert_fire_data(rng, fire_data, [lat for lat, _ in locations], [lon for _, lon in locations], end)
+    fire_stats.rebuild_all()
+    db.session.commit()
+
+def build_app(name, base_dir, points, readings_per_point=1, fire_data=0):
+    """
+    创建使用独立数据库和实例目录的应用，数据库不存在时生成数据
+
+    参数:
+    - name: 数据集名称，数据保存在 base_dir/name 下；目录中已有数据库时直接复用
+    - base_dir: 数据目录
+    - points / readings_per_point / fire_data: 数据规模
+
+    返回:
+    - Flask 应用
+    """
+    directory = os.path.abspath(os.path.join(base_dir, name))
+    db_path = os.path.join(directory, 'benchmark.db')
+    os.makedirs(directory, exist_ok=True)
+
+    app = create_app(config={
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'INGEST_MODE': 'sync',
+        'SQL_PROFILER': False
+    }, instance_path=os.path.join(directory, 'instance'))
+
+    with app.app_context():
+        if os.path.exists(db_path) and inspect(db.engine).has_table(MonitorPoint.__tablename__):
+            print(f"复用数据集 {name}: {db_path}")
+        else:
+            print(f"生成数据集 {name}: {points} 个监测点 × {readings_per_point} 条监测记录, {fire_data} 条火灾数据")
+            seed(points, readings_per_point, fire_data)
+    return app
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+运行基准测试并把结果写入JSON文件
+
+用法 (在项目目录下执行):
+    python -m benchmarks.run                        # 全部测试
+    python -m benchmarks.run --quick                # 只测小规模数据，用于快速检查
+    python -m benchmarks.run --only api --datasets small,medium
+    python -m benchmarks.run --data-dir /tmp/bench  # 保留并复用生成的数据库
+    python -m benchmarks.run --compare benchmarks/results/20240101-120000.json
+"""
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+import click
+import flask
+import numpy as np
+import sqlalchemy
+from benchmarks import bench_api, bench_predictor
+from benchmarks.datasets import DATASETS
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _metadata():
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'sqlalchemy': sqlalchemy.__version__,
+        'flask': flask.__version__
+    }
+
+def _key(result):
+    return (result['group'], result['name'], result.get('size', result.get('dataset')))
+
+def compare(baseline, results):
+    """按中位数对比本次结果和基准结果，打印变化比例"""
+    previous = {_key(result): result for result in baseline['results']}
+    revision = baseline['meta'].get('git_revision') or baseline['meta'].get('created_at')
+    print(f"\n与 {revision} 对比 (中位数，毫秒):")
+    print(f"  {'':<45} {'基准':>8} {'本次':>8} {'变化':>7}")
+    for result in results:
+        old = previous.get(_key(result))
+        group, name, size = _key(result)
+        label = f"{group}/{name} [{size}]"
+        if old is None:
+            print(f"  {label:<45} {'-':>10} {result['median_ms']:>10.2f}")
+            continue
+        change = (result['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+        print(f"  {label:<45} {old['median_ms']:>10.2f} {result['median_ms']:>10.2f} {change:>+8.1f}%")
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+@click.command()
+@click.option('--only', type=click.Choice(['predictor', 'api']), help='只运行一组测试')
+@click.option('--quick', is_flag=True, help='只测小规模数据 (记录数 10/1000，small 数据集)')
+@click.option('--sizes', help='预测模型测试的记录数，逗号分隔，默认 10,1000,100000')
+@click.option('--datasets', help=f"接口测试的数据集，逗号分隔，可选 {','.join(DATASETS)}")
+@click.option('--repeat', type=int, help='每项的计时次数，默认预测模型 5 次、接口 20 次')
+@click.option('--data-dir', type=click.Path(file_okay=False), help='数据库目录，指定时保留并复用生成的数据，默认使用临时目录')
+@click.option('--output', type=click.Path(dir_okay=False), help='结果文件，默认 benchmarks/results/<时间>.json')
+@click.option('--compare', 'baseline_path', type=click.Path(exists=True, dir_okay=False), help='与之前的结果文件对比')
+def main(only, quick, sizes, datasets, repeat, data_dir, output, baseline_path):
+    """运行预测模型和接口的基准测试"""
+    sizes = [int(size) for size in _split(sizes)] if sizes else \
+        ([10, 1000] if quick else list(bench_predictor.SIZES))
+    datasets = _split(datasets) or (['small'] if quick else list(DATASETS))
+    unknown = [name for name in datasets if name not in DATASETS]
+    if unknown:
+        raise click.BadParameter(f"未知的数据集: {', '.join(unknown)}", param_hint='--datasets')
+
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp(prefix='forest-fire-bench-')
+        # 在创建应用之前注册，atexit 后注册先执行，保证监控指标等退出时写入的文件之后再删除临时目录
+        atexit.register(shutil.rmtree, data_dir, True)
+
+    results = []
+    if only in (None, 'predictor'):
+        print("预测模型:")
+        results += bench_predictor.run(sizes, repeat or 5, data_dir)
+    if only in (None, 'api'):
+        print("接口:")
+        results += bench_api.run(datasets, repeat or 20, data_dir)
+
+    report = {'meta': _metadata(), 'results': results}
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {output}")
+
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
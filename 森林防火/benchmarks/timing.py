@@ -0,0 +1,34 @@
+"""
+计时工具
+"""
+import statistics
+import time
+
+def measure(func, repeat=5, warmup=1):
+    """
+    多次执行 func 并统计耗时
+
+    参数:
+    - func: 无参数的可调用对象
+    - repeat: 计时次数
+    - warmup: 计时前的预热次数 (填充缓存、加载模块等)
+
+    返回:
+    - 统计结果字典: repeat、min_ms、median_ms、mean_ms、max_ms
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.mean(samples), 4),
+        'max_ms': round(max(samples), 4)
+    }
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+跨进程的缓存版本号
+
+每个版本号对应实例目录 (instance/cache_versions) 下的一个文件。
+更新版本号时以"写临时文件再原子替换"的方式改写该文件，文件的 inode 和修改时间随之变化；
+读取版本号只需一次 os.stat，不访问数据库。
+同一台机器上的多个 gunicorn worker 共享实例目录，因此任一 worker 的更新都能被其他 worker 感知。
+"""
+import os
+import threading
+import time
+from flask import current_app
+
+# 版本文件所在的子目录
+VERSION_DIR = 'cache_versions'
+
+def _version_path(name):
+    """获取版本文件路径"""
+    return os.path.join(current_app.instance_path, VERSION_DIR, name)
+
+def get_version(name):
+    """
+    获取缓存版本号
+
+    返回:
+    - version: 可比较的版本标识，版本文件不存在时返回 0
+    """
+    try:
+        stat = os.stat(_version_path(name))
+    except FileNotFoundError:
+        return 0
+    return (stat.st_ino, stat.st_mtime_ns)
+
+def bump_version(name):
+    """更新缓存版本号，使所有进程中依赖该版本的缓存失效"""
+    path = _version_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # 先写入临时文件再原子替换，保证替换后 inode 一定发生变化
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as f:
+        f.write(str(time.time_ns()))
+    os.replace(temp_path, path)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+响应压缩
+
+JSON 列表接口的响应可达数 MB，按客户端的 Accept-Encoding 在应用内压缩:
+- 优先使用 brotli (需要安装 Brotli 包)，其次 gzip
+- 只压缩文本类型 (JSON、NDJSON、HTML、CSS、JS、CSV) 且不小于 COMPRESSION_MIN_SIZE 字节的响应
+- 流式响应 (SSE 推送、数据导出) 和静态文件不压缩，静态文件建议由 Nginx 压缩
+- 压缩后的 ETag 改为弱 ETag，与 304 条件请求 (conditional.py) 的弱比较兼容
+
+如果 Nginx 等反向代理已开启 gzip，可以设置 COMPRESSION_ENABLED=false 关闭应用内压缩。
+"""
+import gzip
+import os
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 取决于部署环境
+    brotli = None
+
+# 可以压缩的响应类型
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'text/plain',
+    'text/csv'
+}
+
+# 服务端支持的编码，按优先顺序
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def _compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+def _should_compress(response):
+    return (
+        response.mimetype in COMPRESSIBLE_MIMETYPES
+        and 200 <= response.status_code < 300
+        and response.status_code != 204
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and 'Content-Encoding' not in response.headers
+    )
+
+def init_app(app):
+    """
+    注册响应压缩
+
+    配置项 (可通过同名环境变量设置):
+    - COMPRESSION_ENABLED: 是否压缩，默认 true
+    - COMPRESSION_MIN_SIZE: 压缩的最小响应字节数，默认 1024
+    - COMPRESSION_GZIP_LEVEL: gzip 压缩级别 (1-9)，默认 6
+    - COMPRESSION_BROTLI_QUALITY: brotli 压缩质量 (0-11)，默认 4 (动态内容在压缩率和 CPU 耗时之间的折中)
+    """
+    app.config.setdefault('COMPRESSION_ENABLED', os.getenv('COMPRESSION_ENABLED', 'true').strip().lower() in ('1', 'on', 'true', 'yes'))
+    app.config.setdefault('COMPRESSION_MIN_SIZE', int(os.getenv('COMPRESSION_MIN_SIZE', 1024)))
+    app.config.setdefault('COMPRESSION_GZIP_LEVEL', int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)))
+    app.config.setdefault('COMPRESSION_BROTLI_QUALITY', int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4)))
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if not _should_compress(response):
+            return response
+
+        # 响应内容随 Accept-Encoding 变化，缓存需要区分
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESSION_MIN_SIZE']:
+            return response
+
+        response.set_data(_compress(data, encoding, app.config))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
\ No newline at end of file
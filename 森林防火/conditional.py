@@ -0,0 +1,95 @@
+"""
+读多写少接口的条件请求 (ETag / Last-Modified)
+
+监测点列表、当前阈值、火灾统计等接口的内容很少变化，却被大量看板反复轮询。
+这里用 cache_versions 中的版本号 (只需 os.stat，不访问数据库) 生成 ETag 和 Last-Modified，
+客户端带 If-None-Match / If-Modified-Since 且数据没有变化时，在执行查询和序列化之前直接返回 304。
+
+版本号在视图执行前读取: 如果执行期间数据发生变化，返回的内容可能比 ETag 新，
+下次请求时版本号不同，客户端会重新获取，不会长期拿到旧数据。
+
+按"最近 N 天"统计的接口，即使没有新数据，结果也会随时间推移而变化，
+这类接口把当前时间所在的时间窗 (CONDITIONAL_GET_WINDOW 秒，默认 60) 也计入 ETag，
+即 304 最多让客户端多看到一个时间窗的旧统计。
+
+HTTP 日期只精确到秒: Last-Modified 取版本文件修改时间向上取整到秒，修改发生在当前这一秒内时
+不返回 Last-Modified、也不按 If-Modified-Since 判断 (这一秒内可能还有修改)，只由 ETag 判断。
+客户端同时携带 If-None-Match 时只按 ETag 判断。
+"""
+import hashlib
+import math
+import os
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, request, make_response
+from cache_versions import get_version
+
+def _stamp(names, windowed):
+    """
+    计算当前的 ETag 和最后修改时间
+
+    返回:
+    - (etag, last_modified): last_modified 为 UTC datetime；所有版本文件都不存在且不按时间窗，
+      或最近的修改发生在当前这一秒内时为 None
+    """
+    versions = [get_version(name) for name in names]
+    parts = [request.endpoint] + [repr(version) for version in versions]
+    mtimes = [version[1] / 1e9 for version in versions if version]
+
+    if windowed:
+        window = current_app.config['CONDITIONAL_GET_WINDOW']
+        window_start = int(time.time() // window) * window
+        parts.append(str(window_start))
+        mtimes.append(window_start)
+
+    etag = hashlib.blake2b('|'.join(parts).encode(), digest_size=8).hexdigest()
+    if not mtimes:
+        return etag, None
+    # 向上取整到秒；尚未到达该时刻说明修改发生在当前这一秒内，同一秒内的后续修改会得到相同的值
+    modified = math.ceil(max(mtimes))
+    if modified > time.time():
+        return etag, None
+    return etag, datetime.fromtimestamp(modified, timezone.utc)
+
+def _not_modified(etag, last_modified):
+    """判断客户端缓存是否仍然有效 (If-None-Match 按弱比较，压缩后的弱 ETag 同样有效；有 If-None-Match 时忽略 If-Modified-Since)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if_modified_since = request.if_modified_since
+    return bool(if_modified_since and last_modified and last_modified <= if_modified_since)
+
+def conditional_get(*versions, windowed=False):
+    """
+    为 GET 接口添加 ETag、Last-Modified 和 Cache-Control: no-cache (客户端每次使用缓存前都要验证)
+
+    参数:
+    - versions: 接口内容依赖的缓存版本名 (见 cache_versions)，任一版本变化时 ETag 随之变化
+    - windowed: 接口按"最近一段时间"统计时为 True，ETag 同时随时间窗变化
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = _stamp(versions, windowed)
+
+            if _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+def init_app(app):
+    """
+    配置项 (可通过同名环境变量设置):
+    - CONDITIONAL_GET_WINDOW: 按时间范围统计的接口的 ETag 时间窗秒数，默认 60
+    """
+    app.config.setdefault('CONDITIONAL_GET_WINDOW', int(os.getenv('CONDITIONAL_GET_WINDOW', 60)))
\ No newline at end of file
@@ -1,35 +1,41 @@
-from app import app, db
-from models import MonitorPoint, User, FireThreshold
-
-def create_default_monitor_point():
-    """创建默认监测点和阈值设置"""
-    with app.app_context():
-        # 检查是否已有监测点
-        if MonitorPoint.query.count() == 0:
-            # 创建默认监测点
-            default_point = MonitorPoint(
-                name='默认监测点',
-                latitude=35.0,
-                longitude=116.0,
-                active=True
-            )
-            db.session.add(default_point)
-            print("创建默认监测点成功")
-            
-        # 检查是否已有阈值设置
-        if FireThreshold.query.count() == 0:
-            # 创建默认阈值设置
-            default_threshold = FireThreshold(
-                wind_speed_threshold=10.0,
-                temperature_threshold=30.0,
-                humidity_threshold=30.0,
-                updated_by=1  # 默认管理员ID
-            )
-            db.session.add(default_threshold)
-            print("创建默认阈值设置成功")
-            
-        db.session.commit()
-        print("默认数据初始化完成")
-
-if __name__ == "__main__":
+from app import create_app
+from extensions import db
+from models import MonitorPoint, User, FireThreshold
+from threshold_cache import invalidate_threshold_cache
+from spatial_index import invalidate_spatial_index
+
+def create_default_monitor_point():
+    """创建默认监测点和阈值设置"""
+    with create_app().app_context():
+        # 检查是否已有监测点
+        if MonitorPoint.query.count() == 0:
+            # 创建默认监测点
+            default_point = MonitorPoint(
+                name='默认监测点',
+                latitude=35.0,
+                longitude=116.0,
+                active=True
+            )
+            db.session.add(default_point)
+            print("创建默认监测点成功")
+            
+        # 检查是否已有阈值设置
+        if FireThreshold.query.count() == 0:
+            # 创建默认阈值设置
+            default_threshold = FireThreshold(
+                wind_speed_threshold=10.0,
+                temperature_threshold=30.0,
+                humidity_threshold=30.0,
+                updated_by=1  # 默认管理员ID
+            )
+            db.session.add(default_threshold)
+            print("创建默认阈值设置成功")
+            
+        db.session.commit()
+        # 使运行中服务的阈值缓存和监测点空间索引失效
+        invalidate_threshold_cache()
+        invalidate_spatial_index()
+        print("默认数据初始化完成")
+
+if __name__ == "__main__":
     create_default_monitor_point() 
\ No newline at end of file
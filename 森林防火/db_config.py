@@ -0,0 +1,127 @@
+"""
+数据库引擎配置
+
+根据 DATABASE_URI 的数据库类型生成 SQLALCHEMY_ENGINE_OPTIONS，各参数可通过环境变量调整:
+
+SQLite (开发和单机部署)
+- 启用 WAL 日志: 读操作不再被写事务阻塞，看板查询和传感器写入可以并发
+- synchronous=NORMAL: WAL 模式下只在检查点时同步磁盘，提交不再逐次 fsync，断电时最多丢失最近的提交但不会损坏数据库
+- busy_timeout: 写锁被占用时等待而不是立即报 "database is locked"
+- cache_size / mmap_size / temp_store: 加大页缓存、用内存映射读取数据库文件、临时表放在内存中
+- 使用连接池复用连接 (Flask-SQLAlchemy 默认对 SQLite 文件不使用连接池，每次请求都重新打开文件并执行 PRAGMA)
+
+    SQLITE_JOURNAL_MODE      默认 WAL
+    SQLITE_SYNCHRONOUS       默认 NORMAL
+    SQLITE_BUSY_TIMEOUT_MS   默认 5000
+    SQLITE_CACHE_SIZE_KB     默认 65536 (64MB，每个连接)
+    SQLITE_MMAP_SIZE_MB      默认 256
+    SQLITE_POOL_SIZE         默认 5
+    DB_MAX_OVERFLOW          默认 10 (与 MySQL 共用同一个环境变量)
+
+MySQL 等其他数据库 (生产部署)
+- 连接池大小、溢出连接数、获取连接的超时、连接回收时间和取用前检测 (pre-ping)
+
+    DB_POOL_SIZE        默认 10 (每个 worker 进程)
+    DB_MAX_OVERFLOW     默认 20
+    DB_POOL_TIMEOUT     默认 30 秒
+    DB_POOL_RECYCLE     默认 1800 秒，应小于 MySQL 的 wait_timeout 和中间代理的空闲超时
+    DB_POOL_PRE_PING    默认 true
+
+每个 worker 进程有独立的连接池，数据库的最大连接数应不小于 worker 数 × (DB_POOL_SIZE + DB_MAX_OVERFLOW)。
+"""
+import os
+from functools import partial
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# SQLite synchronous 允许的取值
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# SQLite journal_mode 允许的取值
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _env_choice(name, default, choices):
+    value = (os.getenv(name) or default).strip().upper()
+    if value not in choices:
+        raise ValueError(f'{name} 只能是 {", ".join(choices)} 之一')
+    return value
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+def sqlite_pragmas():
+    """每个 SQLite 连接建立后执行的 PRAGMA (按执行顺序)"""
+    return [
+        ('busy_timeout', _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('journal_mode', _env_choice('SQLITE_JOURNAL_MODE', 'WAL', SQLITE_JOURNAL_MODES)),
+        ('synchronous', _env_choice('SQLITE_SYNCHRONOUS', 'NORMAL', SQLITE_SYNCHRONOUS_MODES)),
+        # 负数表示以 KB 为单位
+        ('cache_size', -_env_int('SQLITE_CACHE_SIZE_KB', 65536)),
+        ('mmap_size', _env_int('SQLITE_MMAP_SIZE_MB', 256) * 1024 * 1024),
+        ('temp_store', 'MEMORY')
+    ]
+
+def engine_options(uri):
+    """
+    根据数据库地址生成 SQLALCHEMY_ENGINE_OPTIONS
+
+    内存数据库 (sqlite:// 或 :memory:) 保持 Flask-SQLAlchemy 的默认设置
+    """
+    url = make_url(uri)
+
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}
+        return {
+            'poolclass': QueuePool,
+            'pool_size': _env_int('SQLITE_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_pre_ping': False,
+            'connect_args': {
+                # 连接在池中被不同线程复用
+                'check_same_thread': False,
+                'timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000
+            }
+        }
+
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True)
+    }
+
+def _apply_sqlite_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+def configure_engine(engine):
+    """为新建的引擎注册连接初始化: SQLite 连接建立后执行 PRAGMA 设置"""
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', partial(_apply_sqlite_pragmas, sqlite_pragmas()))
+
+def init_app(app):
+    """
+    在 db.init_app(app) 之前调用: 根据数据库地址设置引擎参数
+
+    配置中已有的 SQLALCHEMY_ENGINE_OPTIONS 优先
+    """
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+监测数据实时推送 (Server-Sent Events)
+
+每个打开的看板原来都会反复请求 /api/monitor/latest、/api/fire/predict 等接口。
+这里每个工作进程只启动一个后台线程，定期读取一次最新数据快照表 (每个监测点一行)，
+与上一次的结果对比，把变化的监测数据和风险等级推送给本进程内的所有订阅者。
+数据库的读取次数与连接的客户端数量无关。
+
+事件类型:
+- snapshot: 订阅时发送一次，包含全部监测点的最新数据 (readings) 和风险评估 (predictions)
+- reading: 某个监测点的最新数据发生变化，数据格式与 /api/monitor/latest 的元素相同
+- prediction: 某个监测点的风险评估发生变化 (有新的监测数据，或修改阈值后风险等级变化)，
+  数据格式与 /api/fire/predict 的元素相同
+- removed: 某个监测点已没有监测数据
+
+本进程写入监测数据后调用 notify() 立即触发一次读取，其他进程的写入在下一个轮询周期内推送。
+每次轮询先检查最新数据、阈值和监测点的版本号 (cache_versions，只需 os.stat)，
+都没有变化时不查询数据库。
+"""
+import json_support
+import queue
+import threading
+from models import LatestReading, db
+from fire_prediction import FirePredictor
+from threshold_cache import get_active_threshold, THRESHOLD_VERSION
+from cache_versions import get_version
+from latest_readings import READINGS_VERSION
+from spatial_index import POINTS_VERSION
+
+# 轮询最新数据快照表的间隔 (秒)
+POLL_INTERVAL = 2.0
+
+# 没有事件时发送心跳注释的间隔 (秒)，防止代理断开空闲连接
+HEARTBEAT_INTERVAL = 15.0
+
+# 每个订阅者最多缓存的事件数，超过时断开该订阅者 (浏览器会自动重连并重新获取快照)
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# 断开订阅者时放入队列的标记
+_CLOSE = object()
+
+def format_event(event, data):
+    """按 SSE 格式编码一条事件"""
+    payload = json_support.dumps(data)
+    return f'event: {event}\ndata: {payload}\n\n'
+
+def _current_version():
+    """推送内容依赖的版本号: 最新数据、阈值 (风险等级) 和监测点 (名称、坐标)"""
+    return (get_version(READINGS_VERSION), get_version(THRESHOLD_VERSION), get_version(POINTS_VERSION))
+
+class ReadingBroker:
+    """进程内的监测数据广播器，所有订阅者共享同一个后台轮询线程"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._subscribers = set()
+        self._thread = None
+        self._app = None
+        # 上一次读取的结果: {监测点ID: 数据}，以及读取前的版本号
+        self._readings = None
+        self._predictions = None
+        self._version = None
+
+    def subscribe(self, app):
+        """
+        新增订阅者，必要时启动后台线程
+
+        返回:
+        - subscriber: 事件队列，元素为已编码的 SSE 文本
+        """
+        subscriber = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._app = app
+            self._subscribers.add(subscriber)
+            if self._readings is not None:
+                subscriber.put(self._snapshot_event())
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='reading-broker', daemon=True)
+                self._thread.start()
+
+        self._wakeup.set()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """移除订阅者，没有订阅者时丢弃缓存的结果，下次订阅时重新读取"""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._readings = None
+                self._predictions = None
+                self._version = None
+
+    def notify(self):
+        """通知后台线程立即读取一次 (本进程写入监测数据或修改阈值后调用)"""
+        self._wakeup.set()
+
+    def _snapshot_event(self):
+        return format_event('snapshot', {
+            'readings': list(self._readings.values()),
+            'predictions': list(self._predictions.values())
+        })
+
+    def _publish(self, events):
+        """把事件放入所有订阅者的队列，队列已满的订阅者被断开"""
+        for subscriber in list(self._subscribers):
+            try:
+                for event in events:
+                    subscriber.put_nowait(event)
+            except queue.Full:
+                self._subscribers.discard(subscriber)
+                # 腾出位置放入断开标记
+                while True:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        break
+                subscriber.put_nowait(_CLOSE)
+
+    def _load(self):
+        """读取最新数据快照并生成风险评估"""
+        records = LatestReading.with_point().order_by(LatestReading.monitor_point_id).all()
+        readings = {record.monitor_point_id: record.to_dict() for record in records}
+        predictions = {
+            result['monitor_point_id']: result
+            for result in FirePredictor.analyze_records(records, get_active_threshold())
+        } if records else {}
+        return readings, predictions
+
+    def _poll(self):
+        """读取一次并把变化推送给订阅者，版本号没有变化时不查询数据库"""
+        with self._app.app_context():
+            # 在读取数据之前取版本号: 读取期间发生的修改会在下一次轮询时被发现
+            version = _current_version()
+            with self._lock:
+                if self._readings is not None and version == self._version:
+                    return
+            try:
+                readings, predictions = self._load()
+            finally:
+                db.session.remove()
+
+        with self._lock:
+            if not self._subscribers:
+                return
+
+            self._version = version
+            if self._readings is None:
+                # 首次读取: 向等待中的订阅者发送快照
+                self._readings, self._predictions = readings, predictions
+                self._publish([self._snapshot_event()])
+                return
+
+            events = []
+            for point_id, reading in readings.items():
+                if self._readings.get(point_id) != reading:
+                    events.append(format_event('reading', reading))
+
+            for point_id, prediction in predictions.items():
+                if self._predictions.get(point_id) != prediction:
+                    events.append(format_event('prediction', prediction))
+
+            for point_id in self._readings.keys() - readings.keys():
+                events.append(format_event('removed', {'monitor_point_id': point_id}))
+
+            self._readings, self._predictions = readings, predictions
+            if events:
+                self._publish(events)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(POLL_INTERVAL)
+            self._wakeup.clear()
+
+            with self._lock:
+                idle = not self._subscribers
+            if idle:
+                continue
+
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"推送监测数据时发生错误: {str(e)}")
+
+    def stream(self, subscriber):
+        """
+        订阅者的 SSE 文本生成器，客户端断开时自动取消订阅
+        """
+        try:
+            # 建议浏览器断线后的重连间隔 (毫秒)
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+
+                if event is _CLOSE:
+                    return
+                yield event
+        finally:
+            self.unsubscribe(subscriber)
+
+# 每个工作进程一个广播器
+broker = ReadingBroker()
+
+def notify():
+    """本进程写入监测数据或修改阈值后调用，立即向订阅者推送变化"""
+    broker.notify()
\ No newline at end of file
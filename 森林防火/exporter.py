@@ -0,0 +1,191 @@
+"""
+监测记录和火灾数据的流式导出 (CSV / NDJSON / Parquet)
+
+按时间范围和监测点导出历史数据。查询使用服务端游标 (stream_results) 按块读取，
+每块数据编码后立即输出，不构造ORM对象，内存占用与导出的时间范围无关。
+
+HTTP 接口见 routes/export_routes.py，命令行用法:
+    FLASK_APP=app.py flask export-data records --format csv --since 2024-01-01 --output records.csv
+"""
+import csv
+import io
+import json
+from models import MonitorRecord, FireData, db
+import archive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 导出需要 pyarrow
+    pa = None
+    pq = None
+
+# 可导出的数据: 名称 -> (模型, 导出字段)
+EXPORT_TABLES = {
+    'records': (MonitorRecord, ('id', 'monitor_point_id', 'timestamp',
+                                'wind_speed', 'temperature', 'humidity')),
+    'fire-data': (FireData, ('id', 'monitor_point_id', 'timestamp', 'wind_speed', 'temperature',
+                             'humidity', 'risk_level', 'predicted_area', 'latitude', 'longitude'))
+}
+
+# 导出格式: 名称 -> (Content-Type, 文件扩展名)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+# 每次从数据库游标读取的行数，也是 Parquet 文件的行组大小
+CHUNK_SIZE = 5000
+
+# 导出文件中的时间格式 (与接口返回的格式一致)
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def validate(table, fmt):
+    """检查导出的数据和格式，无效时抛出 ValueError"""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"导出数据只能是: {', '.join(EXPORT_TABLES)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"导出格式只能是: {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'parquet' and pa is None:
+        raise ValueError('Parquet 导出需要安装 pyarrow')
+
+def iter_chunks(table, since=None, until=None, point_ids=None):
+    """
+    按时间顺序分块读取导出数据
+
+    监测记录先按监测点输出已归档的数据，再输出数据库中的记录
+
+    返回:
+    - 生成器，每次产生一个行元组列表，字段顺序与 EXPORT_TABLES 中的导出字段一致
+    """
+    model, fields = EXPORT_TABLES[table]
+    columns = [getattr(model, field) for field in fields]
+
+    query = db.session.query(*columns)
+    if since:
+        query = query.filter(model.timestamp >= since)
+    if until:
+        query = query.filter(model.timestamp < until)
+    if point_ids:
+        query = query.filter(model.monitor_point_id.in_(point_ids))
+    query = query.order_by(model.timestamp, model.id)
+
+    # 服务端游标: MySQL 下逐块从服务器读取，而不是一次把结果全部取到客户端
+    if model is MonitorRecord:
+        yield from archive.iter_archive_rows(point_ids, since, until)
+
+    result = db.session.execute(query.statement.execution_options(stream_results=True))
+    try:
+        for chunk in result.partitions(CHUNK_SIZE):
+            yield chunk
+    finally:
+        result.close()
+
+def _format_time(value):
+    return value.strftime(TIME_FORMAT) if value is not None else None
+
+def _export_csv(fields, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    time_index = fields.index('timestamp')
+
+    writer.writerow(fields)
+    for chunk in chunks:
+        for row in chunk:
+            row = list(row)
+            row[time_index] = _format_time(row[time_index])
+            writer.writerow(row)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    # 没有数据时也输出表头
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _export_ndjson(fields, chunks):
+    time_index = fields.index('timestamp')
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            item = dict(zip(fields, row))
+            item['timestamp'] = _format_time(row[time_index])
+            lines.append(json.dumps(item, ensure_ascii=False))
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+class _ChunkSink(io.RawIOBase):
+    """Parquet 写入目标: 暂存写入的字节，由导出生成器逐块取走"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_schema(fields):
+    """按模型字段类型生成 Parquet 表结构"""
+    types = {'timestamp': pa.timestamp('us'), 'risk_level': pa.string()}
+    schema = []
+    for field in fields:
+        if field in types:
+            schema.append((field, types[field]))
+        elif field in ('id', 'monitor_point_id'):
+            schema.append((field, pa.int64()))
+        else:
+            schema.append((field, pa.float64()))
+    return pa.schema(schema)
+
+def _export_parquet(fields, chunks):
+    schema = _parquet_schema(fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # 每块数据写为一个行组，写完立即输出
+        for chunk in chunks:
+            arrays = [pa.array(column, type=schema.field(i).type)
+                      for i, column in enumerate(zip(*chunk))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def export(table, fmt, since=None, until=None, point_ids=None):
+    """
+    流式导出数据
+
+    参数:
+    - table: EXPORT_TABLES 中的名称
+    - fmt: EXPORT_FORMATS 中的名称
+    - since, until: 时间范围 [since, until)
+    - point_ids: 监测点ID列表，不指定时导出所有监测点
+
+    返回:
+    - 生成器，逐块产生编码后的字节
+    """
+    validate(table, fmt)
+    fields = EXPORT_TABLES[table][1]
+    chunks = iter_chunks(table, since, until, point_ids)
+
+    if fmt == 'csv':
+        return _export_csv(fields, chunks)
+    if fmt == 'ndjson':
+        return _export_ndjson(fields, chunks)
+    return _export_parquet(fields, chunks)
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+Flask 扩展实例
+
+扩展在这里创建但不绑定应用，由 app.create_app() 调用 init_app 完成初始化，
+路由和脚本从这里导入扩展，避免导入 app 模块时创建应用实例。
+"""
+from flask_bcrypt import Bcrypt
+from flask_jwt_extended import JWTManager
+from models import db
+
+bcrypt = Bcrypt()
+
+jwt = JWTManager()
\ No newline at end of file
@@ -1,239 +1,416 @@
-import numpy as np
-from models import FireThreshold, MonitorRecord, db
-
-class FirePredictor:
-    """森林火灾预测模型"""
-    
-    @staticmethod
-    def predict_risk(wind_speed, temperature, humidity, thresholds=None):
-        """
-        基于监测数据预测火灾风险等级
-        
-        参数:
-        - wind_speed: 风速 (m/s)
-        - temperature: 温度 (°C)
-        - humidity: 湿度 (%)
-        - thresholds: 自定义阈值，若未提供则从数据库获取
-        
-        返回:
-        - risk_level: 风险等级 ('low', 'medium', 'high', 'extreme')
-        """
-        # 确保数据是浮点型
-        try:
-            wind_speed = float(wind_speed)
-            temperature = float(temperature)
-            humidity = float(humidity)
-        except (ValueError, TypeError) as e:
-            print(f"预测风险时发生类型转换错误: {str(e)}")
-            # 如果转换失败，使用默认值
-            wind_speed = 10.0
-            temperature = 30.0
-            humidity = 60.0
-        
-        # 获取阈值设置
-        wind_threshold = 10.0  # 默认值
-        temp_threshold = 30.0  # 默认值
-        humidity_threshold = 30.0  # 默认值
-        
-        try:
-            if not thresholds:
-                threshold = FireThreshold.query.order_by(FireThreshold.id.desc()).first()
-                if threshold:
-                    wind_threshold = float(threshold.wind_speed_threshold)
-                    temp_threshold = float(threshold.temperature_threshold)
-                    humidity_threshold = float(threshold.humidity_threshold)
-            elif isinstance(thresholds, dict):
-                # 如果是字典类型，使用get方法
-                wind_threshold = float(thresholds.get('wind_speed_threshold', 10.0))
-                temp_threshold = float(thresholds.get('temperature_threshold', 30.0))
-                humidity_threshold = float(thresholds.get('humidity_threshold', 30.0))
-            else:
-                # 如果是对象类型，直接访问属性
-                wind_threshold = float(thresholds.wind_speed_threshold)
-                temp_threshold = float(thresholds.temperature_threshold)
-                humidity_threshold = float(thresholds.humidity_threshold)
-        except (ValueError, TypeError, AttributeError) as e:
-            print(f"获取阈值时发生错误: {str(e)}")
-            # 发生错误时使用默认值，不中断程序
-            pass
-        
-        # 确保阈值不为0，避免除以0错误
-        if wind_threshold <= 0:
-            wind_threshold = 10.0
-        if temp_threshold <= 0:
-            temp_threshold = 30.0
-        if humidity_threshold <= 0:
-            humidity_threshold = 30.0
-            
-        # 计算风险得分 (0-100)
-        try:
-            # 风速因子: 风速越大，得分越高
-            wind_factor = min(100, (wind_speed / wind_threshold) * 50)
-            
-            # 温度因子: 温度越高，得分越高
-            temp_factor = min(100, (temperature / temp_threshold) * 60)
-            
-            # 湿度因子: 湿度越低，得分越高
-            # 避免除以0错误
-            humidity_diff = max(1, 100 - humidity_threshold)
-            humidity_factor = min(100, ((100 - humidity) / humidity_diff) * 70)
-            
-            # 综合得分，加权平均
-            risk_score = (wind_factor * 0.3) + (temp_factor * 0.4) + (humidity_factor * 0.3)
-        except Exception as e:
-            print(f"计算风险得分时发生错误: {str(e)}")
-            # 如果计算失败，返回中等风险
-            return 'medium'
-        
-        # 风险等级判定
-        if risk_score < 30:
-            return 'low'
-        elif risk_score < 55:
-            return 'medium'
-        elif risk_score < 80:
-            return 'high'
-        else:
-            return 'extreme'
-    
-    @staticmethod
-    def predict_fire_area(wind_speed, temperature, humidity, risk_level):
-        """
-        预测可能的火灾面积 (平方公里)
-        
-        使用公式: 面积 = 基础面积 * (1 + 风速因子) * 温度因子 * (1 - 湿度因子)
-        
-        参数:
-        - wind_speed: 风速 (m/s)
-        - temperature: 温度 (°C)
-        - humidity: 湿度 (%)
-        - risk_level: 风险等级
-        
-        返回:
-        - area: 预测火灾面积 (平方公里)
-        """
-        # 确保数据是浮点型
-        try:
-            wind_speed = float(wind_speed)
-            temperature = float(temperature)
-            humidity = float(humidity)
-        except (ValueError, TypeError) as e:
-            print(f"预测面积时发生类型转换错误: {str(e)}")
-            # 如果转换失败，使用默认值
-            wind_speed = 10.0
-            temperature = 30.0
-            humidity = 60.0
-            
-        # 风险等级对应的基础面积
-        base_area = {
-            'low': 0,
-            'medium': 0.5,
-            'high': 2.0,
-            'extreme': 5.0
-        }
-        
-        # 如果风险级别为低，则不预测面积
-        if risk_level == 'low':
-            return 0
-        
-        # 如果risk_level不在字典中，使用medium作为默认值
-        if risk_level not in base_area:
-            risk_level = 'medium'
-            
-        try:
-            # 风速因子: 风速每增加1m/s，火灾蔓延面积增加10%
-            wind_factor = wind_speed * 0.1
-            
-            # 温度因子: 基础为1.0，温度每超过25度增加5%
-            temp_factor = 1.0 + max(0, (temperature - 25) * 0.05)
-            
-            # 湿度因子: 湿度越高，蔓延越慢。湿度100%时因子为0，湿度0%时因子为0.8
-            humidity_factor = (100 - humidity) / 125
-            
-            # 计算预测面积
-            predicted_area = base_area[risk_level] * (1 + wind_factor) * temp_factor * (1 - humidity_factor)
-            
-            return round(max(0, predicted_area), 2)  # 确保面积不为负值
-        except Exception as e:
-            print(f"计算火灾面积时发生错误: {str(e)}")
-            # 如果计算失败，返回基础面积
-            return base_area.get(risk_level, 0.5)
-
-    @staticmethod
-    def analyze_monitor_data(monitor_point_id=None):
-        """
-        分析监测点数据，生成火灾风险评估
-        
-        参数:
-        - monitor_point_id: 监测点ID，若不提供则分析所有监测点的最新数据
-        
-        返回:
-        - results: 分析结果列表
-        """
-        results = []
-        
-        try:
-            # 获取阈值设置
-            threshold = FireThreshold.query.order_by(FireThreshold.id.desc()).first()
-            
-            # 查询监测数据
-            if monitor_point_id:
-                # 获取指定监测点的最新数据
-                records = MonitorRecord.query.filter_by(monitor_point_id=monitor_point_id)\
-                    .order_by(MonitorRecord.timestamp.desc()).limit(1).all()
-            else:
-                # 获取所有监测点的最新数据
-                # 这里使用子查询获取每个监测点的最新记录ID
-                latest_records_query = db.session.query(
-                    MonitorRecord.monitor_point_id,
-                    db.func.max(MonitorRecord.timestamp).label('max_time')
-                ).group_by(MonitorRecord.monitor_point_id).subquery('latest_records')
-                
-                records = db.session.query(MonitorRecord).join(
-                    latest_records_query,
-                    db.and_(
-                        MonitorRecord.monitor_point_id == latest_records_query.c.monitor_point_id,
-                        MonitorRecord.timestamp == latest_records_query.c.max_time
-                    )
-                ).all()
-            
-            # 分析每条记录
-            for record in records:
-                try:
-                    # 预测风险等级
-                    risk_level = FirePredictor.predict_risk(
-                        record.wind_speed, 
-                        record.temperature, 
-                        record.humidity,
-                        threshold
-                    )
-                    
-                    # 预测可能火灾面积
-                    predicted_area = FirePredictor.predict_fire_area(
-                        record.wind_speed, 
-                        record.temperature, 
-                        record.humidity, 
-                        risk_level
-                    )
-                    
-                    # 添加结果
-                    results.append({
-                        'monitor_point_id': record.monitor_point_id,
-                        'monitor_point_name': record.monitor_point.name,
-                        'wind_speed': record.wind_speed,
-                        'temperature': record.temperature,
-                        'humidity': record.humidity,
-                        'risk_level': risk_level,
-                        'predicted_area': predicted_area,
-                        'timestamp': record.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                        'latitude': record.monitor_point.latitude,
-                        'longitude': record.monitor_point.longitude
-                    })
-                except Exception as e:
-                    print(f"分析监测记录时发生错误: {str(e)}")
-                    # 跳过有问题的记录，继续处理其他记录
-                    continue
-        except Exception as e:
-            print(f"分析监测数据时发生错误: {str(e)}")
-            # 在出错时返回空结果，而不是中断程序
-            
+import numpy as np
+from models import LatestReading
+from threshold_cache import get_active_threshold
+import metrics
+
+# 风险等级 (按得分从低到高排列)
+RISK_LEVELS = np.array(['low', 'medium', 'high', 'extreme'], dtype=object)
+
+# 风险等级对应的基础面积 (平方公里)
+BASE_AREA = {
+    'low': 0,
+    'medium': 0.5,
+    'high': 2.0,
+    'extreme': 5.0
+}
+
+class FirePredictor:
+    """森林火灾预测模型"""
+
+    @staticmethod
+    def _resolve_thresholds(thresholds=None):
+        """
+        解析阈值设置，返回 (风速阈值, 温度阈值, 湿度阈值)
+
+        参数:
+        - thresholds: 自定义阈值(字典或对象)，若未提供则使用当前生效的阈值设置
+        """
+        wind_threshold = 10.0  # 默认值
+        temp_threshold = 30.0  # 默认值
+        humidity_threshold = 30.0  # 默认值
+
+        try:
+            if not thresholds:
+                threshold = get_active_threshold()
+                if threshold:
+                    wind_threshold = float(threshold['wind_speed_threshold'])
+                    temp_threshold = float(threshold['temperature_threshold'])
+                    humidity_threshold = float(threshold['humidity_threshold'])
+            elif isinstance(thresholds, dict):
+                # 如果是字典类型，使用get方法
+                wind_threshold = float(thresholds.get('wind_speed_threshold', 10.0))
+                temp_threshold = float(thresholds.get('temperature_threshold', 30.0))
+                humidity_threshold = float(thresholds.get('humidity_threshold', 30.0))
+            else:
+                # 如果是对象类型，直接访问属性
+                wind_threshold = float(thresholds.wind_speed_threshold)
+                temp_threshold = float(thresholds.temperature_threshold)
+                humidity_threshold = float(thresholds.humidity_threshold)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"获取阈值时发生错误: {str(e)}")
+            # 发生错误时使用默认值，不中断程序
+            pass
+
+        # 确保阈值不为0，避免除以0错误
+        if wind_threshold <= 0:
+            wind_threshold = 10.0
+        if temp_threshold <= 0:
+            temp_threshold = 30.0
+        if humidity_threshold <= 0:
+            humidity_threshold = 30.0
+
+        return wind_threshold, temp_threshold, humidity_threshold
+
+    @staticmethod
+    @metrics.track_calls('predict_risk')
+    def predict_risk(wind_speed, temperature, humidity, thresholds=None):
+        """
+        基于监测数据预测火灾风险等级
+        
+        参数:
+        - wind_speed: 风速 (m/s)
+        - temperature: 温度 (°C)
+        - humidity: 湿度 (%)
+        - thresholds: 自定义阈值，若未提供则使用当前生效的阈值设置
+        
+        返回:
+        - risk_level: 风险等级 ('low', 'medium', 'high', 'extreme')
+        """
+        # 确保数据是浮点型
+        try:
+            wind_speed = float(wind_speed)
+            temperature = float(temperature)
+            humidity = float(humidity)
+        except (ValueError, TypeError) as e:
+            print(f"预测风险时发生类型转换错误: {str(e)}")
+            # 如果转换失败，使用默认值
+            wind_speed = 10.0
+            temperature = 30.0
+            humidity = 60.0
+        
+        # 获取阈值设置
+        wind_threshold, temp_threshold, humidity_threshold = FirePredictor._resolve_thresholds(thresholds)
+            
+        # 计算风险得分 (0-100)
+        try:
+            # 风速因子: 风速越大，得分越高
+            wind_factor = min(100, (wind_speed / wind_threshold) * 50)
+            
+            # 温度因子: 温度越高，得分越高
+            temp_factor = min(100, (temperature / temp_threshold) * 60)
+            
+            # 湿度因子: 湿度越低，得分越高
+            # 避免除以0错误
+            humidity_diff = max(1, 100 - humidity_threshold)
+            humidity_factor = min(100, ((100 - humidity) / humidity_diff) * 70)
+            
+            # 综合得分，加权平均
+            risk_score = (wind_factor * 0.3) + (temp_factor * 0.4) + (humidity_factor * 0.3)
+        except Exception as e:
+            print(f"计算风险得分时发生错误: {str(e)}")
+            # 如果计算失败，返回中等风险
+            return 'medium'
+        
+        # 风险等级判定
+        if risk_score < 30:
+            return 'low'
+        elif risk_score < 55:
+            return 'medium'
+        elif risk_score < 80:
+            return 'high'
+        else:
+            return 'extreme'
+    
+    @staticmethod
+    @metrics.track_calls('predict_fire_area')
+    def predict_fire_area(wind_speed, temperature, humidity, risk_level):
+        """
+        预测可能的火灾面积 (平方公里)
+        
+        使用公式: 面积 = 基础面积 * (1 + 风速因子) * 温度因子 * (1 - 湿度因子)
+        
+        参数:
+        - wind_speed: 风速 (m/s)
+        - temperature: 温度 (°C)
+        - humidity: 湿度 (%)
+        - risk_level: 风险等级
+        
+        返回:
+        - area: 预测火灾面积 (平方公里)
+        """
+        # 确保数据是浮点型
+        try:
+            wind_speed = float(wind_speed)
+            temperature = float(temperature)
+            humidity = float(humidity)
+        except (ValueError, TypeError) as e:
+            print(f"预测面积时发生类型转换错误: {str(e)}")
+            # 如果转换失败，使用默认值
+            wind_speed = 10.0
+            temperature = 30.0
+            humidity = 60.0
+            
+        # 风险等级对应的基础面积
+        base_area = BASE_AREA
+        
+        # 如果风险级别为低，则不预测面积
+        if risk_level == 'low':
+            return 0
+        
+        # 如果risk_level不在字典中，使用medium作为默认值
+        if risk_level not in base_area:
+            risk_level = 'medium'
+            
+        try:
+            # 风速因子: 风速每增加1m/s，火灾蔓延面积增加10%
+            wind_factor = wind_speed * 0.1
+            
+            # 温度因子: 基础为1.0，温度每超过25度增加5%
+            temp_factor = 1.0 + max(0, (temperature - 25) * 0.05)
+            
+            # 湿度因子: 湿度越高，蔓延越慢。湿度100%时因子为0，湿度0%时因子为0.8
+            humidity_factor = (100 - humidity) / 125
+            
+            # 计算预测面积
+            predicted_area = base_area[risk_level] * (1 + wind_factor) * temp_factor * (1 - humidity_factor)
+            
+            return round(max(0, predicted_area), 2)  # 确保面积不为负值
+        except Exception as e:
+            print(f"计算火灾面积时发生错误: {str(e)}")
+            # 如果计算失败，返回基础面积
+            return base_area.get(risk_level, 0.5)
+
+    @staticmethod
+    def _coerce_batch(wind_speed, temperature, humidity):
+        """
+        将批量输入转换为等长的一维浮点数组
+
+        与单条预测保持一致: 某一行任一字段无法转换为浮点数时，该行整体使用默认值
+        """
+        columns = [np.atleast_1d(np.asarray(values)).reshape(-1)
+                   for values in (wind_speed, temperature, humidity)]
+        size = len(columns[0])
+        if any(len(column) != size for column in columns):
+            raise ValueError('风速、温度和湿度数组长度不一致')
+
+        # 数值数组直接转换，无需逐个检查
+        if all(column.dtype.kind in 'biuf' for column in columns):
+            return tuple(column.astype(np.float64) for column in columns)
+
+        # 含有非数值元素时逐个转换，并记录转换失败的行
+        outputs = [np.empty(size, dtype=np.float64) for _ in columns]
+        invalid = np.zeros(size, dtype=bool)
+        for column, output in zip(columns, outputs):
+            for i, value in enumerate(column.tolist()):
+                try:
+                    output[i] = float(value)
+                except (ValueError, TypeError):
+                    invalid[i] = True
+
+        if invalid.any():
+            print(f"批量预测时有 {int(invalid.sum())} 条数据发生类型转换错误，已使用默认值")
+            outputs[0][invalid] = 10.0
+            outputs[1][invalid] = 30.0
+            outputs[2][invalid] = 60.0
+
+        return tuple(outputs)
+
+    @staticmethod
+    def _round_area(values):
+        """
+        向量化的 round(x, 2)，结果与内置 round 逐位一致
+
+        np.round 先乘 100 再取整，在 x*100 恰好接近 .5 时可能与内置 round 不同，
+        这类少数元素以及乘 100 后溢出的极大值回退到内置 round 计算
+        """
+        with np.errstate(invalid='ignore', over='ignore'):
+            result = np.round(values, 2)
+            scaled = values * 100
+            ambiguous = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+            ambiguous |= np.abs(values) >= 1e13
+        for i in np.flatnonzero(ambiguous & np.isfinite(values)):
+            result[i] = round(float(values[i]), 2)
+        return result
+
+    @staticmethod
+    def predict_risk_batch(wind_speed, temperature, humidity, thresholds=None):
+        """
+        批量预测火灾风险等级，结果与逐条调用 predict_risk 完全一致
+
+        参数:
+        - wind_speed: 风速数组 (m/s)
+        - temperature: 温度数组 (°C)
+        - humidity: 湿度数组 (%)
+        - thresholds: 自定义阈值，若未提供则使用当前生效的阈值设置 (整批只获取一次)
+
+        返回:
+        - risk_levels: 风险等级数组 (dtype=object)
+        """
+        wind_speed, temperature, humidity = FirePredictor._coerce_batch(wind_speed, temperature, humidity)
+        wind_threshold, temp_threshold, humidity_threshold = FirePredictor._resolve_thresholds(thresholds)
+
+        with np.errstate(all='ignore'):
+            # 各因子上限为100，np.where 的写法与内置 min 对 NaN 的处理一致
+            wind_factor = (wind_speed / wind_threshold) * 50
+            wind_factor = np.where(wind_factor < 100, wind_factor, 100.0)
+
+            temp_factor = (temperature / temp_threshold) * 60
+            temp_factor = np.where(temp_factor < 100, temp_factor, 100.0)
+
+            humidity_diff = max(1, 100 - humidity_threshold)
+            humidity_factor = ((100 - humidity) / humidity_diff) * 70
+            humidity_factor = np.where(humidity_factor < 100, humidity_factor, 100.0)
+
+            risk_score = (wind_factor * 0.3) + (temp_factor * 0.4) + (humidity_factor * 0.3)
+
+            # 得分越低等级越低，NaN 与单条预测一样落入 'extreme'
+            level_index = 3 - (risk_score < 80).astype(np.intp) \
+                - (risk_score < 55).astype(np.intp) \
+                - (risk_score < 30).astype(np.intp)
+
+        return RISK_LEVELS[level_index]
+
+    @staticmethod
+    def predict_fire_area_batch(wind_speed, temperature, humidity, risk_levels):
+        """
+        批量预测可能的火灾面积 (平方公里)，结果与逐条调用 predict_fire_area 完全一致
+
+        参数:
+        - wind_speed: 风速数组 (m/s)
+        - temperature: 温度数组 (°C)
+        - humidity: 湿度数组 (%)
+        - risk_levels: 风险等级数组
+
+        返回:
+        - areas: 预测火灾面积数组 (float64)
+        """
+        wind_speed, temperature, humidity = FirePredictor._coerce_batch(wind_speed, temperature, humidity)
+        risk_levels = np.atleast_1d(np.asarray(risk_levels, dtype=object)).reshape(-1)
+        if len(risk_levels) != len(wind_speed):
+            raise ValueError('风险等级数组长度与监测数据不一致')
+
+        # 未知风险等级按 medium 处理
+        base = np.full(len(risk_levels), BASE_AREA['medium'], dtype=np.float64)
+        base[risk_levels == 'high'] = BASE_AREA['high']
+        base[risk_levels == 'extreme'] = BASE_AREA['extreme']
+
+        with np.errstate(all='ignore'):
+            wind_factor = wind_speed * 0.1
+
+            temp_excess = (temperature - 25) * 0.05
+            temp_factor = 1.0 + np.where(temp_excess > 0, temp_excess, 0.0)
+
+            humidity_factor = (100 - humidity) / 125
+
+            predicted_area = base * (1 + wind_factor) * temp_factor * (1 - humidity_factor)
+            predicted_area = np.where(predicted_area > 0, predicted_area, 0.0)
+
+        areas = FirePredictor._round_area(predicted_area)
+        # 低风险不预测面积
+        areas[risk_levels == 'low'] = 0.0
+        return areas
+
+    @staticmethod
+    @metrics.track_calls('predict_batch')
+    def predict_batch(wind_speed, temperature, humidity, thresholds=None):
+        """
+        一次向量化计算批量数据的风险等级和预测面积
+
+        返回:
+        - (risk_levels, areas): 风险等级数组和预测面积数组
+        """
+        wind_speed, temperature, humidity = FirePredictor._coerce_batch(wind_speed, temperature, humidity)
+        risk_levels = FirePredictor.predict_risk_batch(wind_speed, temperature, humidity, thresholds)
+        areas = FirePredictor.predict_fire_area_batch(wind_speed, temperature, humidity, risk_levels)
+        return risk_levels, areas
+
+    @staticmethod
+    def predict_records(records, thresholds=None):
+        """
+        批量预测监测记录列表 (MonitorRecord 对象或包含相同字段的字典)
+
+        返回:
+        - (risk_levels, areas): 风险等级数组和预测面积数组
+        """
+        def field(record, name):
+            if isinstance(record, dict):
+                return record.get(name)
+            return getattr(record, name, None)
+
+        return FirePredictor.predict_batch(
+            [field(record, 'wind_speed') for record in records],
+            [field(record, 'temperature') for record in records],
+            [field(record, 'humidity') for record in records],
+            thresholds
+        )
+
+    @staticmethod
+    @metrics.track_calls('analyze_monitor_data')
+    def analyze_monitor_data(monitor_point_id=None):
+        """
+        分析监测点数据，生成火灾风险评估
+        
+        参数:
+        - monitor_point_id: 监测点ID，若不提供则分析所有监测点的最新数据
+        
+        返回:
+        - results: 分析结果列表
+        """
+        results = []
+        
+        try:
+            # 获取阈值设置
+            threshold = get_active_threshold()
+            
+            # 查询监测数据 (读取最新数据快照表，每个监测点一行)
+            query = LatestReading.with_point()
+            if monitor_point_id:
+                # 获取指定监测点的最新数据
+                query = query.filter_by(monitor_point_id=monitor_point_id)
+            records = query.order_by(LatestReading.monitor_point_id).all()
+            
+            if not records:
+                return results
+            
+            results = FirePredictor.analyze_records(records, threshold)
+        except Exception as e:
+            print(f"分析监测数据时发生错误: {str(e)}")
+            # 在出错时返回空结果，而不是中断程序
+            
+        return results
+
+    @staticmethod
+    def analyze_records(records, thresholds=None):
+        """
+        对已加载的最新数据快照 (LatestReading 对象，需附带监测点) 生成火灾风险评估
+        
+        返回:
+        - results: 分析结果列表，格式与 analyze_monitor_data 相同
+        """
+        results = []
+        
+        # 一次向量化计算所有记录的风险等级和预测面积
+        risk_levels, predicted_areas = FirePredictor.predict_records(records, thresholds)
+        
+        # 整理每条记录的分析结果
+        for record, risk_level, predicted_area in zip(records, risk_levels, predicted_areas.tolist()):
+            try:
+                # 添加结果
+                results.append({
+                    'monitor_point_id': record.monitor_point_id,
+                    'monitor_point_name': record.monitor_point.name,
+                    'wind_speed': record.wind_speed,
+                    'temperature': record.temperature,
+                    'humidity': record.humidity,
+                    'risk_level': risk_level,
+                    'predicted_area': predicted_area,
+                    'timestamp': record.timestamp,
+                    'latitude': record.monitor_point.latitude,
+                    'longitude': record.monitor_point.longitude
+                })
+            except Exception as e:
+                print(f"分析监测记录时发生错误: {str(e)}")
+                # 跳过有问题的记录，继续处理其他记录
+                continue
+        
         return results 
\ No newline at end of file
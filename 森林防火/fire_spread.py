@@ -0,0 +1,254 @@
+"""
+森林火灾蔓延模拟 (元胞自动机)
+
+FirePredictor.predict_fire_area 只给出一个由风速/温度/湿度因子估算的面积，
+这里以监测点为起火点，在其周围的规则网格上模拟火势随时间的蔓延:
+
+- 网格状态为 可燃 / 燃烧中 / 已燃尽，燃烧中的网格每一步以一定概率引燃 8 个相邻的可燃网格，
+  周围没有可燃网格后转为已燃尽
+- 火头蔓延速度由 McArthur Mk5 森林火险指数 (风速、湿度、温度) 计算，其他方向的速度按
+  椭圆形火场 (长宽比由风速决定，起火点位于后焦点) 折算；每一步向某个方向的引燃概率
+  = 该方向的蔓延速度 × 步长 / 相邻网格距离，步长取使最大概率为 1 的时间 (只由蔓延速度决定，与快照间隔无关)
+- 每一步只处理燃烧中的网格 (火线)，用下标数组一次计算所有 "燃烧网格 × 相邻方向" 的引燃，
+  计算量与火线长度而不是网格大小成正比，1000×1000 的网格模拟数小时也只需几百毫秒
+
+没有植被和地形数据，整个网格视为均匀的林下可燃物；结果是随机模拟，可通过 seed 复现。
+
+简化: "燃烧中" 表示网格处于火线上，而不是有明火燃烧的时长。网格在引燃全部相邻可燃网格之前不会熄灭，
+没有按火焰驻留时间燃尽 —— 各方向的蔓延速度已经决定了火线推进的快慢，若再按驻留时间熄灭，
+逆风和侧风方向 (引燃概率低) 的火线会提前中断，火场形状偏离椭圆模型。因此模拟结果是
+不考虑扑救和可燃物差异时的过火范围上限。
+"""
+import math
+import numpy as np
+
+# 网格状态
+FUEL = 0
+BURNING = 1
+BURNED = 2
+
+# 默认网格边长 (网格数) 和最大边长
+DEFAULT_GRID_SIZE = 1000
+MAX_GRID_SIZE = 1000
+
+# 默认网格边长 (米)
+DEFAULT_CELL_SIZE_M = 30.0
+
+# 默认和最长模拟时长 (小时)
+DEFAULT_HOURS = 6.0
+MAX_HOURS = 24.0
+
+# 默认快照间隔 (分钟)
+DEFAULT_SNAPSHOT_MINUTES = 60.0
+
+# McArthur 火险指数的干旱因子 (1~10) 和可燃物载量 (吨/公顷)
+DROUGHT_FACTOR = 10.0
+FUEL_LOAD_T_HA = 15.0
+
+# 火场轮廓按起火点方位划分的扇区数 (每个扇区取最远的边界网格作为轮廓顶点)
+PERIMETER_BINS = 72
+
+# 每度纬度/赤道上每度经度的长度 (米)
+METERS_PER_DEG_LAT = 110574.0
+METERS_PER_DEG_LON = 111320.0
+
+# 8 个相邻方向: (行偏移, 列偏移)，行号向南增加
+NEIGHBOR_OFFSETS = np.array([
+    (-1, 0), (-1, 1), (0, 1), (1, 1),
+    (1, 0), (1, -1), (0, -1), (-1, -1)
+])
+
+def head_spread_rate(wind_speed, temperature, humidity):
+    """
+    火头蔓延速度 (米/分钟)
+
+    McArthur Mk5 森林火险指数:
+    FFDI = 2·exp(-0.45 + 0.987·ln(D) - 0.0345·H + 0.0338·T + 0.0234·V)，V 为风速 (km/h)，
+    火头速度 (km/h) = 0.0012·FFDI·W，W 为可燃物载量
+    """
+    humidity = min(100.0, max(0.0, humidity))
+    wind_kmh = max(0.0, wind_speed) * 3.6
+    ffdi = 2 * math.exp(-0.45 + 0.987 * math.log(DROUGHT_FACTOR) - 0.0345 * humidity
+                        + 0.0338 * temperature + 0.0234 * wind_kmh)
+    return 0.0012 * ffdi * FUEL_LOAD_T_HA * 1000 / 60
+
+def spread_rates(wind_speed, wind_direction, temperature, humidity):
+    """
+    8 个相邻方向的蔓延速度 (米/分钟)，顺序与 NEIGHBOR_OFFSETS 相同
+
+    火场长宽比 LB = 1 + 8.729·(1 - exp(-0.030·V))^2.155 (Alexander, 1985)，
+    偏心率 e = sqrt(1 - 1/LB²)，与下风向夹角 θ 方向的速度 = 火头速度·(1-e)/(1-e·cosθ)
+
+    参数:
+    - wind_speed: 风速 (m/s)
+    - wind_direction: 风向 (度，气象习惯: 风的来向，0=北风，90=东风)
+    - temperature: 温度 (°C)
+    - humidity: 湿度 (%)
+    """
+    head = head_spread_rate(wind_speed, temperature, humidity)
+    wind_kmh = max(0.0, wind_speed) * 3.6
+    length_to_breadth = 1 + 8.729 * (1 - math.exp(-0.030 * wind_kmh)) ** 2.155
+    eccentricity = math.sqrt(1 - 1 / length_to_breadth ** 2)
+
+    # 各方向的方位角 (度，正北为0，顺时针) 与下风向的夹角
+    bearings = np.degrees(np.arctan2(NEIGHBOR_OFFSETS[:, 1], -NEIGHBOR_OFFSETS[:, 0]))
+    theta = np.radians(bearings - (wind_direction + 180.0))
+    return head * (1 - eccentricity) / (1 - eccentricity * np.cos(theta))
+
+def spread_probabilities(rates, cell_size_m, max_step_minutes):
+    """
+    由各方向的蔓延速度确定步长和每一步的引燃概率
+
+    返回:
+    - (step_minutes, probabilities): 步长不超过 max_step_minutes，且任一方向的概率不超过 1
+    """
+    distances = cell_size_m * np.hypot(NEIGHBOR_OFFSETS[:, 0], NEIGHBOR_OFFSETS[:, 1])
+    step_minutes = min(max_step_minutes, float(np.min(distances / rates)))
+    return step_minutes, np.minimum(rates * step_minutes / distances, 1.0)
+
+def _neighbors(cells, size):
+    """网格 (展平下标) 的 8 个相邻网格: 返回 (下标, 是否在网格内)，形状为 (len(cells), 8)"""
+    rows, cols = np.divmod(cells, size)
+    target_rows = rows[:, None] + NEIGHBOR_OFFSETS[:, 0]
+    target_cols = cols[:, None] + NEIGHBOR_OFFSETS[:, 1]
+    inside = (target_rows >= 0) & (target_rows < size) & (target_cols >= 0) & (target_cols < size)
+    return target_rows * size + target_cols, inside
+
+def _ignite(flat_state, burning, size, probabilities, rng):
+    """一步蔓延: 返回新引燃网格的下标 (state 的展平下标)"""
+    # 所有 "燃烧网格 × 方向" 组合一次计算
+    targets, inside = _neighbors(burning, size)
+    hit = inside & (rng.random(targets.shape) < probabilities)
+    targets = np.unique(targets[hit])
+    return targets[flat_state[targets] == FUEL]
+
+def _has_fuel_nearby(flat_state, cells, size):
+    """各网格是否还有可燃的相邻网格"""
+    targets, inside = _neighbors(cells, size)
+    fuel = np.zeros(targets.shape, dtype=bool)
+    fuel[inside] = flat_state[targets[inside]] == FUEL
+    return fuel.any(axis=1)
+
+def _cell_offsets_m(rows, cols, center, cell_size_m):
+    """网格中心相对起火点的 (东向, 北向) 偏移 (米)"""
+    return (cols - center) * cell_size_m, (center - rows) * cell_size_m
+
+def _snapshot(state, burn_box, center, cell_size_m, latitude, longitude):
+    """统计当前火场: 过火面积、燃烧面积、火线长度和火场轮廓"""
+    cell_area_km2 = (cell_size_m / 1000) ** 2
+    top, bottom, left, right = burn_box
+    # 向外多取一圈，便于判断边界网格
+    top, left = max(top - 1, 0), max(left - 1, 0)
+    window = state[top:bottom + 2, left:right + 2]
+
+    fire = window != FUEL
+    padded = np.pad(fire, 1, constant_values=False)
+    # 火场与可燃区之间的边数 (4 邻接)
+    edges = np.count_nonzero(padded[1:, :] != padded[:-1, :]) + np.count_nonzero(padded[:, 1:] != padded[:, :-1])
+
+    # 边界网格: 自身已着火且至少一个 4 邻接网格未着火
+    inner = padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:]
+    rows, cols = np.nonzero(fire & ~inner)
+    east, north = _cell_offsets_m(rows + top, cols + left, center, cell_size_m)
+
+    # 每个方位扇区取离起火点最远的边界网格，按方位排列成轮廓多边形
+    bins = ((np.degrees(np.arctan2(east, north)) % 360) * PERIMETER_BINS / 360).astype(np.intp)
+    distances = np.hypot(east, north)
+    order = np.lexsort((distances, bins))
+    last = np.r_[np.flatnonzero(np.diff(bins[order])), len(order) - 1] if len(order) else order
+    chosen = order[last]
+
+    lat_per_m = 1 / METERS_PER_DEG_LAT
+    lon_per_m = 1 / (METERS_PER_DEG_LON * math.cos(math.radians(latitude)))
+    perimeter = [
+        [round(latitude + n * lat_per_m, 6), round(longitude + e * lon_per_m, 6)]
+        for e, n in zip(east[chosen].tolist(), north[chosen].tolist())
+    ]
+
+    return {
+        'burned_area_km2': round(np.count_nonzero(fire) * cell_area_km2, 4),
+        'burning_area_km2': round(np.count_nonzero(window == BURNING) * cell_area_km2, 4),  # 火线
+        'perimeter_km': round(edges * cell_size_m / 1000, 3),
+        'perimeter': perimeter
+    }
+
+def simulate_spread(latitude, longitude, wind_speed, humidity, temperature=25.0, wind_direction=0.0,
+                    hours=DEFAULT_HOURS, grid_size=DEFAULT_GRID_SIZE, cell_size_m=DEFAULT_CELL_SIZE_M,
+                    snapshot_minutes=DEFAULT_SNAPSHOT_MINUTES, seed=None):
+    """
+    以指定位置为起火点模拟火灾蔓延
+
+    参数:
+    - latitude, longitude: 起火点 (网格中心) 坐标
+    - wind_speed, humidity, temperature: 风速 (m/s)、湿度 (%)、温度 (°C)
+    - wind_direction: 风向 (度，风的来向)
+    - hours: 模拟时长 (小时)
+    - grid_size: 网格边长 (网格数)
+    - cell_size_m: 每个网格的边长 (米)
+    - snapshot_minutes: 快照间隔 (分钟)，在到达每个快照时刻后的第一步生成快照 (时间为该步结束的时刻)，
+      最后一步总会生成快照；只影响输出的快照，不影响模拟本身
+    - seed: 随机数种子，相同参数和种子的结果相同
+
+    火场烧到网格边界后停止模拟 (之后的面积会被网格截断)，此时 reached_boundary 为 True
+
+    返回:
+    - result: 火头速度、步长、最终过火面积、是否烧到网格边界，以及按时间排列的快照列表
+    """
+    rng = np.random.default_rng(seed)
+    rates = spread_rates(wind_speed, wind_direction, temperature, humidity)
+
+    # 步长只由蔓延速度决定 (任一方向的引燃概率不超过 1)，模拟结果与快照间隔无关
+    total_minutes = hours * 60.0
+    step_minutes, probabilities = spread_probabilities(rates, cell_size_m, total_minutes)
+    total_steps = math.ceil(total_minutes / step_minutes - 1e-9)
+    # 到达或越过每个快照时刻后的第一步生成快照
+    next_snapshot = min(snapshot_minutes, total_minutes)
+
+    state = np.zeros((grid_size, grid_size), dtype=np.uint8)
+    flat_state = state.ravel()
+    center = grid_size // 2
+    ignition = center * grid_size + center
+    flat_state[ignition] = BURNING
+
+    # 燃烧中的网格 (火线)
+    burning = np.array([ignition], dtype=np.int64)
+    # 已着火区域的外接矩形: [top, bottom, left, right]
+    burn_box = [center, center, center, center]
+    reached_boundary = False
+
+    snapshots = []
+    step = 0
+
+    while step < total_steps and len(burning) and not reached_boundary:
+        step += 1
+        ignited = _ignite(flat_state, burning, grid_size, probabilities, rng)
+
+        if len(ignited):
+            flat_state[ignited] = BURNING
+            burning = np.concatenate([burning, ignited])
+            rows, cols = np.divmod(ignited, grid_size)
+            burn_box = [min(burn_box[0], int(rows.min())), max(burn_box[1], int(rows.max())),
+                        min(burn_box[2], int(cols.min())), max(burn_box[3], int(cols.max()))]
+            reached_boundary = burn_box[0] == 0 or burn_box[2] == 0 or \
+                burn_box[1] == grid_size - 1 or burn_box[3] == grid_size - 1
+
+        # 周围已没有可燃网格的燃烧网格转为已燃尽，火线只保留仍能蔓延的网格
+        active = _has_fuel_nearby(flat_state, burning, grid_size)
+        flat_state[burning[~active]] = BURNED
+        burning = burning[active]
+
+        elapsed = min(step * step_minutes, total_minutes)
+        if elapsed >= next_snapshot - 1e-9 or step == total_steps or not len(burning) or reached_boundary:
+            snapshot = _snapshot(state, burn_box, center, cell_size_m, latitude, longitude)
+            snapshot['minutes'] = round(elapsed, 2)
+            snapshots.append(snapshot)
+            while next_snapshot <= elapsed + 1e-9:
+                next_snapshot += snapshot_minutes
+
+    return {
+        'head_spread_rate_m_min': round(float(rates.max()), 3),
+        'step_minutes': round(step_minutes, 4),
+        'burned_area_km2': snapshots[-1]['burned_area_km2'],
+        'reached_boundary': reached_boundary,
+        'snapshots': snapshots
+    }
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+火灾数据统计计数的增量维护
+
+/api/stats/summary 和 /api/stats/fire-count 原来每次请求都对 fire_data 全表 COUNT/AVG，
+耗时随历史数据线性增长。这里按 (日期, 风险等级) 维护 fire_daily_stat 计数表，
+火灾数据写入和删除时在同一事务中原子地加减计数，统计查询只需汇总每天的几行数据。
+
+按时间范围统计时，范围起点所在的那一天只包含一部分数据，这部分仍从原始记录计数，
+扫描范围不超过一天，可以使用 (timestamp, risk_level) 索引。
+"""
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import FireData, FireDailyStat, db
+from cache_versions import bump_version
+
+# 火灾数据对应的缓存版本名 (依赖火灾数据的接口缓存，如统计接口的 ETag)
+FIRE_DATA_VERSION = 'fire_data'
+
+def mark_changed():
+    """火灾数据写入或删除并提交后调用，使所有 worker 中依赖火灾数据的缓存失效"""
+    bump_version(FIRE_DATA_VERSION)
+
+def _increment(day, risk_level, count, area_sum, area_count):
+    """原子地调整某天某个风险等级的计数，计数行不存在时新建"""
+    table = FireDailyStat.__table__
+    update = table.update().where(
+        db.and_(table.c.day == day, table.c.risk_level == risk_level)
+    ).values(
+        count=table.c.count + count,
+        positive_area_sum=table.c.positive_area_sum + area_sum,
+        positive_area_count=table.c.positive_area_count + area_count
+    )
+
+    if db.session.execute(update).rowcount:
+        return
+
+    # 计数行不存在: 插入新行，并发插入冲突时退回到更新
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(
+                day=day,
+                risk_level=risk_level,
+                count=count,
+                positive_area_sum=area_sum,
+                positive_area_count=area_count
+            ))
+    except IntegrityError:
+        db.session.execute(update)
+
+def _area_values(fire_data):
+    """火灾数据对平均面积统计的贡献: (面积, 条数)，只统计预测面积大于0的数据"""
+    area = fire_data.predicted_area
+    if area is not None and area > 0:
+        return area, 1
+    return 0.0, 0
+
+def record_fire_data(fire_data):
+    """
+    把新写入的火灾数据 (ORM对象) 计入统计，不提交事务
+    """
+    db.session.flush()
+    area_sum, area_count = _area_values(fire_data)
+    _increment(fire_data.timestamp.date(), fire_data.risk_level, 1, area_sum, area_count)
+
+def remove_fire_data(fire_data):
+    """
+    从统计中扣除将被删除的火灾数据 (ORM对象)，不提交事务
+    """
+    if fire_data.timestamp is None:
+        return
+    area_sum, area_count = _area_values(fire_data)
+    _increment(fire_data.timestamp.date(), fire_data.risk_level, -1, -area_sum, -area_count)
+
+def count_by_risk(since):
+    """
+    统计 since 之后各风险等级的火灾数据条数
+
+    since 之后的整天直接汇总计数表，since 所在的当天从原始记录计数
+
+    返回:
+    - {risk_level: count}
+    """
+    first_day = since.date()
+    next_midnight = datetime.combine(first_day + timedelta(days=1), datetime.min.time())
+
+    counts = {}
+    full_days = db.session.query(
+        FireDailyStat.risk_level,
+        db.func.sum(FireDailyStat.count)
+    ).filter(
+        FireDailyStat.day > first_day
+    ).group_by(FireDailyStat.risk_level)
+
+    partial_day = db.session.query(
+        FireData.risk_level,
+        db.func.count(FireData.id)
+    ).filter(
+        FireData.timestamp >= since,
+        FireData.timestamp < next_midnight
+    ).group_by(FireData.risk_level)
+
+    for query in (full_days, partial_day):
+        for risk_level, count in query:
+            if count:
+                counts[risk_level] = counts.get(risk_level, 0) + int(count)
+
+    return counts
+
+def totals():
+    """
+    全部火灾数据的汇总
+
+    返回:
+    - (count, avg_area): 总条数，以及预测面积大于0的数据的平均面积 (没有时为 None)
+    """
+    count, area_sum, area_count = db.session.query(
+        db.func.sum(FireDailyStat.count),
+        db.func.sum(FireDailyStat.positive_area_sum),
+        db.func.sum(FireDailyStat.positive_area_count)
+    ).one()
+
+    avg_area = area_sum / area_count if area_count else None
+    return int(count or 0), avg_area
+
+def rebuild_all():
+    """
+    从全部火灾数据重建计数表，不提交事务
+
+    只在初始化或回填已有数据库时使用，会扫描整个火灾数据表
+    """
+    FireDailyStat.query.delete(synchronize_session=False)
+
+    day = db.func.date(FireData.timestamp).label('day')
+    positive = FireData.predicted_area > 0
+    results = db.session.query(
+        day,
+        FireData.risk_level,
+        db.func.count(FireData.id),
+        db.func.sum(db.case((positive, FireData.predicted_area), else_=0)),
+        db.func.sum(db.case((positive, 1), else_=0))
+    ).filter(
+        FireData.timestamp.isnot(None)
+    ).group_by(day, FireData.risk_level)
+
+    mappings = []
+    for result_day, risk_level, count, area_sum, area_count in results:
+        if isinstance(result_day, str):
+            result_day = datetime.strptime(result_day, '%Y-%m-%d').date()
+        mappings.append({
+            'day': result_day,
+            'risk_level': risk_level,
+            'count': count,
+            'positive_area_sum': float(area_sum or 0),
+            'positive_area_count': int(area_count or 0)
+        })
+    db.session.bulk_insert_mappings(FireDailyStat, mappings)
\ No newline at end of file
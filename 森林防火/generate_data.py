@@ -0,0 +1,291 @@
+"""
+生成模拟监测数据 (用于压力测试和性能调优)
+
+新建 N 个监测点，每个监测点生成 M 条等间隔的监测记录:
+- 温度: 按纬度的基准温度 + 季节变化 + 日变化 (地方太阳时 15 时最高) + 数日尺度的天气过程 + 噪声
+- 湿度: 与温度的日变化和天气过程反相，限制在 5%~100%
+- 风速: 午后较大的日变化 + 随机起伏，偶发阵风
+
+数据按块用 numpy 批量生成，SQLite 直接通过 DB-API executemany 插入，其他数据库使用 SQLAlchemy 批量插入；
+最新数据快照和小时/天聚合表在同一事务中直接计算写入，不需要事后全表回填。
+每块数据单独提交，中断后已提交的监测点数据完整可用。
+新建数据库 (--fresh) 时先删除监测记录表的索引，全部写入后再重建；中断后可执行 flask upgrade-db 补建索引。
+
+用法:
+    python generate_data.py --points 1000 --readings 10000
+    python generate_data.py --points 2000 --readings 20000 --interval 5 --database /data/load_test.db --fresh
+
+默认追加到应用配置的数据库 (DATABASE_URI)；生成期间不要通过接口新建监测点。
+"""
+import os
+import time
+from datetime import datetime, timedelta
+import click
+import numpy as np
+from models import db, MonitorPoint, MonitorRecord
+from rollups import ROLLUP_MODELS, MEASURES
+from spatial_index import invalidate_spatial_index
+from migrations import ensure_indexes
+import latest_readings
+
+# 每块 (一次提交) 生成的最大记录数，每个监测点的记录总在同一块中
+CHUNK_ROWS = 200000
+
+# 每条记录出现阵风的概率和阵风附加风速的均值 (m/s)
+GUST_PROBABILITY = 0.02
+GUST_MEAN = 6.0
+# 风速上限 (m/s)
+MAX_WIND_SPEED = 40.0
+
+# 天气过程 (数日尺度的起伏) 的叠加个数和周期范围 (小时)
+WEATHER_WAVES = 3
+WEATHER_PERIOD_HOURS = (48, 240)
+
+# 生成监测点的范围 (纬度, 经度)
+LATITUDE_RANGE = (22.0, 48.0)
+LONGITUDE_RANGE = (98.0, 130.0)
+
+def _weather(rng, hours, points, amplitude):
+    """数日尺度的天气过程: 几个随机周期和相位的正弦波叠加，返回 (监测点, 时间) 数组"""
+    periods = rng.uniform(*WEATHER_PERIOD_HOURS, (points, WEATHER_WAVES, 1))
+    phases = rng.uniform(0, 2 * np.pi, (points, WEATHER_WAVES, 1))
+    amplitudes = rng.uniform(0.3, 1.0, (points, WEATHER_WAVES, 1)) * amplitude / WEATHER_WAVES
+    return (amplitudes * np.sin(2 * np.pi * hours / periods + phases)).sum(axis=1)
+
+def simulate_readings(rng, latitudes, longitudes, timestamps):
+    """
+    按气象规律生成一组监测点在同一组时间的监测值
+
+    参数:
+    - rng: numpy 随机数生成器
+    - latitudes / longitudes: 监测点经纬度数组 (P,)
+    - timestamps: UTC 时间数组 (M,)，datetime64
+
+    返回:
+    - (wind_speed, temperature, humidity): 保留一位小数的 (P, M) 数组
+    """
+    points = len(latitudes)
+    size = (points, len(timestamps))
+    latitudes = np.asarray(latitudes, dtype=float)[:, None]
+    longitudes = np.asarray(longitudes, dtype=float)[:, None]
+
+    hours = (timestamps - np.datetime64('1970-01-01T00:00:00')) / np.timedelta64(1, 'h')
+    day_of_year = (timestamps.astype('datetime64[D]') - timestamps.astype('datetime64[Y]')).astype(int)
+
+    # 日变化: 地方太阳时 15 时为 1，3 时为 -1
+    solar_hour = (hours[None, :] + longitudes / 15.0) % 24
+    diurnal = np.cos(2 * np.pi * (solar_hour - 15) / 24)
+    # 季节变化: 7 月中旬最高，纬度越高年较差越大
+    seasonal = np.cos(2 * np.pi * (day_of_year[None, :] - 196) / 365.25)
+    seasonal_amplitude = np.clip(5.0 + 0.4 * (latitudes - 20), 3.0, 18.0)
+
+    base_temperature = 24.0 - 0.6 * (latitudes - 20) + rng.normal(0, 1.5, (points, 1))
+    daily_amplitude = rng.uniform(3.0, 8.0, (points, 1))
+    weather_temperature = _weather(rng, hours, points, 6.0)
+    temperature = (base_temperature + seasonal_amplitude * seasonal + daily_amplitude * diurnal
+                   + weather_temperature + rng.normal(0, 0.4, size))
+
+    base_humidity = rng.uniform(50.0, 80.0, (points, 1))
+    humidity = (base_humidity - 2.0 * (daily_amplitude * diurnal + weather_temperature)
+                + _weather(rng, hours, points, 10.0) + rng.normal(0, 3.0, size))
+    humidity = np.clip(humidity, 5.0, 100.0)
+
+    base_wind = rng.uniform(1.5, 5.0, (points, 1))
+    wind_speed = base_wind * (1 + 0.4 * diurnal) * (1 + _weather(rng, hours, points, 0.6)) \
+        * rng.lognormal(0, 0.25, size)
+    gusts = rng.random(size) < GUST_PROBABILITY
+    wind_speed[gusts] += rng.exponential(GUST_MEAN, int(gusts.sum()))
+    wind_speed = np.clip(wind_speed, 0.0, MAX_WIND_SPEED)
+
+    return wind_speed.round(1), temperature.round(1), humidity.round(1)
+
+def _insert_points(rng, count):
+    """在现有最大ID之后新建监测点，返回 (ID, 纬度, 经度) 数组"""
+    first_id = (db.session.query(db.func.max(MonitorPoint.id)).scalar() or 0) + 1
+    point_ids = np.arange(first_id, first_id + count)
+    latitudes = rng.uniform(*LATITUDE_RANGE, count).round(4)
+    longitudes = rng.uniform(*LONGITUDE_RANGE, count).round(4)
+    now = datetime.utcnow()
+    db.session.execute(MonitorPoint.__table__.insert(), [
+        {'id': point_id, 'name': f'模拟监测点{point_id}', 'latitude': lat, 'longitude': lon,
+         'created_at': now, 'active': True}
+        for point_id, lat, lon in zip(point_ids.tolist(), latitudes.tolist(), longitudes.tolist())
+    ])
+    db.session.commit()
+    return point_ids, latitudes, longitudes
+
+def _bulk_insert(table, columns):
+    """
+    在当前事务中批量插入
+
+    参数:
+    - columns: {列名: 值列表}，各列表长度相同
+
+    SQLite 绕过 SQLAlchemy 的逐行参数处理直接调用 DB-API executemany，
+    时间等需要转换的列按 SQLAlchemy 的存储格式转换 (相同的值只转换一次)
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect
+    names = list(columns)
+    if dialect.name != 'sqlite':
+        connection.execute(table.insert(), [dict(zip(names, row)) for row in zip(*columns.values())])
+        return
+
+    values = []
+    for name, column in columns.items():
+        processor = table.c[name].type.dialect_impl(dialect).bind_processor(dialect)
+        if processor is not None:
+            converted = {value: processor(value) for value in set(column)}
+            column = [converted[value] for value in column]
+        values.append(column)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.executemany(
+            f"INSERT INTO {table.name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            zip(*values)
+        )
+    finally:
+        cursor.close()
+
+def _insert_records(point_ids, timestamps, wind_speed, temperature, humidity):
+    """插入一块监测记录 (每个监测点的记录按时间顺序连续排列)"""
+    _bulk_insert(MonitorRecord.__table__, {
+        'monitor_point_id': np.repeat(point_ids, len(timestamps)).tolist(),
+        'wind_speed': wind_speed.ravel().tolist(),
+        'temperature': temperature.ravel().tolist(),
+        'humidity': humidity.ravel().tolist(),
+        'timestamp': timestamps * len(point_ids)
+    })
+
+def _insert_rollups(point_ids, timestamps64, measures):
+    """
+    直接按时间桶聚合一块数据写入聚合表
+
+    生成的监测点都是新建的，不存在需要合并的已有聚合行；所有监测点的时间相同，
+    时间桶边界只需计算一次，再用 reduceat 按行聚合
+    """
+    for period, model in ROLLUP_MODELS.items():
+        keys = timestamps64.astype('datetime64[h]' if period == 'hour' else 'datetime64[D]')
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+        counts = np.diff(np.append(starts, len(keys))).tolist()
+
+        columns = {
+            'monitor_point_id': np.repeat(point_ids, len(starts)).tolist(),
+            'bucket_start': keys[starts].astype('datetime64[us]').tolist() * len(point_ids),
+            'count': counts * len(point_ids)
+        }
+        for measure, values in zip(MEASURES, measures):
+            columns[f'{measure}_min'] = np.minimum.reduceat(values, starts, axis=1).ravel().tolist()
+            columns[f'{measure}_max'] = np.maximum.reduceat(values, starts, axis=1).ravel().tolist()
+            columns[f'{measure}_sum'] = np.add.reduceat(values, starts, axis=1).round(4).ravel().tolist()
+        _bulk_insert(model.__table__, columns)
+
+def generate(points, readings_per_point, interval=timedelta(minutes=10), end=None, seed=None, defer_indexes=False):
+    """
+    新建监测点并生成监测记录 (需在应用上下文中调用，数据表需已创建)
+
+    参数:
+    - points: 新建的监测点数
+    - readings_per_point: 每个监测点的监测记录数
+    - interval: 相邻两条记录的时间间隔
+    - end: 最后一条记录的时间 (UTC)，默认为当前时间
+    - seed: 随机种子，相同参数和种子生成相同的数据
+    - defer_indexes: 写入前删除监测记录表的索引，全部写入后再重建 (大批量写入时快数倍，
+      但期间按时间和监测点的查询都要全表扫描，只适合没有服务在使用的数据库)
+
+    返回:
+    - 新建监测点的ID列表
+    """
+    rng = np.random.default_rng(seed)
+    end = (end or datetime.utcnow()).replace(microsecond=0)
+    step = np.timedelta64(int(interval.total_seconds()), 's')
+    timestamps64 = np.datetime64(end, 's') - step * np.arange(readings_per_point - 1, -1, -1)
+    timestamps = timestamps64.astype('datetime64[us]').tolist()
+
+    point_ids, latitudes, longitudes = _insert_points(rng, points)
+    invalidate_spatial_index()
+    print(f"已新建 {points} 个监测点 (ID {point_ids[0] if points else '-'} ~ {point_ids[-1] if points else '-'})")
+    if readings_per_point <= 0 or points <= 0:
+        return point_ids.tolist()
+
+    if defer_indexes:
+        for index in MonitorRecord.__table__.indexes:
+            index.drop(bind=db.engine, checkfirst=True)
+
+    # 每个监测点最后一条记录作为最新数据快照；更新快照需按 (监测点, 时间) 查询记录ID，
+    # 推迟建索引时等索引重建后再统一更新
+    pending_latest = []
+    points_per_chunk = max(1, CHUNK_ROWS // readings_per_point)
+    total = points * readings_per_point
+    written = 0
+    started = time.perf_counter()
+    for first in range(0, points, points_per_chunk):
+        chunk = slice(first, first + points_per_chunk)
+        chunk_ids = point_ids[chunk]
+        wind_speed, temperature, humidity = simulate_readings(rng, latitudes[chunk], longitudes[chunk], timestamps64)
+        latest_rows = [
+            {'monitor_point_id': point_id, 'timestamp': timestamps[-1],
+             'wind_speed': w, 'temperature': t, 'humidity': h}
+            for point_id, w, t, h in zip(chunk_ids.tolist(), wind_speed[:, -1].tolist(),
+                                         temperature[:, -1].tolist(), humidity[:, -1].tolist())
+        ]
+
+        try:
+            _insert_records(chunk_ids, timestamps, wind_speed, temperature, humidity)
+            _insert_rollups(chunk_ids, timestamps64, (wind_speed, temperature, humidity))
+            if defer_indexes:
+                pending_latest += latest_rows
+            else:
+                latest_readings.apply_rows(latest_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        written += len(chunk_ids) * readings_per_point
+        elapsed = time.perf_counter() - started
+        print(f"已写入 {written}/{total} 条监测记录 ({written / elapsed:.0f} 条/秒)")
+
+    if defer_indexes:
+        ensure_indexes()
+        latest_readings.apply_rows(pending_latest)
+        db.session.commit()
+
+    latest_readings.mark_changed()
+    return point_ids.tolist()
+
+@click.command()
+@click.option('--points', type=click.IntRange(min=0), required=True, help='新建的监测点数')
+@click.option('--readings', type=click.IntRange(min=0), required=True, help='每个监测点的监测记录数')
+@click.option('--interval', type=click.FloatRange(min=0, min_open=True), default=10, show_default=True,
+              help='监测记录的时间间隔 (分钟)')
+@click.option('--end', help='最后一条记录的时间 (UTC)，默认为当前时间')
+@click.option('--seed', type=int, help='随机种子')
+@click.option('--database', help='目标数据库 (SQLAlchemy URI 或 SQLite 文件路径)，默认使用 DATABASE_URI')
+@click.option('--fresh', is_flag=True, help='先删除目标数据库中的所有表并重新初始化')
+@click.option('--defer-indexes', is_flag=True, help='写入完成后再重建监测记录表的索引 (使用 --fresh 时默认开启)')
+@click.option('--yes', is_flag=True, help='使用 --fresh 时不再确认')
+def main(points, readings, interval, end, seed, database, fresh, defer_indexes, yes):
+    """生成模拟监测点和监测数据"""
+    from app import create_app, setup_database
+    from ingest import parse_timestamp
+
+    config = {}
+    if database:
+        config['SQLALCHEMY_DATABASE_URI'] = database if '://' in database else f'sqlite:///{os.path.abspath(database)}'
+    end = parse_timestamp(end) if end else None
+
+    with create_app(config).app_context():
+        print(f"目标数据库: {db.engine.url!r}")
+        if fresh:
+            if not yes:
+                click.confirm('将删除目标数据库中的所有数据，是否继续?', abort=True)
+            db.drop_all()
+        # 创建缺失的表和索引，新数据库同时创建默认管理员
+        setup_database()
+        generate(points, readings, timedelta(minutes=interval), end, seed, defer_indexes or fresh)
+    print("模拟数据生成完成")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
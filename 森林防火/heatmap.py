@@ -0,0 +1,279 @@
+"""
+火灾风险热力图瓦片
+
+把各监测点最新数据的风险等级 (0=low … 3=extreme) 用反距离加权 (IDW) 插值到规则的经纬度网格上，
+按 Web 墨卡托瓦片 (z/x/y，256×256 像素) 输出 PNG 图片或 JSON 数值网格。
+
+- 插值完全用 NumPy 数组计算，网格分块后每块只与附近的监测点计算距离矩阵
+- 只有 INFLUENCE_RADIUS_KM 以内的监测点参与插值，远离所有监测点的区域为透明
+- 生成的瓦片保存在进程内的 LRU 缓存中，缓存键包含最新数据、阈值和监测点三个版本号，
+  任一 worker 写入新的监测数据、修改阈值或监测点后，所有 worker 的旧瓦片自动失效
+- 缓存按占用的字节数 (TILE_CACHE_BYTES) 而不是瓦片数限制: PNG 瓦片缓存编码后的字节，
+  JSON 瓦片缓存 float32 数值网格 (256×256 约 256KB)，返回时再转换为列表
+"""
+import math
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+import numpy as np
+from flask import current_app
+from fire_prediction import FirePredictor, RISK_LEVELS
+from cache_versions import get_version
+from latest_readings import READINGS_VERSION
+from threshold_cache import THRESHOLD_VERSION
+from spatial_index import POINTS_VERSION
+
+# 瓦片边长 (像素)
+TILE_SIZE = 256
+
+# 支持的最大缩放级别
+MAX_ZOOM = 18
+
+# 监测点的影响半径 (公里)，超出所有监测点影响半径的像素为透明
+INFLUENCE_RADIUS_KM = 50.0
+
+# IDW 距离的幂次
+IDW_POWER = 2
+
+# 插值时网格分块的边长 (像素)，每块只使用附近的监测点
+BLOCK_SIZE = 32
+
+# 每次计算的 "像素数 × 监测点数" 上限
+MAX_CHUNK_CELLS = 2000000
+
+# 每个进程的瓦片缓存最多占用的字节数
+TILE_CACHE_BYTES = 64 * 1024 * 1024
+
+# 每度纬度/赤道上每度经度的长度 (公里)
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320
+
+# 风险值 (0~3) 对应的颜色: 绿 → 黄 → 橙 → 红
+COLOR_STOPS = np.array([0.0, 1.0, 2.0, 3.0])
+COLORS = np.array([
+    [0, 170, 0],
+    [255, 210, 0],
+    [255, 120, 0],
+    [200, 0, 0]
+], dtype=float)
+
+# 覆盖区域的最大不透明度
+MAX_ALPHA = 170
+
+RISK_SCORES = {level: float(score) for score, level in enumerate(RISK_LEVELS)}
+
+_lock = threading.Lock()
+
+def tile_bounds(z, x, y):
+    """瓦片的经纬度范围: (south, west, north, east)"""
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+def _pixel_centers(z, x, y, size):
+    """瓦片内各像素中心的纬度 (每行一个) 和经度 (每列一个)"""
+    n = 2 ** z
+    offsets = (np.arange(size) + 0.5) / size
+    lons = (x + offsets) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lats, lons
+
+def _interpolate_block(lats, lons, point_lats, point_lons, scores):
+    """对一小块网格做插值，返回展平的 (values, nearest_km)"""
+    grid_lats = np.repeat(lats, len(lons))[:, None]
+    grid_lons = np.tile(lons, len(lats))[:, None]
+    values = np.full(len(grid_lats), np.nan)
+    nearest_km = np.full(len(grid_lats), np.inf)
+
+    chunk = max(1, MAX_CHUNK_CELLS // max(len(scores), 1))
+    for start in range(0, len(grid_lats), chunk):
+        part_lats = grid_lats[start:start + chunk]
+        part_lons = grid_lons[start:start + chunk]
+
+        # 小范围内用等距圆柱投影近似距离 (平方)
+        dy = (part_lats - point_lats) * KM_PER_DEG_LAT
+        dx = (part_lons - point_lons) * KM_PER_DEG_LON * np.cos(np.radians(part_lats))
+        squared = dx * dx + dy * dy
+
+        # 权重 1/d^p，与监测点重合的像素近似取该点的值
+        weights = np.where(squared <= INFLUENCE_RADIUS_KM ** 2,
+                           np.maximum(squared, 1e-12) ** (-IDW_POWER / 2), 0.0)
+        total = weights.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values[start:start + chunk] = np.where(total > 0, weights @ scores / total, np.nan)
+        nearest_km[start:start + chunk] = np.sqrt(squared.min(axis=1))
+
+    return values, nearest_km
+
+def interpolate(lats, lons, point_lats, point_lons, scores):
+    """
+    在规则网格上做反距离加权插值
+
+    网格按 BLOCK_SIZE×BLOCK_SIZE 分块计算，每块只使用影响半径可能覆盖到该块的监测点
+
+    参数:
+    - lats, lons: 网格的行纬度和列经度 (一维)
+    - point_lats, point_lons, scores: 监测点坐标和风险值
+
+    返回:
+    - (values, nearest_km): 网格上的插值结果 (无覆盖处为 NaN) 和到最近监测点的距离
+    """
+    shape = (len(lats), len(lons))
+    values = np.full(shape, np.nan)
+    nearest_km = np.full(shape, np.inf)
+
+    for row in range(0, len(lats), BLOCK_SIZE):
+        block_lats = lats[row:row + BLOCK_SIZE]
+        lat_pad = INFLUENCE_RADIUS_KM / KM_PER_DEG_LAT
+        max_lat = min(np.abs(block_lats).max() + lat_pad, 89.9)
+        lon_pad = INFLUENCE_RADIUS_KM / (KM_PER_DEG_LON * math.cos(math.radians(max_lat)))
+        in_rows = (point_lats >= block_lats.min() - lat_pad) & (point_lats <= block_lats.max() + lat_pad)
+
+        for col in range(0, len(lons), BLOCK_SIZE):
+            block_lons = lons[col:col + BLOCK_SIZE]
+            nearby = in_rows & (point_lons >= block_lons.min() - lon_pad) & \
+                (point_lons <= block_lons.max() + lon_pad)
+            if not nearby.any():
+                continue
+
+            block_values, block_nearest = _interpolate_block(
+                block_lats, block_lons, point_lats[nearby], point_lons[nearby], scores[nearby])
+            block_shape = (len(block_lats), len(block_lons))
+            values[row:row + BLOCK_SIZE, col:col + BLOCK_SIZE] = block_values.reshape(block_shape)
+            nearest_km[row:row + BLOCK_SIZE, col:col + BLOCK_SIZE] = block_nearest.reshape(block_shape)
+
+    return values, nearest_km
+
+def colorize(values, nearest_km):
+    """把插值结果转换为 RGBA 图像，透明度随到最近监测点的距离减弱"""
+    covered = ~np.isnan(values)
+    filled = np.where(covered, values, 0.0)
+
+    rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(filled, COLOR_STOPS, COLORS[:, channel]).round()
+    fade = np.clip(1 - nearest_km / INFLUENCE_RADIUS_KM, 0, 1) ** 0.5
+    rgba[..., 3] = np.where(covered, MAX_ALPHA * fade, 0).round()
+    return rgba
+
+def encode_png(rgba):
+    """把 RGBA 图像 (H×W×4, uint8) 编码为 PNG"""
+    height, width = rgba.shape[:2]
+    # 每行前加一个字节的过滤类型 (0 = 不过滤)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)])
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)),
+        chunk(b'IEND', b'')
+    ])
+
+def _get_cache():
+    """获取当前应用的热力图缓存 (每个应用实例单独缓存)"""
+    return current_app.extensions.setdefault('heatmap_cache', {
+        'version': None,
+        'sources': None,
+        'tiles': OrderedDict(),
+        'bytes': 0
+    })
+
+def _tile_bytes(tile):
+    """缓存的瓦片占用的字节数 (PNG 字节或数值网格)"""
+    return tile.nbytes if isinstance(tile, np.ndarray) else len(tile)
+
+def _current_version():
+    return (get_version(READINGS_VERSION), get_version(THRESHOLD_VERSION), get_version(POINTS_VERSION))
+
+def _load_sources():
+    """各监测点的坐标和风险值 (来自 FirePredictor 对最新数据的评估)"""
+    results = FirePredictor.analyze_monitor_data()
+    return (
+        np.array([result['latitude'] for result in results], dtype=float),
+        np.array([result['longitude'] for result in results], dtype=float),
+        np.array([RISK_SCORES[result['risk_level']] for result in results], dtype=float)
+    )
+
+def _render(sources, z, x, y, fmt, size):
+    point_lats, point_lons, scores = sources
+    lats, lons = _pixel_centers(z, x, y, size)
+    values, nearest_km = interpolate(lats, lons, point_lats, point_lons, scores)
+
+    if fmt == 'png':
+        return encode_png(colorize(values, nearest_km))
+    # 风险值在 0~3 之间，float32 足以保留 3 位小数
+    return values.astype(np.float32)
+
+def _json_tile(z, x, y, size, values):
+    """把缓存的数值网格转换为 JSON 瓦片字典，没有监测点覆盖的网格为 None"""
+    rounded = np.round(values.astype(float), 3).astype(object)
+    rounded[np.isnan(values)] = None
+    south, west, north, east = tile_bounds(z, x, y)
+    return {
+        'z': z,
+        'x': x,
+        'y': y,
+        'size': size,
+        'bounds': [south, west, north, east],
+        'values': rounded.tolist()
+    }
+
+def get_tile(z, x, y, fmt='png', size=TILE_SIZE):
+    """
+    获取一个热力图瓦片 (优先读取缓存)
+
+    参数:
+    - z, x, y: 瓦片坐标，调用方需保证在有效范围内
+    - fmt: 'png' 返回 PNG 字节，'json' 返回数值网格字典
+    - size: 瓦片边长 (像素/网格数)
+    """
+    cache = _get_cache()
+    version = _current_version()
+    key = (z, x, y, fmt, size)
+
+    with _lock:
+        if cache['version'] != version:
+            cache['version'] = version
+            cache['sources'] = None
+            cache['tiles'].clear()
+            cache['bytes'] = 0
+
+        tile = cache['tiles'].get(key)
+        if tile is not None:
+            cache['tiles'].move_to_end(key)
+        sources = cache['sources']
+
+    if tile is None:
+        if sources is None:
+            sources = _load_sources()
+
+        tile = _render(sources, z, x, y, fmt, size)
+
+        with _lock:
+            # 计算期间版本未变化时才写入缓存
+            if cache['version'] == version:
+                cache['sources'] = sources
+                _cache_tile(cache, key, tile)
+
+    return tile if fmt == 'png' else _json_tile(z, x, y, size, tile)
+
+def _cache_tile(cache, key, tile):
+    """写入瓦片并按 LRU 淘汰，直到缓存不超过 TILE_CACHE_BYTES (需持有 _lock)"""
+    tiles = cache['tiles']
+    size = _tile_bytes(tile)
+    if size > TILE_CACHE_BYTES:
+        return
+    if key in tiles:
+        cache['bytes'] -= _tile_bytes(tiles.pop(key))
+    tiles[key] = tile
+    cache['bytes'] += size
+    while cache['bytes'] > TILE_CACHE_BYTES:
+        _, evicted = tiles.popitem(last=False)
+        cache['bytes'] -= _tile_bytes(evicted)
\ No newline at end of file
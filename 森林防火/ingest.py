@@ -0,0 +1,189 @@
+"""
+监测数据写入
+
+网关会成批推送监测数据，逐条 query.get + commit 的代价太高。
+这里一次查询校验所有监测点，按块使用 executemany 插入，并在一个事务中提交。
+所有监测记录的写入都经过本模块，以便在同一事务中维护最新数据快照和聚合表等派生数据。
+"""
+from datetime import datetime, timezone
+from models import MonitorPoint, MonitorRecord, db
+import latest_readings
+import rollups
+import events
+
+# 每个 executemany 语句插入的记录数
+INSERT_CHUNK_SIZE = 1000
+
+# IN 查询每次携带的参数个数 (低于旧版 SQLite 的 999 个参数上限)
+IN_QUERY_CHUNK_SIZE = 500
+
+# 单次请求允许提交的最大记录数
+MAX_BATCH_SIZE = 10000
+
+# 监测数据必填字段
+REQUIRED_FIELDS = ('monitor_point_id', 'wind_speed', 'temperature', 'humidity')
+
+def parse_timestamp(value):
+    """
+    解析监测时间，支持 '%Y-%m-%d %H:%M:%S' 和 ISO 8601 格式
+
+    带时区的时间会转换为UTC，并与数据库中的时间一样去掉时区信息
+    """
+    if isinstance(value, datetime):
+        timestamp = value
+    else:
+        text = str(value).strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        timestamp = datetime.fromisoformat(text)
+
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def parse_reading(data, default_timestamp=None):
+    """
+    校验并转换单条监测数据
+
+    返回:
+    - (row, error): 校验通过时 row 为可直接插入的字典、error 为 None，否则 row 为 None
+    """
+    if not isinstance(data, dict):
+        return None, '数据格式错误，每条记录应为JSON对象'
+
+    if not all(k in data for k in REQUIRED_FIELDS):
+        return None, '缺少必填字段'
+
+    try:
+        row = {
+            'monitor_point_id': int(data['monitor_point_id']),
+            'wind_speed': float(data['wind_speed']),
+            'temperature': float(data['temperature']),
+            'humidity': float(data['humidity'])
+        }
+    except (ValueError, TypeError):
+        return None, '输入数据格式错误，请确保监测点ID、风速、温度和湿度为数值类型'
+
+    if data.get('timestamp'):
+        try:
+            row['timestamp'] = parse_timestamp(data['timestamp'])
+        except (ValueError, TypeError):
+            return None, '时间格式错误，请使用 YYYY-MM-DD HH:MM:SS 或 ISO 8601 格式'
+    else:
+        row['timestamp'] = default_timestamp or datetime.utcnow()
+
+    return row, None
+
+def existing_point_ids(point_ids):
+    """一次性查询出给定ID中实际存在的监测点ID (按块发送IN查询)"""
+    point_ids = list(point_ids)
+    existing = set()
+    for start in range(0, len(point_ids), IN_QUERY_CHUNK_SIZE):
+        chunk = point_ids[start:start + IN_QUERY_CHUNK_SIZE]
+        existing.update(
+            point_id for (point_id,) in
+            db.session.query(MonitorPoint.id).filter(MonitorPoint.id.in_(chunk))
+        )
+    return existing
+
+def add_record(record):
+    """
+    写入单条监测记录 (ORM对象) 并维护派生数据 (不提交事务)
+    """
+    db.session.add(record)
+    db.session.flush()
+    latest_readings.apply_record(record)
+    rollups.apply_record(record)
+
+def insert_records(rows):
+    """
+    按块批量插入监测记录并维护派生数据 (不提交事务)
+
+    参数:
+    - rows: parse_reading 返回的字典列表
+    """
+    table = MonitorRecord.__table__
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(table.insert(), rows[start:start + INSERT_CHUNK_SIZE])
+
+    latest_readings.apply_rows(rows)
+    rollups.apply_rows(rows)
+
+def validate_readings(items, known_points=None):
+    """
+    校验并转换一批监测数据
+
+    参数:
+    - items: 监测数据列表，每项为包含 REQUIRED_FIELDS 的字典，可选 timestamp
+    - known_points: 已知存在的监测点ID (支持 in 判断的容器)，未提供时查询数据库
+
+    返回:
+    - (rows, errors): 可直接插入的字典列表，以及 [{'index': 序号, 'message': 错误信息}] 形式的逐条错误
+    """
+    now = datetime.utcnow()
+    rows = []
+    row_indexes = []
+    errors = []
+
+    for index, item in enumerate(items):
+        row, error = parse_reading(item, now)
+        if error:
+            errors.append({'index': index, 'message': error})
+        else:
+            rows.append(row)
+            row_indexes.append(index)
+
+    # 一次查询校验所有监测点是否存在
+    if known_points is None:
+        known_points = existing_point_ids({row['monitor_point_id'] for row in rows})
+    valid_rows = []
+    for index, row in zip(row_indexes, rows):
+        if row['monitor_point_id'] in known_points:
+            valid_rows.append(row)
+        else:
+            errors.append({'index': index, 'message': '监测点不存在'})
+
+    errors.sort(key=lambda error: error['index'])
+    return valid_rows, errors
+
+def _notify_changed():
+    """
+    监测数据提交后通知缓存和实时推送
+
+    数据此时已经提交，通知失败只记录日志而不向上抛出，
+    否则调用方 (如后台写入队列的重试) 会把已提交的记录再写一遍
+    """
+    try:
+        latest_readings.mark_changed()
+        events.notify()
+    except Exception as e:
+        print(f"通知监测数据变化时发生错误: {str(e)}")
+
+def commit_rows(rows):
+    """
+    在一个事务中写入已校验的监测记录并提交，随后通知缓存和实时推送
+
+    只有写入或提交失败时才抛出异常 (此时事务已回滚，可以重试)
+    """
+    try:
+        insert_records(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    _notify_changed()
+
+def ingest_readings(items):
+    """
+    校验并批量写入监测数据，所有有效记录在同一个事务中提交
+
+    参数:
+    - items: 监测数据列表，每项为包含 REQUIRED_FIELDS 的字典，可选 timestamp
+
+    返回:
+    - (inserted, errors): 写入的记录数，以及 [{'index': 序号, 'message': 错误信息}] 形式的逐条错误
+    """
+    rows, errors = validate_readings(items)
+    if rows:
+        commit_rows(rows)
+    return len(rows), errors
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+监测点最新数据快照 (latest_reading 表) 的维护
+
+/api/monitor/latest 和火灾预测都只关心每个监测点的最新数据。
+与其每次对全部历史记录做 GROUP BY max(timestamp)，不如在写入监测记录的同一事务中
+更新快照表，读取时只需按监测点数量扫描。
+
+"最新"按 (timestamp, id) 比较，时间相同时取ID较大的记录，因此每个监测点只有一条快照。
+快照用带条件的 UPDATE 原子地更新 (只有记录更新时才覆盖)，快照不存在时插入新行，
+多个 worker 同时写入同一监测点时，插入冲突会退回到更新。
+"""
+from sqlalchemy.exc import IntegrityError
+from models import LatestReading, MonitorRecord, db
+from cache_versions import bump_version
+
+# IN 查询每次携带的监测点个数
+IN_QUERY_CHUNK_SIZE = 500
+
+# 最新数据快照对应的缓存版本名 (依赖最新数据的缓存，如风险热力图)
+READINGS_VERSION = 'latest_readings'
+
+def mark_changed():
+    """监测数据写入、修改或删除并提交后调用，使所有 worker 中依赖最新数据的缓存失效"""
+    bump_version(READINGS_VERSION)
+
+def _apply(point_id, record_id, wind_speed, temperature, humidity, timestamp):
+    """用一条记录原子地更新快照 (只在记录比快照新时覆盖)，快照不存在时新建"""
+    table = LatestReading.__table__
+    values = dict(
+        record_id=record_id,
+        wind_speed=wind_speed,
+        temperature=temperature,
+        humidity=humidity,
+        timestamp=timestamp
+    )
+    update = table.update().where(db.and_(
+        table.c.monitor_point_id == point_id,
+        db.or_(
+            table.c.timestamp < timestamp,
+            db.and_(table.c.timestamp == timestamp, table.c.record_id < record_id)
+        )
+    )).values(**values)
+
+    if db.session.execute(update).rowcount:
+        return
+    if db.session.query(LatestReading.query.filter_by(monitor_point_id=point_id).exists()).scalar():
+        return  # 现有快照更新
+
+    # 快照不存在: 插入新行，并发插入冲突时退回到更新
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(monitor_point_id=point_id, **values))
+    except IntegrityError:
+        db.session.execute(update)
+
+def _load_snapshots(point_ids):
+    """按块查询给定监测点的现有快照"""
+    point_ids = list(point_ids)
+    snapshots = {}
+    for start in range(0, len(point_ids), IN_QUERY_CHUNK_SIZE):
+        chunk = point_ids[start:start + IN_QUERY_CHUNK_SIZE]
+        for snapshot in LatestReading.query.filter(LatestReading.monitor_point_id.in_(chunk)):
+            snapshots[snapshot.monitor_point_id] = snapshot
+    return snapshots
+
+def apply_record(record):
+    """
+    用一条已 flush 的监测记录 (ORM对象) 更新快照，不提交事务
+    """
+    _apply(record.monitor_point_id, record.id, record.wind_speed,
+           record.temperature, record.humidity, record.timestamp)
+
+def apply_rows(rows):
+    """
+    用批量插入的监测记录更新快照，不提交事务
+
+    executemany 插入拿不到记录ID，因此先在本批数据中找出每个监测点时间最新的一条，
+    只对比现有快照更新的监测点，再用一次 (监测点, 时间) 的 IN 查询取回对应的记录ID
+
+    参数:
+    - rows: 已插入的记录字典列表 (按插入顺序)
+    """
+    # 本批数据中每个监测点时间最新的记录 (时间相同时后插入的ID更大)
+    newest = {}
+    for row in rows:
+        current = newest.get(row['monitor_point_id'])
+        if current is None or row['timestamp'] >= current['timestamp']:
+            newest[row['monitor_point_id']] = row
+
+    snapshots = _load_snapshots(newest.keys())
+    candidates = [
+        (point_id, row['timestamp']) for point_id, row in newest.items()
+        if point_id not in snapshots or row['timestamp'] >= snapshots[point_id].timestamp
+    ]
+
+    # 每对 (监测点, 时间) 占两个参数
+    chunk_size = IN_QUERY_CHUNK_SIZE // 2
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        newest_ids = db.session.query(
+            db.func.max(MonitorRecord.id)
+        ).filter(
+            db.tuple_(MonitorRecord.monitor_point_id, MonitorRecord.timestamp).in_(chunk)
+        ).group_by(MonitorRecord.monitor_point_id)
+
+        records = db.session.query(
+            MonitorRecord.monitor_point_id,
+            MonitorRecord.id,
+            MonitorRecord.wind_speed,
+            MonitorRecord.temperature,
+            MonitorRecord.humidity,
+            MonitorRecord.timestamp
+        ).filter(
+            MonitorRecord.id.in_(newest_ids)
+        ).order_by(MonitorRecord.monitor_point_id)
+
+        for record in records:
+            _apply(*record)
+
+def refresh_point(point_id):
+    """
+    从历史记录重新计算某个监测点的快照，不提交事务
+
+    用于监测记录被修改或删除之后 (此时无法增量维护)
+    """
+    db.session.flush()
+    snapshot = LatestReading.query.get(point_id)
+    record = MonitorRecord.query.filter_by(monitor_point_id=point_id)\
+        .order_by(MonitorRecord.timestamp.desc(), MonitorRecord.id.desc()).first()
+
+    if record is None:
+        if snapshot is not None:
+            db.session.delete(snapshot)
+        return
+
+    if snapshot is None:
+        snapshot = LatestReading(monitor_point_id=point_id)
+        db.session.add(snapshot)
+
+    snapshot.record_id = record.id
+    snapshot.wind_speed = record.wind_speed
+    snapshot.temperature = record.temperature
+    snapshot.humidity = record.humidity
+    snapshot.timestamp = record.timestamp
+
+def rebuild_all():
+    """
+    从全部历史记录重建快照表，不提交事务
+
+    只在初始化或回填已有数据库时使用，会扫描整个监测记录表
+    """
+    LatestReading.query.delete(synchronize_session=False)
+
+    latest_times = db.session.query(
+        MonitorRecord.monitor_point_id,
+        db.func.max(MonitorRecord.timestamp).label('max_time')
+    ).group_by(MonitorRecord.monitor_point_id).subquery('latest_times')
+
+    newest_ids = db.session.query(
+        db.func.max(MonitorRecord.id)
+    ).join(
+        latest_times,
+        db.and_(
+            MonitorRecord.monitor_point_id == latest_times.c.monitor_point_id,
+            MonitorRecord.timestamp == latest_times.c.max_time
+        )
+    ).group_by(MonitorRecord.monitor_point_id)
+
+    records = db.session.query(
+        MonitorRecord.monitor_point_id,
+        MonitorRecord.id,
+        MonitorRecord.wind_speed,
+        MonitorRecord.temperature,
+        MonitorRecord.humidity,
+        MonitorRecord.timestamp
+    ).filter(MonitorRecord.id.in_(newest_ids))
+
+    db.session.bulk_insert_mappings(LatestReading, [
+        {
+            'monitor_point_id': point_id,
+            'record_id': record_id,
+            'wind_speed': wind_speed,
+            'temperature': temperature,
+            'humidity': humidity,
+            'timestamp': timestamp
+        }
+        for point_id, record_id, wind_speed, temperature, humidity, timestamp in records
+    ])
\ No newline at end of file
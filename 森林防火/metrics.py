@@ -0,0 +1,447 @@
+"""
+Prometheus 监控指标
+
+GET /metrics 以 Prometheus 文本格式输出:
+- http_requests_total / http_request_duration_seconds / http_request_errors_total:
+  按蓝图、路由 (URL 规则而不是实际路径，避免标签过多)、方法统计的请求数、耗时直方图和 5xx 错误数
+- db_queries_total / db_query_duration_seconds: 按语句类型 (SELECT/INSERT/...) 统计的 SQL 执行次数和耗时
+- predictor_calls_total / predictor_duration_seconds: FirePredictor 各预测方法的调用次数和耗时
+- ingest_queue_depth 等: 异步写入队列的长度和累计入队/拒绝/写入/丢弃的记录数
+
+采集只在 Flask 的 before/after_request 和 SQLAlchemy 的 before/after_cursor_execute 事件中
+更新进程内的计数 (一次加锁的字典更新)。
+
+多 worker 汇总: 每个 worker 把自己的累计值写入实例目录下 metrics/<pid>.json (写临时文件再原子替换，
+请求结束时最多每 DUMP_INTERVAL 秒写一次，进程退出时再写一次)，/metrics 被任一 worker 处理时
+读取所有文件求和。已退出的 worker 的文件在汇总时合并到 metrics/retired.json 后删除，
+其计数器继续计入总数 (计数器不会因 worker 重启而变小)，仪表值 (如队列长度) 不再计入；
+新进程第一次写入时若发现同 pid 的旧文件 (pid 被复用)，同样先合并。文件数量因此不超过运行中的 worker 数 + 1。
+
+设置环境变量 METRICS_TOKEN 后，请求需携带 Authorization: Bearer <token>。
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, request, g, Response, jsonify
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 开发环境只有一个进程，不需要文件锁
+    fcntl = None
+
+# 指标文件所在的子目录 (位于实例目录下)
+METRICS_DIR = 'metrics'
+
+# 已退出 worker 的累计值合并后的文件，以及合并时使用的锁文件
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = '.lock'
+
+# 每个 worker 写入指标文件的最小间隔 (秒)
+DUMP_INTERVAL = 5.0
+
+# 直方图的桶上界 (秒)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+PREDICTOR_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# 指标定义: 名称 -> (类型, 说明, 直方图的桶)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by blueprint, route, method and status', None),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency', REQUEST_BUCKETS),
+    'http_request_errors_total': ('counter', 'HTTP requests that ended with a 5xx status', None),
+    'db_queries_total': ('counter', 'SQL statements executed by statement type', None),
+    'db_query_duration_seconds': ('histogram', 'SQL statement execution time', QUERY_BUCKETS),
+    'predictor_calls_total': ('counter', 'FirePredictor calls by method', None),
+    'predictor_duration_seconds': ('histogram', 'FirePredictor call duration', PREDICTOR_BUCKETS),
+    'ingest_queue_depth': ('gauge', 'Readings waiting in the write-behind queue', None),
+    'ingest_queue_capacity': ('gauge', 'Write-behind queue capacity', None),
+    'ingest_queue_accepted_total': ('counter', 'Readings accepted into the write-behind queue', None),
+    'ingest_queue_rejected_total': ('counter', 'Readings rejected because the write-behind queue was full', None),
+    'ingest_queue_written_total': ('counter', 'Readings written by the write-behind queue', None),
+    'ingest_queue_dropped_total': ('counter', 'Readings dropped by the write-behind queue', None),
+    'password_hash_pending': ('gauge', 'Password hash operations running or waiting in the pool', None),
+    'password_hash_capacity': ('gauge', 'Password hash operations allowed at once (running plus queued)', None),
+    'password_hash_completed_total': ('counter', 'Password hash operations finished', None),
+    'password_hash_rejected_total': ('counter', 'Password hash operations rejected because the pool was full', None),
+    'password_hash_timeouts_total': ('counter', 'Password hash operations that timed out', None)
+}
+
+# SQL 语句类型标签
+STATEMENT_TYPES = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'BEGIN', 'COMMIT', 'ROLLBACK', 'PRAGMA', 'SAVEPOINT', 'RELEASE')
+
+class MetricsRegistry:
+    """进程内的指标累计值"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {(名称, 标签元组): 值}
+        self._counters = {}
+        # {(名称, 标签元组): [各桶计数 (最后一个为 +Inf), 总和, 次数]}
+        self._histograms = {}
+        # 采集时调用的函数，返回 {(名称, 标签元组): 值}
+        self._collectors = []
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        index = bisect.bisect_left(buckets, value)
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        """本进程的累计值 (可序列化为 JSON)"""
+        values = {}
+        for collector in self._collectors:
+            try:
+                values.update(collector())
+            except Exception as e:
+                print(f"采集监控指标时发生错误: {str(e)}")
+
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(buckets), total, count]
+                          for (name, labels), (buckets, total, count) in self._histograms.items()]
+
+        for (name, labels), value in values.items():
+            if METRICS[name][0] == 'gauge':
+                continue
+            counters.append([name, list(labels), value])
+        gauges = [[name, list(labels), value] for (name, labels), value in values.items()
+                  if METRICS[name][0] == 'gauge']
+
+        return {'pid': os.getpid(), 'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+# 每个工作进程一个指标注册表
+registry = MetricsRegistry()
+
+def track_calls(method):
+    """装饰器: 统计 FirePredictor 方法的调用次数和耗时"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                labels = (('method', method),)
+                registry.inc('predictor_calls_total', labels)
+                registry.observe('predictor_duration_seconds', labels, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def _statement_type(statement):
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    return keyword if keyword in STATEMENT_TYPES else 'OTHER'
+
+# 开始时间按游标记录在连接上: 执行失败的语句没有 after_cursor_execute，由 handle_error 清除，
+# 不会影响同一连接上之后语句的计时
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', {})[id(cursor)] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.get('metrics_query_start', {}).pop(id(cursor), None)
+    if start is None:
+        return
+    labels = (('statement', _statement_type(statement)),)
+    registry.inc('db_queries_total', labels)
+    registry.observe('db_query_duration_seconds', labels, time.perf_counter() - start)
+
+def _failed_cursor(exception_context):
+    """handle_error 中出错语句的游标 (SQLAlchemy 1.4 中 cursor 属性可能为空，从执行上下文中取)"""
+    return exception_context.cursor or getattr(exception_context.execution_context, 'cursor', None)
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    cursor = _failed_cursor(exception_context)
+    if connection is not None and cursor is not None:
+        connection.info.get('metrics_query_start', {}).pop(id(cursor), None)
+
+def instrument_engine(engine):
+    """为引擎注册 SQL 执行计时"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+def _request_labels():
+    rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+    return (('blueprint', request.blueprint or ''), ('endpoint', rule), ('method', request.method))
+
+def _record_request(status):
+    """记录一次请求 (每个请求只记录一次)"""
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+
+    labels = _request_labels()
+    registry.inc('http_requests_total', labels + (('status', str(status)),))
+    registry.observe('http_request_duration_seconds', labels, time.perf_counter() - start)
+    if status >= 500:
+        registry.inc('http_request_errors_total', labels)
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+
+def _after_request(response):
+    # 流式响应 (实时推送、导出) 只统计到开始返回数据为止
+    _record_request(response.status_code)
+    _maybe_dump(current_app.instance_path)
+    return response
+
+def _teardown_request(error):
+    # 未被错误处理器处理的异常不会经过 after_request
+    if error is not None:
+        _record_request(500)
+
+_last_dump = 0.0
+_dump_lock = threading.Lock()
+# 已确认指标文件归本进程所有的 pid (fork 出的 worker 与父进程不同)
+_owned_pid = None
+
+def _metrics_dir(instance_path):
+    return os.path.join(instance_path, METRICS_DIR)
+
+@contextmanager
+def _file_lock(directory, exclusive):
+    """多个 worker 之间的读写锁: 汇总时共享，合并已退出 worker 的文件时独占"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _write_json(path, data):
+    """写临时文件再原子替换"""
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def _read_json(path):
+    """读取指标文件，文件不存在、正在被替换或已损坏时返回 None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _accumulate(data, counters, histograms):
+    """把一个指标文件的计数器和直方图累加到汇总结果中"""
+    for metric, labels, value in data['counters']:
+        key = (metric, tuple(map(tuple, labels)))
+        counters[key] = counters.get(key, 0) + value
+
+    for metric, labels, buckets, total, count in data['histograms']:
+        key = (metric, tuple(map(tuple, labels)))
+        merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+        merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+        merged[1] += total
+        merged[2] += count
+
+def _retire(directory, pids):
+    """把已退出 worker (或 pid 被本进程复用的旧进程) 的指标文件合并到 retired.json 并删除"""
+    with _file_lock(directory, exclusive=True):
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        counters, histograms = {}, {}
+        retired = _read_json(retired_path)
+        if retired:
+            _accumulate(retired, counters, histograms)
+
+        paths = []
+        for pid in pids:
+            path = os.path.join(directory, f'{pid}.json')
+            # 加锁前 pid 可能已被新 worker 复用并写入了新文件
+            if pid != os.getpid() and _process_alive(pid):
+                continue
+            data = _read_json(path)
+            if data is None:
+                continue
+            _accumulate(data, counters, histograms)
+            paths.append(path)
+        if not paths:
+            return
+
+        _write_json(retired_path, {
+            'pid': None,
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), buckets, total, count]
+                           for (name, labels), (buckets, total, count) in histograms.items()],
+            'gauges': []
+        })
+        for path in paths:
+            os.remove(path)
+
+def dump(instance_path):
+    """把本进程的累计值写入指标文件"""
+    global _owned_pid
+    directory = _metrics_dir(instance_path)
+    os.makedirs(directory, exist_ok=True)
+    pid = os.getpid()
+    path = os.path.join(directory, f'{pid}.json')
+
+    # 本进程第一次写入: 同名文件属于已退出的、pid 相同的旧进程，先合并以免被覆盖
+    if _owned_pid != pid:
+        if os.path.exists(path):
+            _retire(directory, [pid])
+        _owned_pid = pid
+
+    _write_json(path, registry.snapshot())
+
+def _maybe_dump(instance_path):
+    global _last_dump
+    now = time.monotonic()
+    if now - _last_dump < DUMP_INTERVAL or not _dump_lock.acquire(blocking=False):
+        return
+    try:
+        _last_dump = now
+        dump(instance_path)
+    except OSError as e:
+        print(f"写入监控指标文件时发生错误: {str(e)}")
+    finally:
+        _dump_lock.release()
+
+def _dump_at_exit(instance_path):
+    try:
+        dump(instance_path)
+    except OSError:
+        pass
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def collect(instance_path):
+    """
+    汇总所有 worker 的指标文件，并合并已退出 worker 的文件
+
+    返回:
+    - (counters, histograms, gauges): {(名称, 标签元组): 值}，直方图的值为 [各桶计数, 总和, 次数]
+    """
+    counters, histograms, gauges = {}, {}, {}
+    directory = _metrics_dir(instance_path)
+    if not os.path.isdir(directory):
+        return counters, histograms, gauges
+
+    dead = []
+    with _file_lock(directory, exclusive=False):
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            data = _read_json(os.path.join(directory, name))
+            if data is None:
+                continue
+
+            _accumulate(data, counters, histograms)
+
+            # 仪表值只计入仍在运行的 worker
+            pid = data['pid']
+            if pid is None:
+                continue
+            if pid == os.getpid() or _process_alive(pid):
+                for metric, labels, value in data['gauges']:
+                    key = (metric, tuple(map(tuple, labels)))
+                    gauges[key] = gauges.get(key, 0) + value
+            else:
+                dead.append(pid)
+
+    if dead:
+        try:
+            _retire(directory, dead)
+        except OSError as e:
+            print(f"合并已退出 worker 的监控指标时发生错误: {str(e)}")
+
+    return counters, histograms, gauges
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def render(counters, histograms, gauges):
+    """按 Prometheus 文本格式输出汇总后的指标"""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        if kind == 'histogram':
+            series = sorted((key, value) for key, value in histograms.items() if key[0] == name)
+        else:
+            source = counters if kind == 'counter' else gauges
+            series = sorted((key, value) for key, value in source.items() if key[0] == name)
+        if not series:
+            continue
+
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (_, labels), value in series:
+            if kind != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                le = bound if bound == '+Inf' else _format_value(float(bound))
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+    return '\n'.join(lines) + '\n'
+
+def metrics_view():
+    """GET /metrics: 所有 worker 汇总后的指标"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'message': '未授权访问'}), 401
+
+    instance_path = current_app.instance_path
+    # 先写入本进程的最新值，再读取所有 worker 的文件
+    with _dump_lock:
+        dump(instance_path)
+    body = render(*collect(instance_path))
+    return Response(body, mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def init_app(app):
+    """注册请求计时钩子和 /metrics 路由 (SQL 计时由 instrument_engine 注册)"""
+    app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+    # 进程正常退出时写入最后的累计值
+    atexit.register(_dump_at_exit, app.instance_path)
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+数据库结构迁移
+
+db.create_all() 只会创建缺失的表，不会给已存在的表补建索引。
+upgrade_database() 在 create_all 之后对比模型中声明的索引与数据库中的实际索引，
+补建缺失的索引 (SQLite 和 MySQL 通用)，再执行尚未执行过的数据迁移 (如回填派生表)。
+已有数据库无需通过 init_db.py 重建即可升级。
+
+用法:
+    python migrations.py
+    或 FLASK_APP=app.py flask upgrade-db
+"""
+from sqlalchemy import inspect
+from models import db, SchemaMigration
+import latest_readings
+import rollups
+import fire_stats
+
+def _backfill_latest_readings():
+    """回填监测点最新数据快照"""
+    latest_readings.rebuild_all()
+
+def _backfill_monitor_rollups():
+    """回填监测数据小时/天聚合表"""
+    rollups.rebuild_all()
+
+def _backfill_fire_daily_stats():
+    """回填火灾数据每日统计"""
+    fire_stats.rebuild_all()
+
+# 数据迁移列表: (名称, 迁移函数)，按顺序执行，每个只执行一次
+MIGRATIONS = [
+    ('0001_backfill_latest_reading', _backfill_latest_readings),
+    ('0002_backfill_monitor_rollups', _backfill_monitor_rollups),
+    ('0003_backfill_fire_daily_stat', _backfill_fire_daily_stats),
+]
+
+def ensure_indexes():
+    """
+    补建模型中声明但数据库中缺失的索引
+
+    返回:
+    - created: 新建的索引名称列表
+    """
+    inspector = inspect(db.engine)
+    created = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                print(f"创建索引: {index.name}")
+                index.create(bind=db.engine)
+                created.append(index.name)
+
+    return created
+
+def upgrade_database():
+    """
+    将数据库升级到最新结构: 创建缺失的表和索引，执行尚未执行的数据迁移
+
+    需要在应用上下文中调用，可重复执行
+    """
+    db.create_all()
+    ensure_indexes()
+
+    applied = {migration.name for migration in SchemaMigration.query.all()}
+    for name, migrate in MIGRATIONS:
+        if name in applied:
+            continue
+
+        print(f"执行数据迁移: {name}")
+        migrate()
+        db.session.add(SchemaMigration(name=name))
+        db.session.commit()
+
+if __name__ == '__main__':
+    from app import create_app
+
+    with create_app().app_context():
+        upgrade_database()
+        print("数据库升级完成")
\ No newline at end of file
@@ -1,131 +1,271 @@
-from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
-
-# 创建数据库实例
-db = SQLAlchemy()
-
-# 用户模型
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(50), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-    role = db.Column(db.String(20), default='user')  # 'user' 或 'admin'
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    def __repr__(self):
-        return f'<User {self.username}>'
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'role': self.role,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
-
-# 监测点模型
-class MonitorPoint(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    latitude = db.Column(db.Float, nullable=False)  # 纬度
-    longitude = db.Column(db.Float, nullable=False)  # 经度
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    active = db.Column(db.Boolean, default=True)
-    
-    # 一对多关系：一个监测点有多个监测数据
-    records = db.relationship('MonitorRecord', backref='monitor_point', lazy=True)
-
-    def __repr__(self):
-        return f'<MonitorPoint {self.name}>'
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'active': self.active
-        }
-
-# 监测记录模型
-class MonitorRecord(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    monitor_point_id = db.Column(db.Integer, db.ForeignKey('monitor_point.id'), nullable=False)
-    wind_speed = db.Column(db.Float, nullable=False)  # 风速 (m/s)
-    temperature = db.Column(db.Float, nullable=False)  # 温度 (°C)
-    humidity = db.Column(db.Float, nullable=False)  # 湿度 (%)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-
-    def __repr__(self):
-        return f'<MonitorRecord {self.id}>'
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'monitor_point_id': self.monitor_point_id,
-            'monitor_point_name': self.monitor_point.name,
-            'wind_speed': self.wind_speed,
-            'temperature': self.temperature,
-            'humidity': self.humidity,
-            'timestamp': self.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'latitude': self.monitor_point.latitude,
-            'longitude': self.monitor_point.longitude
-        }
-
-# 火灾阈值设置模型
-class FireThreshold(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    wind_speed_threshold = db.Column(db.Float, nullable=False, default=10.0)  # 风速阈值 (m/s)
-    temperature_threshold = db.Column(db.Float, nullable=False, default=30.0)  # 温度阈值 (°C)
-    humidity_threshold = db.Column(db.Float, nullable=False, default=30.0)  # 湿度阈值 (%)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    updated_by = db.Column(db.Integer, db.ForeignKey('user.id'))
-
-    def __repr__(self):
-        return f'<FireThreshold {self.id}>'
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'wind_speed_threshold': self.wind_speed_threshold,
-            'temperature_threshold': self.temperature_threshold,
-            'humidity_threshold': self.humidity_threshold,
-            'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
-
-# 火灾数据模型
-class FireData(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    monitor_point_id = db.Column(db.Integer, db.ForeignKey('monitor_point.id'), nullable=False)
-    wind_speed = db.Column(db.Float, nullable=False)
-    temperature = db.Column(db.Float, nullable=False)
-    humidity = db.Column(db.Float, nullable=False)
-    risk_level = db.Column(db.String(20), nullable=False)  # 'low', 'medium', 'high', 'extreme'
-    predicted_area = db.Column(db.Float, nullable=True)  # 预测火灾面积 (平方公里)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    latitude = db.Column(db.Float, nullable=False)
-    longitude = db.Column(db.Float, nullable=False)
-
-    def __repr__(self):
-        return f'<FireData {self.id}>'
-
-    def to_dict(self):
-        monitor_point = MonitorPoint.query.get(self.monitor_point_id)
-        monitor_point_name = monitor_point.name if monitor_point else "未知监测点"
-        
-        return {
-            'id': self.id,
-            'monitor_point_id': self.monitor_point_id,
-            'monitor_point_name': monitor_point_name,
-            'wind_speed': self.wind_speed,
-            'temperature': self.temperature,
-            'humidity': self.humidity,
-            'risk_level': self.risk_level,
-            'predicted_area': self.predicted_area,
-            'timestamp': self.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'latitude': self.latitude,
-            'longitude': self.longitude
-        } 
\ No newline at end of file
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.ext.declarative import declared_attr
+from datetime import datetime
+
+# 创建数据库实例
+db = SQLAlchemy()
+
+# 用户模型
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(50), unique=True, nullable=False)
+    password = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    role = db.Column(db.String(20), default='user')  # 'user' 或 'admin'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'role': self.role,
+            'created_at': self.created_at
+        }
+
+# 监测点模型
+class MonitorPoint(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    latitude = db.Column(db.Float, nullable=False)  # 纬度
+    longitude = db.Column(db.Float, nullable=False)  # 经度
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    active = db.Column(db.Boolean, default=True)
+    
+    # 一对多关系：一个监测点有多个监测数据
+    records = db.relationship('MonitorRecord', backref='monitor_point', lazy=True)
+
+    def __repr__(self):
+        return f'<MonitorPoint {self.name}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'created_at': self.created_at,
+            'active': self.active
+        }
+
+# 监测记录模型
+class MonitorRecord(db.Model):
+    __table_args__ = (
+        # 按监测点查询并按时间排序/过滤
+        db.Index('ix_monitor_record_point_time', 'monitor_point_id', 'timestamp'),
+        # 不区分监测点时按时间排序
+        db.Index('ix_monitor_record_timestamp', 'timestamp'),
+        # 记录归档删除后ID也不再复用 (只对新建的表生效)
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    monitor_point_id = db.Column(db.Integer, db.ForeignKey('monitor_point.id'), nullable=False)
+    wind_speed = db.Column(db.Float, nullable=False)  # 风速 (m/s)
+    temperature = db.Column(db.Float, nullable=False)  # 温度 (°C)
+    humidity = db.Column(db.Float, nullable=False)  # 湿度 (%)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MonitorRecord {self.id}>'
+
+    @classmethod
+    def with_point(cls):
+        """附带监测点的查询：通过JOIN一次加载监测点，序列化时不再逐行查询"""
+        return cls.query.options(db.joinedload(cls.monitor_point))
+
+    def to_dict(self):
+        monitor_point = self.monitor_point
+        return {
+            'id': self.id,
+            'monitor_point_id': self.monitor_point_id,
+            'monitor_point_name': monitor_point.name,
+            'wind_speed': self.wind_speed,
+            'temperature': self.temperature,
+            'humidity': self.humidity,
+            'timestamp': self.timestamp,
+            'latitude': monitor_point.latitude,
+            'longitude': monitor_point.longitude
+        }
+
+# 监测点最新数据快照模型
+class LatestReading(db.Model):
+    """每个监测点最新一条监测记录的快照，与监测记录的写入在同一事务中维护"""
+    monitor_point_id = db.Column(db.Integer, db.ForeignKey('monitor_point.id'), primary_key=True)
+    record_id = db.Column(db.Integer, nullable=False)  # 对应的监测记录ID
+    wind_speed = db.Column(db.Float, nullable=False)
+    temperature = db.Column(db.Float, nullable=False)
+    humidity = db.Column(db.Float, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    
+    # 多对一关系：快照所属的监测点
+    monitor_point = db.relationship('MonitorPoint')
+
+    def __repr__(self):
+        return f'<LatestReading {self.monitor_point_id}>'
+
+    @classmethod
+    def with_point(cls):
+        """附带监测点的查询：通过JOIN一次加载监测点，序列化时不再逐行查询"""
+        return cls.query.options(db.joinedload(cls.monitor_point))
+
+    def to_dict(self):
+        # 与 MonitorRecord.to_dict 的格式保持一致
+        monitor_point = self.monitor_point
+        return {
+            'id': self.record_id,
+            'monitor_point_id': self.monitor_point_id,
+            'monitor_point_name': monitor_point.name,
+            'wind_speed': self.wind_speed,
+            'temperature': self.temperature,
+            'humidity': self.humidity,
+            'timestamp': self.timestamp,
+            'latitude': monitor_point.latitude,
+            'longitude': monitor_point.longitude
+        }
+
+# 监测数据聚合字段(小时/天聚合表共用)
+class MonitorRollupMixin:
+    """监测数据按时间桶聚合后的最小值、最大值、总和与记录数，平均值 = 总和 / 记录数"""
+    @declared_attr
+    def __table_args__(cls):
+        # 主键以监测点在前，按监测点查询时间范围时走主键范围扫描
+        return (db.PrimaryKeyConstraint('monitor_point_id', 'bucket_start'),)
+
+    @declared_attr
+    def monitor_point_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('monitor_point.id'), nullable=False)
+
+    bucket_start = db.Column(db.DateTime, nullable=False)  # 时间桶起始时间
+    count = db.Column(db.Integer, nullable=False, default=0)
+    wind_speed_min = db.Column(db.Float, nullable=False)
+    wind_speed_max = db.Column(db.Float, nullable=False)
+    wind_speed_sum = db.Column(db.Float, nullable=False)
+    temperature_min = db.Column(db.Float, nullable=False)
+    temperature_max = db.Column(db.Float, nullable=False)
+    temperature_sum = db.Column(db.Float, nullable=False)
+    humidity_min = db.Column(db.Float, nullable=False)
+    humidity_max = db.Column(db.Float, nullable=False)
+    humidity_sum = db.Column(db.Float, nullable=False)
+
+    def to_dict(self):
+        return {
+            'monitor_point_id': self.monitor_point_id,
+            'bucket_start': self.bucket_start,
+            'count': self.count,
+            'wind_speed_min': self.wind_speed_min,
+            'wind_speed_max': self.wind_speed_max,
+            'wind_speed_avg': round(self.wind_speed_sum / self.count, 2),
+            'temperature_min': self.temperature_min,
+            'temperature_max': self.temperature_max,
+            'temperature_avg': round(self.temperature_sum / self.count, 2),
+            'humidity_min': self.humidity_min,
+            'humidity_max': self.humidity_max,
+            'humidity_avg': round(self.humidity_sum / self.count, 2)
+        }
+
+# 监测数据小时聚合模型
+class MonitorRollupHourly(MonitorRollupMixin, db.Model):
+    def __repr__(self):
+        return f'<MonitorRollupHourly {self.monitor_point_id} {self.bucket_start}>'
+
+# 监测数据日聚合模型
+class MonitorRollupDaily(MonitorRollupMixin, db.Model):
+    def __repr__(self):
+        return f'<MonitorRollupDaily {self.monitor_point_id} {self.bucket_start}>'
+
+# 火灾阈值设置模型
+class FireThreshold(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    wind_speed_threshold = db.Column(db.Float, nullable=False, default=10.0)  # 风速阈值 (m/s)
+    temperature_threshold = db.Column(db.Float, nullable=False, default=30.0)  # 温度阈值 (°C)
+    humidity_threshold = db.Column(db.Float, nullable=False, default=30.0)  # 湿度阈值 (%)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+    def __repr__(self):
+        return f'<FireThreshold {self.id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'wind_speed_threshold': self.wind_speed_threshold,
+            'temperature_threshold': self.temperature_threshold,
+            'humidity_threshold': self.humidity_threshold,
+            'updated_at': self.updated_at
+        }
+
+# 火灾数据模型
+class FireData(db.Model):
+    __table_args__ = (
+        # 按时间范围过滤，同时覆盖按风险等级分组统计
+        db.Index('ix_fire_data_time_risk', 'timestamp', 'risk_level'),
+        # 按风险等级过滤并按时间排序
+        db.Index('ix_fire_data_risk_time', 'risk_level', 'timestamp'),
+        # 按监测点统计
+        db.Index('ix_fire_data_point_time', 'monitor_point_id', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    monitor_point_id = db.Column(db.Integer, db.ForeignKey('monitor_point.id'), nullable=False)
+    wind_speed = db.Column(db.Float, nullable=False)
+    temperature = db.Column(db.Float, nullable=False)
+    humidity = db.Column(db.Float, nullable=False)
+    risk_level = db.Column(db.String(20), nullable=False)  # 'low', 'medium', 'high', 'extreme'
+    predicted_area = db.Column(db.Float, nullable=True)  # 预测火灾面积 (平方公里)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    
+    # 多对一关系：火灾数据所属的监测点
+    monitor_point = db.relationship('MonitorPoint')
+
+    def __repr__(self):
+        return f'<FireData {self.id}>'
+
+    @classmethod
+    def with_point(cls):
+        """附带监测点的查询：通过JOIN一次加载监测点，序列化时不再逐行查询"""
+        return cls.query.options(db.joinedload(cls.monitor_point))
+
+    def to_dict(self):
+        monitor_point = self.monitor_point
+        monitor_point_name = monitor_point.name if monitor_point else "未知监测点"
+        
+        return {
+            'id': self.id,
+            'monitor_point_id': self.monitor_point_id,
+            'monitor_point_name': monitor_point_name,
+            'wind_speed': self.wind_speed,
+            'temperature': self.temperature,
+            'humidity': self.humidity,
+            'risk_level': self.risk_level,
+            'predicted_area': self.predicted_area,
+            'timestamp': self.timestamp,
+            'latitude': self.latitude,
+            'longitude': self.longitude
+        } 
+
+# 火灾数据每日统计模型
+class FireDailyStat(db.Model):
+    """按天和风险等级统计的火灾数据，随火灾数据的写入和删除增量维护，见 fire_stats.py"""
+    day = db.Column(db.Date, primary_key=True)  # 日期 (UTC)
+    risk_level = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)  # 火灾数据条数
+    positive_area_sum = db.Column(db.Float, nullable=False, default=0)  # 预测面积大于0的面积总和
+    positive_area_count = db.Column(db.Integer, nullable=False, default=0)  # 预测面积大于0的条数
+
+    def __repr__(self):
+        return f'<FireDailyStat {self.day} {self.risk_level}>'
+
+# 数据库迁移记录模型
+class SchemaMigration(db.Model):
+    """已执行的数据迁移，见 migrations.py"""
+    name = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.name}>'
\ No newline at end of file
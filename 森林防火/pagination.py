@@ -0,0 +1,108 @@
+"""
+按 (timestamp, id) 的游标分页 (keyset pagination)
+
+列表接口按时间倒序返回数据。OFFSET 分页越往后越慢，一次取出全部数据又要在内存中序列化整张表，
+这里改为记住上一页最后一行的 (timestamp, id)，下一页从该位置之后开始读取，
+每一页都是 (…, timestamp) 索引上的一次范围扫描 (索引隐含主键 id，顺序与 ORDER BY 一致)。
+
+时间为空的行无法排在游标之后，不出现在分页列表中 (模型和写入接口都会填写时间，只有手工修改数据库才会出现)。
+
+游标对客户端不透明，由 next_cursor 生成，通过 cursor 参数传回。
+为保持响应体的格式不变，下一页的游标放在响应头中:
+- X-Next-Cursor: 下一页的游标，没有下一页时不返回
+- Link: <下一页URL>; rel="next"
+"""
+import base64
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import request
+from ingest import parse_timestamp
+
+# 未指定 limit 时每页的条数
+DEFAULT_PAGE_SIZE = 100
+
+# 每页最多返回的条数，需要更多数据时请按游标翻页
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(timestamp, row_id):
+    """把一行的 (timestamp, id) 编码为游标"""
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    解析游标
+
+    返回:
+    - (timestamp, id)，游标无效时抛出 ValueError
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('无效的分页游标')
+
+def _parse_time_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return parse_timestamp(value)
+    except (ValueError, TypeError):
+        raise ValueError(f'{name} 时间格式错误，请使用 YYYY-MM-DD HH:MM:SS 或 ISO 8601 格式')
+
+def paginate(query, timestamp_column, id_column):
+    """
+    按请求参数对查询进行游标分页，结果按 (timestamp, id) 倒序
+
+    请求参数:
+    - limit: 每页条数，默认 DEFAULT_PAGE_SIZE，最大 MAX_PAGE_SIZE
+    - cursor: 上一页返回的游标
+    - since, until: 时间范围 [since, until)
+
+    返回:
+    - (items, next_cursor): 本页数据和下一页的游标 (没有下一页时为 None)
+    参数无效时抛出 ValueError
+    """
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    # 时间为空的行没有游标位置，不参与分页
+    query = query.filter(timestamp_column.isnot(None))
+
+    since = _parse_time_arg('since')
+    until = _parse_time_arg('until')
+    if since:
+        query = query.filter(timestamp_column >= since)
+    if until:
+        query = query.filter(timestamp_column < until)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            (timestamp_column < cursor_time) |
+            ((timestamp_column == cursor_time) & (id_column < cursor_id))
+        )
+
+    # 多取一行用于判断是否还有下一页
+    items = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+
+    return items, next_cursor
+
+def add_pagination_headers(response, next_cursor):
+    """在响应头中返回下一页的游标和链接"""
+    if next_cursor:
+        args = [(key, value) for key, value in request.args.items(multi=True) if key != 'cursor']
+        args.append(('cursor', next_cursor))
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
\ No newline at end of file
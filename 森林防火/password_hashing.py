@@ -0,0 +1,192 @@
+"""
+在进程池中计算密码哈希
+
+bcrypt 哈希和校验每次要消耗上百毫秒 CPU。交接班时大量操作员同时登录，
+如果直接在请求线程中计算，会占满 CPU，拖慢同一 worker 中处理监测数据的请求。
+这里把哈希和校验交给每个 worker 进程自己的一个小进程池:
+- 同时计算的密码哈希数不超过 PASSWORD_HASH_WORKERS，等待中的任务不超过 PASSWORD_HASH_QUEUE_SIZE，
+  超过时立即返回 503 (带 Retry-After)，不再排队
+- 等待结果超过 PASSWORD_HASH_TIMEOUT 秒同样返回 503
+- 哈希强度由 BCRYPT_LOG_ROUNDS 配置；用户登录时若已存密码的强度与配置不同，会按新配置重新哈希并保存
+
+PASSWORD_HASH_WORKERS=0 时不使用进程池，直接在请求线程中计算 (仍受排队数量限制)。
+整个服务用于密码哈希的进程数为 gunicorn worker 数 × PASSWORD_HASH_WORKERS。
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from flask import current_app, jsonify
+import metrics
+
+class HashingUnavailable(Exception):
+    """密码哈希进程池已满或等待超时"""
+
+def _hash(password, rounds):
+    """(在子进程中执行) 生成 bcrypt 哈希"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(pw_hash, password):
+    """(在子进程中执行) 校验密码，哈希格式无效时返回 False"""
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), pw_hash.encode('utf-8'))
+    except ValueError:
+        return False
+
+class PasswordHasher:
+    """每个 worker 进程一个的有界密码哈希进程池"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self.workers = 0
+        self.capacity = 0
+        # 统计信息
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def configure(self, workers, queue_size):
+        """设置进程数和最大排队任务数 (由 init_app 调用)"""
+        with self._lock:
+            if self._executor is not None and workers != self.workers:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.workers = workers
+            self.capacity = workers + queue_size if workers else max(queue_size, 1)
+            self._slots = threading.BoundedSemaphore(self.capacity)
+
+    def _get_executor(self):
+        # gunicorn --preload 时应用在 fork 之前创建，每个 worker 进程需要自己的进程池
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # 使用 spawn 启动子进程，避免 fork 带有后台线程和数据库连接的 worker 进程
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _release(self, slots):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        slots.release()
+
+    def run(self, func, *args, timeout=None):
+        """
+        在进程池中执行 func(*args) 并等待结果
+
+        异常:
+        - HashingUnavailable: 正在计算和排队的任务已达上限，或等待超时
+        """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingUnavailable()
+        with self._lock:
+            self.pending += 1
+
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._release(slots)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except (BrokenProcessPool, RuntimeError):
+            self._release(slots)
+            self._reset(executor)
+            raise HashingUnavailable()
+        # 任务结束 (包括等待超时后子进程才算完) 时才让出名额
+        future.add_done_callback(lambda _future: self._release(slots))
+
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise HashingUnavailable()
+        except BrokenProcessPool:
+            # 子进程异常退出 (如被 OOM 杀死)，下次请求时重建进程池
+            self._reset(executor)
+            raise HashingUnavailable()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts
+            }
+
+hasher = PasswordHasher()
+
+def _collect_metrics():
+    stats = hasher.stats()
+    return {
+        ('password_hash_pending', ()): stats['pending'],
+        ('password_hash_capacity', ()): stats['capacity'],
+        ('password_hash_completed_total', ()): stats['completed'],
+        ('password_hash_rejected_total', ()): stats['rejected'],
+        ('password_hash_timeouts_total', ()): stats['timeouts']
+    }
+
+metrics.registry.register_collector(_collect_metrics)
+
+def hash_password(password):
+    """按当前配置的强度生成密码哈希 (字符串)"""
+    if not password:
+        raise ValueError('Password must be non-empty.')
+    config = current_app.config
+    return hasher.run(_hash, password, config['BCRYPT_LOG_ROUNDS'], timeout=config['PASSWORD_HASH_TIMEOUT'])
+
+def check_password(pw_hash, password):
+    """校验密码是否与哈希匹配"""
+    if not pw_hash or not password:
+        return False
+    return hasher.run(_check, pw_hash, password, timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+
+def needs_rehash(pw_hash):
+    """已存哈希的强度 ($2b$<强度>$...) 与当前配置不同时返回 True"""
+    try:
+        rounds = int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return False
+    return rounds != current_app.config['BCRYPT_LOG_ROUNDS']
+
+def _busy_response(error):
+    return jsonify({'message': '服务繁忙，请稍后重试'}), 503, {'Retry-After': '1'}
+
+def init_app(app):
+    """
+    按配置设置密码哈希进程池并注册 503 响应
+
+    配置项 (可通过同名环境变量设置):
+    - PASSWORD_HASH_WORKERS: 每个 worker 的哈希进程数，默认 1；0 表示在请求线程中计算
+    - PASSWORD_HASH_QUEUE_SIZE: 每个 worker 最多排队等待的哈希任务数，默认 8
+    - PASSWORD_HASH_TIMEOUT: 等待哈希结果的最长秒数，默认 10
+    """
+    app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.getenv('PASSWORD_HASH_WORKERS', 1)))
+    app.config.setdefault('PASSWORD_HASH_QUEUE_SIZE', int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 8)))
+    app.config.setdefault('PASSWORD_HASH_TIMEOUT', float(os.getenv('PASSWORD_HASH_TIMEOUT', 10)))
+    hasher.configure(app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_QUEUE_SIZE'])
+    app.register_error_handler(HashingUnavailable, _busy_response)
\ No newline at end of file
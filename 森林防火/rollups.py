@@ -0,0 +1,255 @@
+"""
+监测数据的小时/天聚合
+
+历史曲线和趋势分析动辄跨越数月的分钟级数据，直接扫描原始记录代价太高。
+监测记录写入时在同一事务中增量更新 monitor_rollup_hourly / monitor_rollup_daily 两张聚合表
+(每个监测点每个时间桶一行，保存最小值、最大值、总和与记录数)，查询任意时间范围时只读聚合表。
+
+增量更新用一条 UPDATE 在数据库中原子地累加 (多个 worker 同时写入同一时间桶时不会丢失数据)，
+时间桶不存在时插入新行，并发插入冲突时退回到更新。
+
+记录被修改或删除时最小值/最大值无法增量回退，此时从原始记录重新计算受影响的时间桶。
+"""
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import MonitorRecord, MonitorRollupHourly, MonitorRollupDaily, db
+
+# 聚合粒度对应的模型
+ROLLUP_MODELS = {
+    'hour': MonitorRollupHourly,
+    'day': MonitorRollupDaily
+}
+
+# 每个聚合字段对应的监测值
+MEASURES = ('wind_speed', 'temperature', 'humidity')
+
+def bucket_start(timestamp, period):
+    """获取时间所在时间桶的起始时间"""
+    if period == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def bucket_end(start, period):
+    """获取时间桶的结束时间(不含)"""
+    return start + (timedelta(hours=1) if period == 'hour' else timedelta(days=1))
+
+def _aggregate(rows, period):
+    """在内存中按 (监测点, 时间桶) 聚合一批记录"""
+    buckets = {}
+    for row in rows:
+        key = (row['monitor_point_id'], bucket_start(row['timestamp'], period))
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {'count': 0}
+            for measure in MEASURES:
+                value = row[measure]
+                bucket[f'{measure}_min'] = value
+                bucket[f'{measure}_max'] = value
+                bucket[f'{measure}_sum'] = 0.0
+
+        bucket['count'] += 1
+        for measure in MEASURES:
+            value = row[measure]
+            if value < bucket[f'{measure}_min']:
+                bucket[f'{measure}_min'] = value
+            if value > bucket[f'{measure}_max']:
+                bucket[f'{measure}_max'] = value
+            bucket[f'{measure}_sum'] += value
+    return buckets
+
+def _merge(model, point_id, start_time, bucket):
+    """把内存中的聚合结果原子地合并进聚合行，聚合行不存在时新建"""
+    table = model.__table__
+    values = {'count': table.c.count + bucket['count']}
+    for measure in MEASURES:
+        low = table.c[f'{measure}_min']
+        high = table.c[f'{measure}_max']
+        total = table.c[f'{measure}_sum']
+        values[low.name] = db.case((low > bucket[low.name], bucket[low.name]), else_=low)
+        values[high.name] = db.case((high < bucket[high.name], bucket[high.name]), else_=high)
+        values[total.name] = total + bucket[total.name]
+
+    update = table.update().where(db.and_(
+        table.c.monitor_point_id == point_id,
+        table.c.bucket_start == start_time
+    )).values(**values)
+
+    if db.session.execute(update).rowcount:
+        return
+
+    # 新的时间桶: 插入新行，并发插入冲突时退回到更新
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(
+                monitor_point_id=point_id,
+                bucket_start=start_time,
+                **bucket
+            ))
+    except IntegrityError:
+        db.session.execute(update)
+
+def apply_rows(rows):
+    """
+    用新插入的监测记录增量更新小时和天聚合表，不提交事务
+
+    参数:
+    - rows: 记录字典列表，包含 monitor_point_id、timestamp 和各监测值
+    """
+    for period, model in ROLLUP_MODELS.items():
+        # 按固定顺序更新，并发事务以相同顺序加行锁，避免死锁
+        for (point_id, start_time), bucket in sorted(_aggregate(rows, period).items()):
+            _merge(model, point_id, start_time, bucket)
+
+def apply_record(record):
+    """用一条新写入的监测记录 (ORM对象) 更新聚合表，不提交事务"""
+    apply_rows([{
+        'monitor_point_id': record.monitor_point_id,
+        'timestamp': record.timestamp,
+        'wind_speed': record.wind_speed,
+        'temperature': record.temperature,
+        'humidity': record.humidity
+    }])
+
+def _aggregate_columns():
+    """原始记录的聚合查询列"""
+    columns = [db.func.count(MonitorRecord.id)]
+    for measure in MEASURES:
+        column = getattr(MonitorRecord, measure)
+        columns += [db.func.min(column), db.func.max(column), db.func.sum(column)]
+    return columns
+
+def _bucket_values(result):
+    """把聚合查询结果转换为聚合行的字段"""
+    values = {'count': result[0]}
+    for i, measure in enumerate(MEASURES):
+        values[f'{measure}_min'] = result[1 + i * 3]
+        values[f'{measure}_max'] = result[2 + i * 3]
+        values[f'{measure}_sum'] = result[3 + i * 3]
+    return values
+
+def refresh_buckets(point_id, timestamp):
+    """
+    从原始记录重新计算某个监测点在该时间所属的小时和天时间桶，不提交事务
+
+    用于监测记录被修改或删除之后
+    """
+    db.session.flush()
+    for period, model in ROLLUP_MODELS.items():
+        start_time = bucket_start(timestamp, period)
+        result = db.session.query(*_aggregate_columns()).filter(
+            MonitorRecord.monitor_point_id == point_id,
+            MonitorRecord.timestamp >= start_time,
+            MonitorRecord.timestamp < bucket_end(start_time, period)
+        ).one()
+
+        rollup = model.query.get((point_id, start_time))
+        if not result[0]:
+            if rollup is not None:
+                db.session.delete(rollup)
+            continue
+
+        if rollup is None:
+            rollup = model(monitor_point_id=point_id, bucket_start=start_time)
+            db.session.add(rollup)
+        for key, value in _bucket_values(result).items():
+            setattr(rollup, key, value)
+
+def _bucket_expression(period):
+    """按数据库方言生成把时间截断到时间桶起点的SQL表达式"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        fmt = '%Y-%m-%d %H:00:00' if period == 'hour' else '%Y-%m-%d 00:00:00'
+        return db.func.strftime(fmt, MonitorRecord.timestamp)
+    if dialect == 'mysql':
+        fmt = '%Y-%m-%d %H:00:00' if period == 'hour' else '%Y-%m-%d 00:00:00'
+        return db.func.date_format(MonitorRecord.timestamp, fmt)
+    return db.func.date_trunc(period, MonitorRecord.timestamp)
+
+def rebuild_all():
+    """
+    从全部历史记录重建聚合表，不提交事务
+
+    按监测点逐个在数据库中 GROUP BY 聚合，内存占用与单个监测点的时间桶数成正比
+    """
+    point_ids = [point_id for (point_id,) in
+                 db.session.query(MonitorRecord.monitor_point_id).distinct()]
+
+    for period, model in ROLLUP_MODELS.items():
+        model.query.delete(synchronize_session=False)
+        bucket = _bucket_expression(period).label('bucket')
+
+        for point_id in point_ids:
+            results = db.session.query(bucket, *_aggregate_columns())\
+                .filter(MonitorRecord.monitor_point_id == point_id)\
+                .group_by(bucket)
+
+            mappings = []
+            for result in results:
+                start_time = result[0]
+                if isinstance(start_time, str):
+                    start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
+                mappings.append(dict(
+                    monitor_point_id=point_id,
+                    bucket_start=start_time,
+                    **_bucket_values(result[1:])
+                ))
+            db.session.bulk_insert_mappings(model, mappings)
+
+def choose_period(start, end):
+    """未指定聚合粒度时，按时间跨度选择: 7天以内用小时，否则用天"""
+    return 'hour' if end - start <= timedelta(days=7) else 'day'
+
+def query_rollups(start, end, period=None, point_ids=None):
+    """
+    查询时间范围内的聚合数据
+
+    参数:
+    - start, end: 时间范围 [start, end)，返回起始时间落在范围内的时间桶
+    - period: 聚合粒度 'hour' 或 'day'，不指定时按时间跨度自动选择
+    - point_ids: 监测点ID列表，不指定时返回所有监测点
+
+    返回:
+    - (period, rollups): 实际使用的聚合粒度和聚合行列表
+    """
+    period = period or choose_period(start, end)
+    model = ROLLUP_MODELS[period]
+
+    query = model.query.filter(model.bucket_start >= start, model.bucket_start < end)
+    if point_ids:
+        query = query.filter(model.monitor_point_id.in_(point_ids))
+
+    return period, query.order_by(model.monitor_point_id, model.bucket_start).all()
+
+def query_trend(start, end, period=None, point_ids=None):
+    """
+    查询时间范围内所有(或指定)监测点合并后的趋势，每个时间桶一行
+
+    返回:
+    - (period, trend): 实际使用的聚合粒度和 [{'bucket_start', 'count', '*_min', '*_max', '*_avg'}] 列表
+    """
+    period = period or choose_period(start, end)
+    model = ROLLUP_MODELS[period]
+
+    columns = [model.bucket_start, db.func.sum(model.count)]
+    for measure in MEASURES:
+        columns += [
+            db.func.min(getattr(model, f'{measure}_min')),
+            db.func.max(getattr(model, f'{measure}_max')),
+            db.func.sum(getattr(model, f'{measure}_sum'))
+        ]
+
+    query = db.session.query(*columns).filter(model.bucket_start >= start, model.bucket_start < end)
+    if point_ids:
+        query = query.filter(model.monitor_point_id.in_(point_ids))
+
+    trend = []
+    for result in query.group_by(model.bucket_start).order_by(model.bucket_start):
+        count = result[1]
+        item = {'bucket_start': result[0].strftime('%Y-%m-%d %H:%M:%S'), 'count': count}
+        for i, measure in enumerate(MEASURES):
+            item[f'{measure}_min'] = result[2 + i * 3]
+            item[f'{measure}_max'] = result[3 + i * 3]
+            item[f'{measure}_avg'] = round(result[4 + i * 3] / count, 2)
+        trend.append(item)
+
+    return period, trend
\ No newline at end of file
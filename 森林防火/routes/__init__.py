@@ -1,5 +1,7 @@
-from routes.auth_routes import auth_routes
-from routes.user_routes import user_routes
-from routes.monitor_routes import monitor_routes
-from routes.fire_routes import fire_routes
-from routes.stat_routes import stat_routes 
\ No newline at end of file
+from routes.auth_routes import auth_routes
+from routes.user_routes import user_routes
+from routes.monitor_routes import monitor_routes
+from routes.fire_routes import fire_routes
+from routes.stat_routes import stat_routes
+from routes.stream_routes import stream_routes
+from routes.export_routes import export_routes 
\ No newline at end of file
@@ -0,0 +1,35 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from ingest import parse_timestamp
+import exporter
+
+export_routes = Blueprint('export', __name__, url_prefix='/api/export')
+
+@export_routes.route('/<table>', methods=['GET'])
+@jwt_required()
+def export_data(table):
+    """流式导出监测记录(records)或火灾数据(fire-data)，支持 csv、ndjson、parquet 格式"""
+    # 获取查询参数
+    fmt = request.args.get('format', 'csv')
+    point_ids = request.args.getlist('point_id', type=int)
+    
+    try:
+        exporter.validate(table, fmt)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        since = parse_timestamp(request.args['since']) if request.args.get('since') else None
+        until = parse_timestamp(request.args['until']) if request.args.get('until') else None
+    except (ValueError, TypeError):
+        return jsonify({'message': '时间格式错误，请使用 YYYY-MM-DD HH:MM:SS 或 ISO 8601 格式'}), 400
+    
+    # 数据边读取边输出，导出期间保持请求上下文(数据库会话)
+    content_type, extension = exporter.EXPORT_FORMATS[fmt]
+    chunks = exporter.export(table, fmt, since, until, point_ids)
+    response = Response(stream_with_context(chunks), content_type=content_type)
+    
+    filename = f"{table}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{extension}"
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
\ No newline at end of file
@@ -1,215 +1,319 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import MonitorPoint, MonitorRecord, FireThreshold, FireData, db
-from routes.user_routes import admin_required
-from datetime import datetime
-from fire_prediction import FirePredictor
-
-fire_routes = Blueprint('fire', __name__, url_prefix='/api/fire')
-
-# 火灾预测相关路由
-@fire_routes.route('/predict', methods=['GET'])
-def predict_fire_risk():
-    """预测所有监测点的火灾风险"""
-    # 调用分析函数分析所有监测点的最新数据
-    results = FirePredictor.analyze_monitor_data()
-    
-    return jsonify(results), 200
-
-@fire_routes.route('/predict/<int:point_id>', methods=['GET'])
-def predict_fire_risk_for_point(point_id):
-    """预测特定监测点的火灾风险"""
-    # 检查监测点是否存在
-    point = MonitorPoint.query.get(point_id)
-    if not point:
-        return jsonify({'message': '监测点不存在'}), 404
-    
-    # 调用分析函数分析指定监测点的最新数据
-    results = FirePredictor.analyze_monitor_data(point_id)
-    
-    if not results:
-        return jsonify({'message': '无可用的监测数据'}), 404
-    
-    return jsonify(results[0]), 200
-
-@fire_routes.route('/predict/custom', methods=['POST'])
-def predict_custom_data():
-    """使用自定义数据进行火灾风险预测"""
-    data = request.get_json()
-    
-    # 检查必填字段
-    if not data or not all(k in data for k in ('wind_speed', 'temperature', 'humidity')):
-        return jsonify({'message': '缺少必填字段'}), 400
-    
-    try:
-        # 尝试转换数据类型
-        wind_speed = float(data['wind_speed'])
-        temperature = float(data['temperature'])
-        humidity = float(data['humidity'])
-    except (ValueError, TypeError):
-        return jsonify({'message': '输入数据格式错误，请确保风速、温度和湿度为数值类型'}), 400
-    
-    # 获取阈值设置
-    threshold = FireThreshold.query.order_by(FireThreshold.id.desc()).first()
-    
-    # 预测风险等级
-    try:
-        risk_level = FirePredictor.predict_risk(
-            wind_speed, 
-            temperature, 
-            humidity,
-            threshold
-        )
-        
-        # 预测可能火灾面积
-        predicted_area = FirePredictor.predict_fire_area(
-            wind_speed, 
-            temperature, 
-            humidity, 
-            risk_level
-        )
-        
-        result = {
-            'wind_speed': wind_speed,
-            'temperature': temperature,
-            'humidity': humidity,
-            'risk_level': risk_level,
-            'predicted_area': predicted_area
-        }
-        
-        return jsonify(result), 200
-    except Exception as e:
-        print(f"预测过程中发生错误: {str(e)}")
-        return jsonify({'message': f'预测过程中发生错误: {str(e)}'}), 500
-
-@fire_routes.route('/save-prediction', methods=['POST'])
-def save_fire_prediction():
-    """保存火灾预测结果"""
-    # 移除JWT认证，允许未登录用户保存
-    data = request.get_json()
-    
-    # 检查必填字段
-    if not data or not all(k in data for k in ('wind_speed', 'temperature', 
-                                             'humidity', 'risk_level', 'predicted_area')):
-        return jsonify({'message': '缺少必填字段'}), 400
-    
-    try:
-        # 尝试转换数据类型
-        wind_speed = float(data['wind_speed'])
-        temperature = float(data['temperature'])
-        humidity = float(data['humidity'])
-        predicted_area = float(data['predicted_area'])
-    except (ValueError, TypeError):
-        return jsonify({'message': '输入数据格式错误，请确保风速、温度、湿度和预测面积为数值类型'}), 400
-    
-    # 创建新的火灾数据记录
-    new_fire_data = FireData(
-        monitor_point_id=data.get('monitor_point_id', 1),  # 如果没有指定监测点，使用默认值1
-        wind_speed=wind_speed,
-        temperature=temperature,
-        humidity=humidity,
-        risk_level=data['risk_level'],
-        predicted_area=predicted_area,
-        timestamp=datetime.utcnow(),
-        latitude=float(data.get('latitude', 35.0)),  # 使用默认值或提供的值
-        longitude=float(data.get('longitude', 116.0))  # 使用默认值或提供的值
-    )
-    
-    # 保存到数据库
-    db.session.add(new_fire_data)
-    db.session.commit()
-    
-    return jsonify({'message': '火灾预测数据保存成功', 'fire_data': new_fire_data.to_dict()}), 201
-
-# 火灾阈值相关路由
-@fire_routes.route('/threshold', methods=['GET'])
-def get_fire_threshold():
-    """获取当前火灾阈值设置"""
-    threshold = FireThreshold.query.order_by(FireThreshold.id.desc()).first()
-    
-    if not threshold:
-        # 返回默认阈值
-        return jsonify({
-            'wind_speed_threshold': 10.0,
-            'temperature_threshold': 30.0,
-            'humidity_threshold': 30.0
-        }), 200
-    
-    return jsonify(threshold.to_dict()), 200
-
-@fire_routes.route('/threshold', methods=['POST'])
-def set_fire_threshold():
-    """设置火灾阈值（允许非管理员）"""
-    # 移除admin_required认证，改为普通认证
-    data = request.get_json()
-    
-    # 检查必填字段
-    if not data or not all(k in data for k in ('wind_speed_threshold', 'temperature_threshold', 'humidity_threshold')):
-        return jsonify({'message': '缺少必填字段'}), 400
-    
-    try:
-        # 尝试转换数据类型
-        wind_speed_threshold = float(data['wind_speed_threshold'])
-        temperature_threshold = float(data['temperature_threshold'])
-        humidity_threshold = float(data['humidity_threshold'])
-    except (ValueError, TypeError):
-        return jsonify({'message': '输入数据格式错误，请确保阈值为数值类型'}), 400
-    
-    # 创建新的阈值设置
-    new_threshold = FireThreshold(
-        wind_speed_threshold=wind_speed_threshold,
-        temperature_threshold=temperature_threshold,
-        humidity_threshold=humidity_threshold,
-        updated_by=1  # 使用默认用户ID
-    )
-    
-    # 保存到数据库
-    db.session.add(new_threshold)
-    db.session.commit()
-    
-    return jsonify({'message': '火灾阈值设置更新成功', 'threshold': new_threshold.to_dict()}), 201
-
-# 火灾数据记录相关路由
-@fire_routes.route('/data', methods=['GET'])
-@jwt_required()
-def get_fire_data():
-    """获取火灾数据记录列表，可按风险等级过滤"""
-    # 获取查询参数
-    risk_level = request.args.get('risk_level')
-    limit = request.args.get('limit', 100, type=int)
-    
-    # 构建查询
-    query = FireData.query
-    
-    # 按风险等级过滤
-    if risk_level:
-        query = query.filter_by(risk_level=risk_level)
-    
-    # 按时间排序并限制返回数量
-    fire_data = query.order_by(FireData.timestamp.desc()).limit(limit).all()
-    
-    return jsonify([data.to_dict() for data in fire_data]), 200
-
-@fire_routes.route('/data/<int:data_id>', methods=['GET'])
-@jwt_required()
-def get_fire_data_detail(data_id):
-    """获取特定火灾数据记录详情"""
-    fire_data = FireData.query.get(data_id)
-    if not fire_data:
-        return jsonify({'message': '火灾数据记录不存在'}), 404
-    
-    return jsonify(fire_data.to_dict()), 200
-
-@fire_routes.route('/data/<int:data_id>', methods=['DELETE'])
-@admin_required
-def delete_fire_data(data_id):
-    """删除火灾数据记录（仅管理员）"""
-    fire_data = FireData.query.get(data_id)
-    if not fire_data:
-        return jsonify({'message': '火灾数据记录不存在'}), 404
-    
-    # 删除火灾数据记录
-    db.session.delete(fire_data)
-    db.session.commit()
-    
+from flask import Blueprint, request, jsonify, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import MonitorPoint, MonitorRecord, LatestReading, FireThreshold, FireData, db
+from routes.user_routes import admin_required
+from datetime import datetime
+from fire_prediction import FirePredictor
+from threshold_cache import get_active_threshold, invalidate_threshold_cache, THRESHOLD_VERSION
+from conditional import conditional_get
+import fire_stats
+import events
+from pagination import paginate, add_pagination_headers
+import heatmap
+import fire_spread
+
+fire_routes = Blueprint('fire', __name__, url_prefix='/api/fire')
+
+# 火灾预测相关路由
+@fire_routes.route('/predict', methods=['GET'])
+def predict_fire_risk():
+    """预测所有监测点的火灾风险"""
+    # 调用分析函数分析所有监测点的最新数据
+    results = FirePredictor.analyze_monitor_data()
+    
+    return jsonify(results), 200
+
+@fire_routes.route('/predict/<int:point_id>', methods=['GET'])
+def predict_fire_risk_for_point(point_id):
+    """预测特定监测点的火灾风险"""
+    # 检查监测点是否存在
+    point = MonitorPoint.query.get(point_id)
+    if not point:
+        return jsonify({'message': '监测点不存在'}), 404
+    
+    # 调用分析函数分析指定监测点的最新数据
+    results = FirePredictor.analyze_monitor_data(point_id)
+    
+    if not results:
+        return jsonify({'message': '无可用的监测数据'}), 404
+    
+    return jsonify(results[0]), 200
+
+@fire_routes.route('/predict/<int:point_id>/spread', methods=['GET'])
+def simulate_fire_spread_for_point(point_id):
+    """以监测点为起火点模拟火灾蔓延，返回各时刻的过火面积和火场轮廓"""
+    point = MonitorPoint.query.get(point_id)
+    if not point:
+        return jsonify({'message': '监测点不存在'}), 404
+    
+    # 气象条件默认使用监测点的最新数据，可通过查询参数覆盖
+    reading = LatestReading.query.get(point_id)
+    conditions = {}
+    for field in ('wind_speed', 'temperature', 'humidity'):
+        value = request.args.get(field)
+        if value is None:
+            if not reading:
+                return jsonify({'message': '无可用的监测数据，请提供风速、温度和湿度'}), 404
+            value = getattr(reading, field)
+        conditions[field] = value
+    
+    try:
+        wind_speed = float(conditions['wind_speed'])
+        temperature = float(conditions['temperature'])
+        humidity = float(conditions['humidity'])
+        wind_direction = float(request.args.get('wind_direction', 0)) % 360
+        hours = float(request.args.get('hours', fire_spread.DEFAULT_HOURS))
+        grid_size = int(request.args.get('grid_size', fire_spread.DEFAULT_GRID_SIZE))
+        cell_size = float(request.args.get('cell_size', fire_spread.DEFAULT_CELL_SIZE_M))
+        snapshot_minutes = float(request.args.get('snapshot_minutes', fire_spread.DEFAULT_SNAPSHOT_MINUTES))
+        seed = request.args.get('seed', type=int)
+    except (ValueError, TypeError):
+        return jsonify({'message': '参数格式错误，请确保各参数为数值类型'}), 400
+    
+    if not 0 < hours <= fire_spread.MAX_HOURS:
+        return jsonify({'message': f'模拟时长必须大于0且不超过{fire_spread.MAX_HOURS:g}小时'}), 400
+    if not 10 <= grid_size <= fire_spread.MAX_GRID_SIZE:
+        return jsonify({'message': f'网格大小必须在10到{fire_spread.MAX_GRID_SIZE}之间'}), 400
+    if not 1 <= cell_size <= 1000:
+        return jsonify({'message': '网格边长必须在1到1000米之间'}), 400
+    if snapshot_minutes < 1:
+        return jsonify({'message': '快照间隔不能小于1分钟'}), 400
+    if not (0 <= wind_speed <= 100 and -50 <= temperature <= 70 and 0 <= humidity <= 100 and 0 <= wind_direction < 360):
+        return jsonify({'message': '气象参数超出范围: 风速0~100m/s，温度-50~70°C，湿度0~100%'}), 400
+    
+    result = fire_spread.simulate_spread(
+        point.latitude, point.longitude,
+        wind_speed, humidity,
+        temperature=temperature,
+        wind_direction=wind_direction,
+        hours=hours,
+        grid_size=grid_size,
+        cell_size_m=cell_size,
+        snapshot_minutes=snapshot_minutes,
+        seed=seed
+    )
+    
+    return jsonify({
+        'monitor_point_id': point.id,
+        'monitor_point_name': point.name,
+        'latitude': point.latitude,
+        'longitude': point.longitude,
+        'wind_speed': wind_speed,
+        'wind_direction': wind_direction,
+        'temperature': temperature,
+        'humidity': humidity,
+        'hours': hours,
+        'grid_size': grid_size,
+        'cell_size': cell_size,
+        **result
+    }), 200
+
+@fire_routes.route('/heatmap/<int:z>/<int:x>/<int:y>.<fmt>', methods=['GET'])
+def get_risk_heatmap_tile(z, x, y, fmt):
+    """获取火灾风险热力图瓦片 (Web墨卡托 z/x/y)，支持 png 和 json 格式"""
+    if fmt not in ('png', 'json'):
+        return jsonify({'message': '瓦片格式只能是 png 或 json'}), 404
+    if z > heatmap.MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        return jsonify({'message': '瓦片坐标超出范围'}), 404
+    
+    if fmt == 'png':
+        return Response(heatmap.get_tile(z, x, y, 'png'), mimetype='image/png')
+    
+    # JSON 瓦片可指定网格大小，默认 64×64
+    size = request.args.get('size', 64, type=int)
+    size = max(1, min(size, heatmap.TILE_SIZE))
+    return jsonify(heatmap.get_tile(z, x, y, 'json', size)), 200
+
+@fire_routes.route('/predict/custom', methods=['POST'])
+def predict_custom_data():
+    """使用自定义数据进行火灾风险预测"""
+    data = request.get_json()
+    
+    # 检查必填字段
+    if not data or not all(k in data for k in ('wind_speed', 'temperature', 'humidity')):
+        return jsonify({'message': '缺少必填字段'}), 400
+    
+    try:
+        # 尝试转换数据类型
+        wind_speed = float(data['wind_speed'])
+        temperature = float(data['temperature'])
+        humidity = float(data['humidity'])
+    except (ValueError, TypeError):
+        return jsonify({'message': '输入数据格式错误，请确保风速、温度和湿度为数值类型'}), 400
+    
+    # 获取阈值设置
+    threshold = get_active_threshold()
+    
+    # 预测风险等级
+    try:
+        risk_level = FirePredictor.predict_risk(
+            wind_speed, 
+            temperature, 
+            humidity,
+            threshold
+        )
+        
+        # 预测可能火灾面积
+        predicted_area = FirePredictor.predict_fire_area(
+            wind_speed, 
+            temperature, 
+            humidity, 
+            risk_level
+        )
+        
+        result = {
+            'wind_speed': wind_speed,
+            'temperature': temperature,
+            'humidity': humidity,
+            'risk_level': risk_level,
+            'predicted_area': predicted_area
+        }
+        
+        return jsonify(result), 200
+    except Exception as e:
+        print(f"预测过程中发生错误: {str(e)}")
+        return jsonify({'message': f'预测过程中发生错误: {str(e)}'}), 500
+
+@fire_routes.route('/save-prediction', methods=['POST'])
+def save_fire_prediction():
+    """保存火灾预测结果"""
+    # 移除JWT认证，允许未登录用户保存
+    data = request.get_json()
+    
+    # 检查必填字段
+    if not data or not all(k in data for k in ('wind_speed', 'temperature', 
+                                             'humidity', 'risk_level', 'predicted_area')):
+        return jsonify({'message': '缺少必填字段'}), 400
+    
+    try:
+        # 尝试转换数据类型
+        wind_speed = float(data['wind_speed'])
+        temperature = float(data['temperature'])
+        humidity = float(data['humidity'])
+        predicted_area = float(data['predicted_area'])
+    except (ValueError, TypeError):
+        return jsonify({'message': '输入数据格式错误，请确保风速、温度、湿度和预测面积为数值类型'}), 400
+    
+    # 创建新的火灾数据记录
+    new_fire_data = FireData(
+        monitor_point_id=data.get('monitor_point_id', 1),  # 如果没有指定监测点，使用默认值1
+        wind_speed=wind_speed,
+        temperature=temperature,
+        humidity=humidity,
+        risk_level=data['risk_level'],
+        predicted_area=predicted_area,
+        timestamp=datetime.utcnow(),
+        latitude=float(data.get('latitude', 35.0)),  # 使用默认值或提供的值
+        longitude=float(data.get('longitude', 116.0))  # 使用默认值或提供的值
+    )
+    
+    # 保存到数据库
+    db.session.add(new_fire_data)
+    fire_stats.record_fire_data(new_fire_data)
+    db.session.commit()
+    fire_stats.mark_changed()
+    
+    return jsonify({'message': '火灾预测数据保存成功', 'fire_data': new_fire_data.to_dict()}), 201
+
+# 火灾阈值相关路由
+@fire_routes.route('/threshold', methods=['GET'])
+@conditional_get(THRESHOLD_VERSION)
+def get_fire_threshold():
+    """获取当前火灾阈值设置"""
+    threshold = get_active_threshold()
+    
+    if not threshold:
+        # 返回默认阈值
+        return jsonify({
+            'wind_speed_threshold': 10.0,
+            'temperature_threshold': 30.0,
+            'humidity_threshold': 30.0
+        }), 200
+    
+    return jsonify(threshold), 200
+
+@fire_routes.route('/threshold', methods=['POST'])
+def set_fire_threshold():
+    """设置火灾阈值（允许非管理员）"""
+    # 移除admin_required认证，改为普通认证
+    data = request.get_json()
+    
+    # 检查必填字段
+    if not data or not all(k in data for k in ('wind_speed_threshold', 'temperature_threshold', 'humidity_threshold')):
+        return jsonify({'message': '缺少必填字段'}), 400
+    
+    try:
+        # 尝试转换数据类型
+        wind_speed_threshold = float(data['wind_speed_threshold'])
+        temperature_threshold = float(data['temperature_threshold'])
+        humidity_threshold = float(data['humidity_threshold'])
+    except (ValueError, TypeError):
+        return jsonify({'message': '输入数据格式错误，请确保阈值为数值类型'}), 400
+    
+    # 创建新的阈值设置
+    new_threshold = FireThreshold(
+        wind_speed_threshold=wind_speed_threshold,
+        temperature_threshold=temperature_threshold,
+        humidity_threshold=humidity_threshold,
+        updated_by=1  # 使用默认用户ID
+    )
+    
+    # 保存到数据库
+    db.session.add(new_threshold)
+    db.session.commit()
+    
+    # 使所有worker的阈值缓存失效，并推送风险等级的变化
+    invalidate_threshold_cache()
+    events.notify()
+    
+    return jsonify({'message': '火灾阈值设置更新成功', 'threshold': new_threshold.to_dict()}), 201
+
+# 火灾数据记录相关路由
+@fire_routes.route('/data', methods=['GET'])
+@jwt_required()
+def get_fire_data():
+    """获取火灾数据记录列表，可按风险等级过滤 (按时间倒序，支持 cursor/since/until 游标分页)"""
+    # 获取查询参数
+    risk_level = request.args.get('risk_level')
+    
+    # 构建查询 (JOIN预加载监测点)
+    query = FireData.with_point()
+    
+    # 按风险等级过滤
+    if risk_level:
+        query = query.filter_by(risk_level=risk_level)
+    
+    # 按 (时间, ID) 倒序取一页，下一页的游标在响应头中返回
+    try:
+        fire_data, next_cursor = paginate(query, FireData.timestamp, FireData.id)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    response = jsonify([data.to_dict() for data in fire_data])
+    return add_pagination_headers(response, next_cursor), 200
+
+@fire_routes.route('/data/<int:data_id>', methods=['GET'])
+@jwt_required()
+def get_fire_data_detail(data_id):
+    """获取特定火灾数据记录详情"""
+    fire_data = FireData.query.get(data_id)
+    if not fire_data:
+        return jsonify({'message': '火灾数据记录不存在'}), 404
+    
+    return jsonify(fire_data.to_dict()), 200
+
+@fire_routes.route('/data/<int:data_id>', methods=['DELETE'])
+@admin_required
+def delete_fire_data(data_id):
+    """删除火灾数据记录（仅管理员）"""
+    fire_data = FireData.query.get(data_id)
+    if not fire_data:
+        return jsonify({'message': '火灾数据记录不存在'}), 404
+    
+    # 删除火灾数据记录
+    fire_stats.remove_fire_data(fire_data)
+    db.session.delete(fire_data)
+    db.session.commit()
+    fire_stats.mark_changed()
+    
     return jsonify({'message': '火灾数据记录删除成功'}), 200 
\ No newline at end of file
@@ -1,227 +1,452 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import MonitorPoint, MonitorRecord, db
-from routes.user_routes import admin_required
-from datetime import datetime
-
-monitor_routes = Blueprint('monitor', __name__, url_prefix='/api/monitor')
-
-# 监测点相关路由
-@monitor_routes.route('/points', methods=['GET'])
-def get_all_monitor_points():
-    """获取所有监测点"""
-    monitor_points = MonitorPoint.query.all()
-    return jsonify([point.to_dict() for point in monitor_points]), 200
-
-@monitor_routes.route('/points/<int:point_id>', methods=['GET'])
-def get_monitor_point(point_id):
-    """获取特定监测点详情"""
-    point = MonitorPoint.query.get(point_id)
-    if not point:
-        return jsonify({'message': '监测点不存在'}), 404
-    return jsonify(point.to_dict()), 200
-
-@monitor_routes.route('/points', methods=['POST'])
-def create_monitor_point():
-    """创建新监测点（所有用户都可以）"""
-    data = request.get_json()
-    
-    # 检查必填字段
-    if not data or not all(k in data for k in ('name', 'latitude', 'longitude')):
-        return jsonify({'message': '缺少必填字段'}), 400
-    
-    try:
-        # 尝试转换数据类型
-        latitude = float(data['latitude'])
-        longitude = float(data['longitude'])
-    except (ValueError, TypeError):
-        return jsonify({'message': '输入数据格式错误，请确保经纬度为数值类型'}), 400
-    
-    # 检查监测点名称是否已存在
-    if MonitorPoint.query.filter_by(name=data['name']).first():
-        return jsonify({'message': '监测点名称已存在'}), 400
-    
-    # 创建新监测点
-    new_point = MonitorPoint(
-        name=data['name'],
-        latitude=latitude,
-        longitude=longitude,
-        active=data.get('active', True)
-    )
-    
-    # 保存到数据库
-    db.session.add(new_point)
-    db.session.commit()
-    
-    return jsonify({'message': '监测点创建成功', 'monitor_point': new_point.to_dict()}), 201
-
-@monitor_routes.route('/points/<int:point_id>', methods=['PUT'])
-@admin_required
-def update_monitor_point(point_id):
-    """更新监测点信息（仅管理员）"""
-    point = MonitorPoint.query.get(point_id)
-    if not point:
-        return jsonify({'message': '监测点不存在'}), 404
-    
-    data = request.get_json()
-    if not data:
-        return jsonify({'message': '无效的请求数据'}), 400
-    
-    # 更新监测点名称
-    if 'name' in data and data['name'] != point.name:
-        if MonitorPoint.query.filter_by(name=data['name']).first():
-            return jsonify({'message': '监测点名称已存在'}), 400
-        point.name = data['name']
-    
-    # 更新经纬度
-    if 'latitude' in data:
-        point.latitude = data['latitude']
-    if 'longitude' in data:
-        point.longitude = data['longitude']
-    
-    # 更新活动状态
-    if 'active' in data:
-        point.active = data['active']
-    
-    # 保存更改
-    db.session.commit()
-    
-    return jsonify({'message': '监测点更新成功', 'monitor_point': point.to_dict()}), 200
-
-@monitor_routes.route('/points/<int:point_id>', methods=['DELETE'])
-@admin_required
-def delete_monitor_point(point_id):
-    """删除监测点（仅管理员）"""
-    point = MonitorPoint.query.get(point_id)
-    if not point:
-        return jsonify({'message': '监测点不存在'}), 404
-    
-    # 删除监测点
-    db.session.delete(point)
-    db.session.commit()
-    
-    return jsonify({'message': '监测点删除成功'}), 200
-
-# 监测数据相关路由
-@monitor_routes.route('/records', methods=['GET'])
-@jwt_required()
-def get_all_monitor_records():
-    """获取所有监测记录或按监测点过滤"""
-    # 获取查询参数
-    point_id = request.args.get('point_id', type=int)
-    limit = request.args.get('limit', 100, type=int)
-    
-    # 构建查询
-    query = MonitorRecord.query
-    
-    # 按监测点过滤
-    if point_id:
-        query = query.filter_by(monitor_point_id=point_id)
-    
-    # 按时间排序并限制返回数量
-    records = query.order_by(MonitorRecord.timestamp.desc()).limit(limit).all()
-    
-    return jsonify([record.to_dict() for record in records]), 200
-
-@monitor_routes.route('/records/<int:record_id>', methods=['GET'])
-@jwt_required()
-def get_monitor_record(record_id):
-    """获取特定监测记录详情"""
-    record = MonitorRecord.query.get(record_id)
-    if not record:
-        return jsonify({'message': '监测记录不存在'}), 404
-    return jsonify(record.to_dict()), 200
-
-@monitor_routes.route('/records', methods=['POST'])
-@jwt_required()
-def create_monitor_record():
-    """创建新监测记录"""
-    data = request.get_json()
-    
-    # 检查必填字段
-    if not data or not all(k in data for k in ('monitor_point_id', 'wind_speed', 'temperature', 'humidity')):
-        return jsonify({'message': '缺少必填字段'}), 400
-    
-    # 检查监测点是否存在
-    monitor_point = MonitorPoint.query.get(data['monitor_point_id'])
-    if not monitor_point:
-        return jsonify({'message': '监测点不存在'}), 404
-    
-    # 创建新监测记录
-    new_record = MonitorRecord(
-        monitor_point_id=data['monitor_point_id'],
-        wind_speed=data['wind_speed'],
-        temperature=data['temperature'],
-        humidity=data['humidity'],
-        timestamp=datetime.utcnow()
-    )
-    
-    # 保存到数据库
-    db.session.add(new_record)
-    db.session.commit()
-    
-    return jsonify({'message': '监测记录创建成功', 'record': new_record.to_dict()}), 201
-
-@monitor_routes.route('/records/<int:record_id>', methods=['PUT'])
-@admin_required
-def update_monitor_record(record_id):
-    """更新监测记录（仅管理员）"""
-    record = MonitorRecord.query.get(record_id)
-    if not record:
-        return jsonify({'message': '监测记录不存在'}), 404
-    
-    data = request.get_json()
-    if not data:
-        return jsonify({'message': '无效的请求数据'}), 400
-    
-    # 更新数据
-    if 'wind_speed' in data:
-        record.wind_speed = data['wind_speed']
-    if 'temperature' in data:
-        record.temperature = data['temperature']
-    if 'humidity' in data:
-        record.humidity = data['humidity']
-    if 'monitor_point_id' in data:
-        # 检查监测点是否存在
-        if not MonitorPoint.query.get(data['monitor_point_id']):
-            return jsonify({'message': '监测点不存在'}), 404
-        record.monitor_point_id = data['monitor_point_id']
-    
-    # 保存更改
-    db.session.commit()
-    
-    return jsonify({'message': '监测记录更新成功', 'record': record.to_dict()}), 200
-
-@monitor_routes.route('/records/<int:record_id>', methods=['DELETE'])
-@admin_required
-def delete_monitor_record(record_id):
-    """删除监测记录（仅管理员）"""
-    record = MonitorRecord.query.get(record_id)
-    if not record:
-        return jsonify({'message': '监测记录不存在'}), 404
-    
-    # 删除监测记录
-    db.session.delete(record)
-    db.session.commit()
-    
-    return jsonify({'message': '监测记录删除成功'}), 200
-
-@monitor_routes.route('/latest', methods=['GET'])
-def get_latest_records():
-    """获取每个监测点的最新数据"""
-    # 使用子查询获取每个监测点的最新记录
-    latest_records_query = db.session.query(
-        MonitorRecord.monitor_point_id,
-        db.func.max(MonitorRecord.timestamp).label('max_time')
-    ).group_by(MonitorRecord.monitor_point_id).subquery('latest_records')
-    
-    # 获取实际记录
-    records = db.session.query(MonitorRecord).join(
-        latest_records_query,
-        db.and_(
-            MonitorRecord.monitor_point_id == latest_records_query.c.monitor_point_id,
-            MonitorRecord.timestamp == latest_records_query.c.max_time
-        )
-    ).all()
-    
+import json
+import math
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import MonitorPoint, MonitorRecord, LatestReading, FireData, db
+from routes.user_routes import admin_required
+from datetime import datetime, timedelta
+from ingest import add_record, ingest_readings, validate_readings, parse_reading, parse_timestamp, MAX_BATCH_SIZE
+import latest_readings
+import rollups
+import events
+import archive
+import write_behind
+from spatial_index import get_spatial_index, invalidate_spatial_index, POINTS_VERSION
+from conditional import conditional_get
+import numpy as np
+from pagination import paginate, add_pagination_headers
+
+monitor_routes = Blueprint('monitor', __name__, url_prefix='/api/monitor')
+
+# 监测点相关路由
+@monitor_routes.route('/points', methods=['GET'])
+@conditional_get(POINTS_VERSION)
+def get_all_monitor_points():
+    """获取所有监测点"""
+    monitor_points = MonitorPoint.query.all()
+    return jsonify([point.to_dict() for point in monitor_points]), 200
+
+@monitor_routes.route('/points/bbox', methods=['GET'])
+def get_monitor_points_in_bbox():
+    """获取矩形范围内的监测点 (地图只加载视野内的监测点)，min_lon 大于 max_lon 表示跨越180度经线"""
+    try:
+        min_lat = float(request.args['min_lat'])
+        min_lon = float(request.args['min_lon'])
+        max_lat = float(request.args['max_lat'])
+        max_lon = float(request.args['max_lon'])
+    except (KeyError, ValueError):
+        return jsonify({'message': '请提供数值类型的 min_lat、min_lon、max_lat、max_lon 参数'}), 400
+    
+    if not all(math.isfinite(value) for value in (min_lat, min_lon, max_lat, max_lon)):
+        return jsonify({'message': '经纬度必须是有限数值'}), 400
+    if not -90 <= min_lat <= 90 or not -90 <= max_lat <= 90:
+        return jsonify({'message': '纬度超出范围'}), 400
+    if min_lat > max_lat:
+        return jsonify({'message': 'min_lat 不能大于 max_lat'}), 400
+    
+    points = get_spatial_index().within_bbox(min_lat, min_lon, max_lat, max_lon)
+    return jsonify(points), 200
+
+@monitor_routes.route('/points/nearest', methods=['GET'])
+def get_nearest_monitor_points():
+    """获取距离指定位置最近的 n 个监测点，结果附带距离 (公里)"""
+    try:
+        latitude = float(request.args['lat'])
+        longitude = float(request.args['lon'])
+        n = int(request.args.get('n', 5))
+        max_distance = request.args.get('max_distance_km')
+        max_distance = float(max_distance) if max_distance else None
+    except (KeyError, ValueError):
+        return jsonify({'message': '请提供数值类型的 lat、lon 参数'}), 400
+    
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        return jsonify({'message': '经纬度超出范围'}), 400
+    n = max(1, min(n, 1000))
+    
+    results = get_spatial_index().nearest(latitude, longitude, n, max_distance)
+    return jsonify([
+        dict(point, distance_km=round(distance, 3)) for point, distance in results
+    ]), 200
+
+@monitor_routes.route('/points/<int:point_id>', methods=['GET'])
+def get_monitor_point(point_id):
+    """获取特定监测点详情"""
+    point = MonitorPoint.query.get(point_id)
+    if not point:
+        return jsonify({'message': '监测点不存在'}), 404
+    return jsonify(point.to_dict()), 200
+
+@monitor_routes.route('/points', methods=['POST'])
+def create_monitor_point():
+    """创建新监测点（所有用户都可以）"""
+    data = request.get_json()
+    
+    # 检查必填字段
+    if not data or not all(k in data for k in ('name', 'latitude', 'longitude')):
+        return jsonify({'message': '缺少必填字段'}), 400
+    
+    try:
+        # 尝试转换数据类型
+        latitude = float(data['latitude'])
+        longitude = float(data['longitude'])
+    except (ValueError, TypeError):
+        return jsonify({'message': '输入数据格式错误，请确保经纬度为数值类型'}), 400
+    
+    # 检查监测点名称是否已存在
+    if MonitorPoint.query.filter_by(name=data['name']).first():
+        return jsonify({'message': '监测点名称已存在'}), 400
+    
+    # 创建新监测点
+    new_point = MonitorPoint(
+        name=data['name'],
+        latitude=latitude,
+        longitude=longitude,
+        active=data.get('active', True)
+    )
+    
+    # 保存到数据库
+    db.session.add(new_point)
+    db.session.commit()
+    invalidate_spatial_index()
+    
+    return jsonify({'message': '监测点创建成功', 'monitor_point': new_point.to_dict()}), 201
+
+@monitor_routes.route('/points/<int:point_id>', methods=['PUT'])
+@admin_required
+def update_monitor_point(point_id):
+    """更新监测点信息（仅管理员）"""
+    point = MonitorPoint.query.get(point_id)
+    if not point:
+        return jsonify({'message': '监测点不存在'}), 404
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'message': '无效的请求数据'}), 400
+    
+    # 更新监测点名称
+    if 'name' in data and data['name'] != point.name:
+        if MonitorPoint.query.filter_by(name=data['name']).first():
+            return jsonify({'message': '监测点名称已存在'}), 400
+        point.name = data['name']
+    
+    # 更新经纬度
+    if 'latitude' in data:
+        point.latitude = data['latitude']
+    if 'longitude' in data:
+        point.longitude = data['longitude']
+    
+    # 更新活动状态
+    if 'active' in data:
+        point.active = data['active']
+    
+    # 保存更改
+    db.session.commit()
+    invalidate_spatial_index()
+    events.notify()
+    
+    return jsonify({'message': '监测点更新成功', 'monitor_point': point.to_dict()}), 200
+
+def _has_point_data(point_id):
+    """监测点是否有监测记录 (含归档)、最新数据快照、聚合数据或火灾数据"""
+    for model in (MonitorRecord, LatestReading, *rollups.ROLLUP_MODELS.values(), FireData):
+        if db.session.query(model.query.filter_by(monitor_point_id=point_id).exists()).scalar():
+            return True
+    return archive.has_archive(point_id)
+
+@monitor_routes.route('/points/<int:point_id>', methods=['DELETE'])
+@admin_required
+def delete_monitor_point(point_id):
+    """
+    删除监测点（仅管理员）
+
+    已有监测数据 (包括已归档的记录和最新数据快照、聚合数据) 或火灾数据的监测点不能删除，
+    否则这些数据会失去所属的监测点；不再使用的监测点可以停用 (active=false)
+    """
+    point = MonitorPoint.query.get(point_id)
+    if not point:
+        return jsonify({'message': '监测点不存在'}), 404
+    
+    if _has_point_data(point_id):
+        return jsonify({'message': '监测点已有监测数据或火灾数据，不能删除，可以停用'}), 400
+    
+    # 删除监测点
+    db.session.delete(point)
+    db.session.commit()
+    invalidate_spatial_index()
+    events.notify()
+    
+    return jsonify({'message': '监测点删除成功'}), 200
+
+# 监测数据相关路由
+@monitor_routes.route('/records', methods=['GET'])
+@jwt_required()
+def get_all_monitor_records():
+    """
+    获取所有监测记录或按监测点过滤 (按时间倒序，支持 cursor/since/until 游标分页)
+
+    只包含数据库中的近期记录: 已归档的记录不在列表中，X-Archived-Before 响应头给出归档截止时间，
+    更早的数据通过 /api/monitor/history 或导出接口获取
+    """
+    # 获取查询参数
+    point_id = request.args.get('point_id', type=int)
+    
+    # 构建查询 (JOIN预加载监测点)
+    query = MonitorRecord.with_point()
+    
+    # 按监测点过滤
+    if point_id:
+        query = query.filter_by(monitor_point_id=point_id)
+    
+    # 按 (时间, ID) 倒序取一页，下一页的游标在响应头中返回
+    try:
+        records, next_cursor = paginate(query, MonitorRecord.timestamp, MonitorRecord.id)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    response = jsonify([record.to_dict() for record in records])
+    cutoff = archive.archived_before()
+    if cutoff:
+        response.headers['X-Archived-Before'] = cutoff.strftime('%Y-%m-%d %H:%M:%S')
+    return add_pagination_headers(response, next_cursor), 200
+
+@monitor_routes.route('/records/<int:record_id>', methods=['GET'])
+@jwt_required()
+def get_monitor_record(record_id):
+    """获取特定监测记录详情"""
+    record = MonitorRecord.query.get(record_id)
+    if not record:
+        return jsonify({'message': '监测记录不存在'}), 404
+    return jsonify(record.to_dict()), 200
+
+def _queue_full_response():
+    return jsonify({'message': '写入队列已满，请稍后重试'}), 503, {'Retry-After': '1'}
+
+@monitor_routes.route('/records', methods=['POST'])
+@jwt_required()
+def create_monitor_record():
+    """创建新监测记录"""
+    data = request.get_json()
+    if not data:
+        return jsonify({'message': '缺少必填字段'}), 400
+    
+    # 校验并转换字段类型 (表单提交的数值可能是字符串)，与批量接口使用同一套校验；
+    # 异步写入模式下监测点是否存在由进程内的监测点索引判断
+    async_mode = write_behind.enabled(current_app)
+    rows, errors = validate_readings([data], get_spatial_index().point_ids if async_mode else None)
+    if errors:
+        message = errors[0]['message']
+        return jsonify({'message': message}), 404 if message == '监测点不存在' else 400
+    
+    # 异步写入模式: 放入后台写入队列
+    if async_mode:
+        if not write_behind.enqueue(current_app._get_current_object(), rows):
+            return _queue_full_response()
+        
+        record = dict(rows[0])
+        return jsonify({'message': '监测记录已接收，将在后台写入', 'record': record}), 202
+    
+    # 创建新监测记录
+    new_record = MonitorRecord(**rows[0])
+    
+    # 保存到数据库 (同时更新最新数据快照)
+    add_record(new_record)
+    db.session.commit()
+    latest_readings.mark_changed()
+    events.notify()
+    
+    return jsonify({'message': '监测记录创建成功', 'record': new_record.to_dict()}), 201
+
+def _to_line_indexes(errors, line_indexes):
+    """把逐条错误中的记录序号换算为 NDJSON 的行号"""
+    if line_indexes is not None:
+        for error in errors:
+            error['index'] = line_indexes[error['index']]
+
+@monitor_routes.route('/records/batch', methods=['POST'])
+@jwt_required()
+def create_monitor_records_batch():
+    """
+    批量创建监测记录，请求体为JSON数组或NDJSON(每行一条记录)
+
+    errors 中的 index 为记录在JSON数组中的下标；NDJSON 时为从0开始的行号 (空行跳过但计入行号)
+    """
+    # NDJSON 每条记录所在的行号
+    line_indexes = None
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        items = []
+        line_indexes = []
+        for line_index, line in enumerate(request.get_data(as_text=True).splitlines()):
+            if not line.strip():
+                continue
+            line_indexes.append(line_index)
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                # 无法解析的行按格式错误逐条返回
+                items.append(None)
+    else:
+        items = request.get_json(silent=True)
+        # 也支持 {"records": [...]} 形式
+        if isinstance(items, dict):
+            items = items.get('records')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': '请求体应为非空的JSON数组或NDJSON'}), 400
+    
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'message': f'单次最多提交 {MAX_BATCH_SIZE} 条监测记录'}), 413
+    
+    if write_behind.enabled(current_app):
+        rows, errors = validate_readings(items, get_spatial_index().point_ids)
+        _to_line_indexes(errors, line_indexes)
+        if rows and not write_behind.enqueue(current_app._get_current_object(), rows):
+            return _queue_full_response()
+        
+        result = {
+            'message': '批量数据已接收，将在后台写入' if rows else '没有有效的监测记录',
+            'accepted': len(rows),
+            'failed': len(errors),
+            'errors': errors
+        }
+        return jsonify(result), 202 if rows else 400
+    
+    inserted, errors = ingest_readings(items)
+    _to_line_indexes(errors, line_indexes)
+    
+    result = {
+        'message': '批量写入完成' if inserted else '没有有效的监测记录',
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': errors
+    }
+    return jsonify(result), 201 if inserted else 400
+
+@monitor_routes.route('/records/<int:record_id>', methods=['PUT'])
+@admin_required
+def update_monitor_record(record_id):
+    """更新监测记录（仅管理员）"""
+    record = MonitorRecord.query.get(record_id)
+    if not record:
+        return jsonify({'message': '监测记录不存在'}), 404
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'message': '无效的请求数据'}), 400
+    
+    # 与新建记录使用同一套校验和类型转换 (未提供的字段保持原值)
+    fields = ('monitor_point_id', 'wind_speed', 'temperature', 'humidity')
+    row, error = parse_reading(
+        {field: data.get(field, getattr(record, field)) for field in fields},
+        record.timestamp
+    )
+    if error:
+        return jsonify({'message': error}), 400
+    
+    previous_point_id = record.monitor_point_id
+    # 检查监测点是否存在
+    if row['monitor_point_id'] != previous_point_id and not MonitorPoint.query.get(row['monitor_point_id']):
+        return jsonify({'message': '监测点不存在'}), 404
+    
+    # 更新数据
+    for field in fields:
+        setattr(record, field, row[field])
+    
+    # 重新计算受影响监测点的最新数据快照和聚合数据
+    latest_readings.refresh_point(previous_point_id)
+    rollups.refresh_buckets(previous_point_id, record.timestamp)
+    if record.monitor_point_id != previous_point_id:
+        latest_readings.refresh_point(record.monitor_point_id)
+        rollups.refresh_buckets(record.monitor_point_id, record.timestamp)
+    
+    # 保存更改
+    db.session.commit()
+    latest_readings.mark_changed()
+    events.notify()
+    
+    return jsonify({'message': '监测记录更新成功', 'record': record.to_dict()}), 200
+
+@monitor_routes.route('/records/<int:record_id>', methods=['DELETE'])
+@admin_required
+def delete_monitor_record(record_id):
+    """删除监测记录（仅管理员）"""
+    record = MonitorRecord.query.get(record_id)
+    if not record:
+        return jsonify({'message': '监测记录不存在'}), 404
+    
+    # 删除监测记录，并重新计算该监测点的最新数据快照和聚合数据
+    point_id = record.monitor_point_id
+    timestamp = record.timestamp
+    db.session.delete(record)
+    latest_readings.refresh_point(point_id)
+    rollups.refresh_buckets(point_id, timestamp)
+    db.session.commit()
+    latest_readings.mark_changed()
+    events.notify()
+    
+    return jsonify({'message': '监测记录删除成功'}), 200
+
+@monitor_routes.route('/rollups', methods=['GET'])
+@jwt_required()
+def get_monitor_rollups():
+    """获取监测数据的小时/天聚合，可按监测点和时间范围过滤"""
+    # 获取查询参数
+    point_ids = request.args.getlist('point_id', type=int)
+    period = request.args.get('period')
+    if period and period not in rollups.ROLLUP_MODELS:
+        return jsonify({'message': '聚合粒度只能是 hour 或 day'}), 400
+    
+    try:
+        end = parse_timestamp(request.args['end']) if request.args.get('end') else datetime.utcnow()
+        start = parse_timestamp(request.args['start']) if request.args.get('start') else end - timedelta(days=7)
+    except (ValueError, TypeError):
+        return jsonify({'message': '时间格式错误，请使用 YYYY-MM-DD HH:MM:SS 或 ISO 8601 格式'}), 400
+    
+    period, results = rollups.query_rollups(start, end, period, point_ids)
+    
+    return jsonify({
+        'period': period,
+        'start': start.strftime('%Y-%m-%d %H:%M:%S'),
+        'end': end.strftime('%Y-%m-%d %H:%M:%S'),
+        'rollups': [rollup.to_dict() for rollup in results]
+    }), 200
+
+@monitor_routes.route('/history', methods=['GET'])
+@jwt_required()
+def get_monitor_history():
+    """获取监测点的历史数据 (自动合并归档数据和数据库中的记录)，按列返回"""
+    # 获取查询参数
+    point_id = request.args.get('point_id', type=int)
+    if not point_id:
+        return jsonify({'message': '缺少监测点ID'}), 400
+    
+    if not MonitorPoint.query.get(point_id):
+        return jsonify({'message': '监测点不存在'}), 404
+    
+    try:
+        end = parse_timestamp(request.args['end']) if request.args.get('end') else datetime.utcnow()
+        start = parse_timestamp(request.args['start']) if request.args.get('start') else end - timedelta(days=7)
+    except (ValueError, TypeError):
+        return jsonify({'message': '时间格式错误，请使用 YYYY-MM-DD HH:MM:SS 或 ISO 8601 格式'}), 400
+    
+    data = archive.read_history(point_id, start, end)
+    timestamps = np.char.replace(np.datetime_as_string(data['timestamp'], unit='s'), 'T', ' ')
+    
+    return jsonify({
+        'monitor_point_id': point_id,
+        'start': start.strftime('%Y-%m-%d %H:%M:%S'),
+        'end': end.strftime('%Y-%m-%d %H:%M:%S'),
+        'count': len(data),
+        'id': data['id'].tolist(),
+        'timestamp': timestamps.tolist(),
+        'wind_speed': data['wind_speed'].tolist(),
+        'temperature': data['temperature'].tolist(),
+        'humidity': data['humidity'].tolist()
+    }), 200
+
+@monitor_routes.route('/latest', methods=['GET'])
+def get_latest_records():
+    """获取每个监测点的最新数据"""
+    # 直接读取最新数据快照表，每个监测点一行
+    records = LatestReading.with_point().order_by(LatestReading.monitor_point_id).all()
+    
     return jsonify([record.to_dict() for record in records]), 200 
\ No newline at end of file
@@ -0,0 +1,16 @@
+from flask import Blueprint, Response, current_app
+from events import broker
+
+stream_routes = Blueprint('stream', __name__, url_prefix='/api/stream')
+
+@stream_routes.route('', methods=['GET'])
+def stream_events():
+    """实时推送监测数据和风险等级变化 (Server-Sent Events)"""
+    # 与 /api/monitor/latest、/api/fire/predict 一样允许未登录用户访问
+    subscriber = broker.subscribe(current_app._get_current_object())
+    
+    response = Response(broker.stream(subscriber), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 禁止 Nginx 缓冲事件流
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+监测点的进程内空间网格索引
+
+地图只需要当前视野内的监测点，查询附近的监测点也不应每次扫描全部监测点。
+这里按经纬度把监测点划入 CELL_SIZE 度见方的网格，监测点按网格排序存放在 NumPy 数组中，
+每个非空网格记录其在数组中的起止位置:
+- 矩形范围查询先选出与矩形相交的网格，再对网格内的监测点精确过滤
+- 最近邻查询先由内向外扩大网格窗口找到足够的候选点，以第 n 近的距离为半径
+  计算球面上的外接矩形，再对矩形内的监测点按大圆距离精确排序
+
+索引缓存在进程内，通过 cache_versions 中的版本文件感知监测点的增删改 (与阈值缓存相同)。
+"""
+import math
+import threading
+import numpy as np
+from flask import current_app
+from models import MonitorPoint
+from cache_versions import get_version, bump_version
+
+# 监测点索引对应的版本名
+POINTS_VERSION = 'monitor_points'
+
+# 网格边长 (度)
+CELL_SIZE = 0.1
+
+# 地球平均半径 (公里)
+EARTH_RADIUS_KM = 6371.0088
+
+_lock = threading.Lock()
+
+def haversine_km(lat, lon, lats, lons):
+    """计算一个位置到一组位置的大圆距离 (公里)"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def normalize_lon(lon):
+    """把经度换算到 [-180, 180) (地图平移跨过180度经线后经度可能超出该范围)"""
+    return (lon + 180.0) % 360.0 - 180.0
+
+def _cell(values):
+    return np.floor(np.asarray(values, dtype=float) / CELL_SIZE).astype(np.int64)
+
+class GridIndex:
+    """按网格组织的监测点索引，构建后只读"""
+
+    def __init__(self, points):
+        """
+        参数:
+        - points: 监测点字典列表 (MonitorPoint.to_dict())
+        """
+        lats = np.array([point['latitude'] for point in points], dtype=float)
+        lons = np.array([point['longitude'] for point in points], dtype=float)
+        rows, cols = _cell(lats), _cell(lons)
+
+        # 监测点按 (行, 列) 排序，同一网格的监测点在数组中连续
+        order = np.lexsort((cols, rows))
+        self.points = [points[i] for i in order]
+        self.point_ids = frozenset(point['id'] for point in points)
+        self.lats, self.lons = lats[order], lons[order]
+        rows, cols = rows[order], cols[order]
+
+        # 非空网格及其在数组中的起止位置
+        if len(order):
+            boundaries = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+            self.cell_start = np.concatenate([[0], boundaries])
+            self.cell_end = np.concatenate([boundaries, [len(order)]])
+        else:
+            self.cell_start = self.cell_end = np.empty(0, dtype=np.int64)
+        self.cell_rows, self.cell_cols = rows[self.cell_start], cols[self.cell_start]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _window(self, row_min, row_max, col_min, col_max):
+        """网格行列范围内 (含边界) 所有监测点的数组下标"""
+        mask = (self.cell_rows >= row_min) & (self.cell_rows <= row_max) & \
+               (self.cell_cols >= col_min) & (self.cell_cols <= col_max)
+        ranges = [np.arange(start, end) for start, end in zip(self.cell_start[mask], self.cell_end[mask])]
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def _bbox_indexes(self, min_lat, min_lon, max_lat, max_lon):
+        """矩形范围内监测点的数组下标，min_lon > max_lon 表示跨越180度经线"""
+        if min_lon > max_lon:
+            return np.concatenate([
+                self._bbox_indexes(min_lat, min_lon, max_lat, 180.0),
+                self._bbox_indexes(min_lat, -180.0, max_lat, max_lon)
+            ])
+
+        candidates = self._window(_cell(min_lat), _cell(max_lat), _cell(min_lon), _cell(max_lon))
+        lats, lons = self.lats[candidates], self.lons[candidates]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return candidates[inside]
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        查询矩形范围内的监测点
+
+        经度可以超出 [-180, 180)，从 min_lon 向东到 max_lon 为矩形的经度范围，
+        min_lon 大于 max_lon 表示跨越180度经线，经度跨度达到360度时不限经度
+
+        返回:
+        - 监测点字典列表，按ID排序
+        """
+        span = max_lon - min_lon if min_lon <= max_lon else max_lon - min_lon + 360
+        if span >= 360:
+            min_lon, max_lon = -180.0, 180.0
+        else:
+            min_lon, max_lon = normalize_lon(min_lon), normalize_lon(max_lon)
+        indexes = self._bbox_indexes(min_lat, min_lon, max_lat, max_lon)
+        return sorted((self.points[i] for i in indexes), key=lambda point: point['id'])
+
+    def _radius_indexes(self, lat, lon, radius_km):
+        """大圆距离不超过半径的候选监测点: 先取球冠的外接矩形"""
+        angle = radius_km / EARTH_RADIUS_KM
+        min_lat, max_lat = lat - math.degrees(angle), lat + math.degrees(angle)
+
+        # 外接矩形触及极点，或半径超过该纬度的经线圈时，经度不受限制
+        if min_lat <= -90 or max_lat >= 90 or math.sin(angle) >= math.cos(math.radians(lat)):
+            return self._bbox_indexes(max(min_lat, -90), -180.0, min(max_lat, 90), 180.0)
+
+        delta_lon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+        min_lon, max_lon = lon - delta_lon, lon + delta_lon
+        if min_lon < -180:
+            min_lon += 360
+        if max_lon > 180:
+            max_lon -= 360
+        return self._bbox_indexes(min_lat, min_lon, max_lat, max_lon)
+
+    def nearest(self, lat, lon, n, max_distance_km=None):
+        """
+        查询距离最近的 n 个监测点
+
+        返回:
+        - [(监测点字典, 距离公里)]，按距离由近到远排序
+        """
+        if n <= 0 or not len(self.points):
+            return []
+
+        # 由内向外扩大网格窗口，直到找到至少 n 个候选点或窗口覆盖所有非空网格
+        row, col = int(_cell(lat)), int(_cell(lon))
+        span = max(self.cell_rows.max() - self.cell_rows.min(), self.cell_cols.max() - self.cell_cols.min(),
+                   abs(row - self.cell_rows).max(), abs(col - self.cell_cols).max())
+        radius = 0
+        while True:
+            candidates = self._window(row - radius, row + radius, col - radius, col + radius)
+            if len(candidates) >= n or radius >= span:
+                break
+            radius = radius * 2 + 1
+
+        # 第 n 个候选点的距离是最近 n 个点距离的上界，再按该半径精确查找
+        if len(candidates) >= n:
+            distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+            search_km = float(np.partition(distances, n - 1)[n - 1])
+        else:
+            search_km = math.pi * EARTH_RADIUS_KM
+        if max_distance_km is not None:
+            search_km = min(search_km, max_distance_km)
+
+        candidates = np.unique(self._radius_indexes(lat, lon, search_km))
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        keep = distances <= search_km
+        candidates, distances = candidates[keep], distances[keep]
+
+        order = np.argsort(distances, kind='stable')[:n]
+        return [(self.points[candidates[i]], float(distances[i])) for i in order]
+
+def _get_cache():
+    """获取当前应用的索引缓存 (每个应用实例单独缓存)"""
+    return current_app.extensions.setdefault('spatial_index', {'version': None, 'index': None})
+
+def get_spatial_index():
+    """
+    获取监测点空间索引，监测点有变化时重新构建
+    """
+    cache = _get_cache()
+    version = get_version(POINTS_VERSION)
+
+    if cache['version'] != version:
+        with _lock:
+            if cache['version'] != version:
+                points = [point.to_dict() for point in MonitorPoint.query.all()]
+                cache['index'] = GridIndex(points)
+                cache['version'] = version
+
+    return cache['index']
+
+def invalidate_spatial_index():
+    """监测点增删改并提交后调用，使所有 worker 的空间索引失效"""
+    bump_version(POINTS_VERSION)
+    _get_cache()['version'] = None
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+请求级 SQL 分析
+
+开启后 (SQL_PROFILER=on) 通过 SQLAlchemy 的 before/after_cursor_execute 事件记录每个请求执行的所有 SQL:
+- 响应头 X-Query-Count 为本次请求执行的 SQL 条数，Server-Timing 给出 SQL 总耗时和请求总耗时
+  (浏览器开发者工具的 Timing 面板可直接查看)
+- 同一条 SQL 语句 (参数可以不同) 在一个请求中执行达到 SQL_PROFILER_REPEAT_THRESHOLD 次时，
+  按疑似 N+1 查询记录日志，例如在循环中逐条 query.get 或访问未预加载的关系
+- 执行时间超过 SQL_SLOW_QUERY_MS 的语句记录为慢查询 (包括后台线程中执行的语句)
+
+关闭时不注册任何事件监听，没有额外开销。
+"""
+import os
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+# 日志中 SQL 语句和参数的最大长度
+MAX_STATEMENT_LENGTH = 500
+MAX_PARAMETERS_LENGTH = 200
+
+def _shorten(text, limit):
+    text = ' '.join(str(text).split())
+    return text if len(text) <= limit else text[:limit] + '...'
+
+# 开始时间按游标记录，执行失败的语句由 handle_error 清除 (与 metrics.py 相同)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profiler_query_start', {})[id(cursor)] = time.perf_counter()
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    # SQLAlchemy 1.4 中 cursor 属性可能为空，从执行上下文中取
+    cursor = exception_context.cursor or getattr(exception_context.execution_context, 'cursor', None)
+    if connection is not None and cursor is not None:
+        connection.info.get('profiler_query_start', {}).pop(id(cursor), None)
+
+def _make_after_cursor_execute(slow_seconds):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.get('profiler_query_start', {}).pop(id(cursor), None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+
+        in_request = has_request_context() and 'sql_queries' in g
+        if in_request:
+            g.sql_queries.append((statement, elapsed))
+
+        if elapsed >= slow_seconds:
+            where = f'{request.method} {request.path}' if in_request else '后台任务'
+            print(f"[SQL] 慢查询 {elapsed * 1000:.1f}ms ({where}): {_shorten(statement, MAX_STATEMENT_LENGTH)} "
+                  f"参数: {_shorten(parameters, MAX_PARAMETERS_LENGTH)}")
+    return after_cursor_execute
+
+def _before_request():
+    g.sql_queries = []
+    g.sql_profiler_start = time.perf_counter()
+
+def _make_after_request(repeat_threshold):
+    def after_request(response):
+        queries = g.pop('sql_queries', None)
+        start = g.pop('sql_profiler_start', None)
+        if queries is None or start is None:
+            return response
+
+        total = time.perf_counter() - start
+        db_time = sum(elapsed for _, elapsed in queries)
+        response.headers['X-Query-Count'] = str(len(queries))
+        response.headers.add('Server-Timing', f'db;dur={db_time * 1000:.2f};desc="{len(queries)} queries"')
+        response.headers.add('Server-Timing', f'app;dur={total * 1000:.2f}')
+
+        # 同一语句重复执行: 疑似 N+1 查询
+        repeats = {}
+        for statement, elapsed in queries:
+            count, spent = repeats.get(statement, (0, 0.0))
+            repeats[statement] = (count + 1, spent + elapsed)
+        for statement, (count, spent) in repeats.items():
+            if count >= repeat_threshold:
+                print(f"[SQL] 疑似 N+1 查询 ({request.method} {request.path}): 同一语句执行了 {count} 次，"
+                      f"共 {spent * 1000:.1f}ms: {_shorten(statement, MAX_STATEMENT_LENGTH)}")
+        return response
+    return after_request
+
+def enabled(app):
+    return app.config['SQL_PROFILER']
+
+def init_app(app, engine):
+    """
+    按配置为应用和数据库引擎注册 SQL 分析钩子
+
+    配置项 (可通过同名环境变量设置):
+    - SQL_PROFILER: on/off，默认关闭
+    - SQL_SLOW_QUERY_MS: 慢查询阈值 (毫秒)，默认 100
+    - SQL_PROFILER_REPEAT_THRESHOLD: 同一语句在一个请求中执行多少次视为 N+1，默认 5
+    """
+    app.config.setdefault('SQL_PROFILER', os.getenv('SQL_PROFILER', 'off').strip().lower() in ('1', 'on', 'true', 'yes'))
+    app.config.setdefault('SQL_SLOW_QUERY_MS', int(os.getenv('SQL_SLOW_QUERY_MS', 100)))
+    app.config.setdefault('SQL_PROFILER_REPEAT_THRESHOLD', int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', 5)))
+    if not enabled(app):
+        return
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _make_after_cursor_execute(app.config['SQL_SLOW_QUERY_MS'] / 1000))
+    event.listen(engine, 'handle_error', _handle_error)
+    app.before_request(_before_request)
+    app.after_request(_make_after_request(app.config['SQL_PROFILER_REPEAT_THRESHOLD']))
\ No newline at end of file
@@ -1,29 +1,29 @@
-import Vue from 'vue'
-import App from './App.vue'
-import router from './router'
-import store from './store'
-import ElementUI from 'element-ui'
-import 'element-ui/lib/theme-chalk/index.css'
-import './assets/css/global.css'
-import axios from 'axios'
-
-Vue.config.productionTip = false
-Vue.use(ElementUI)
-
-// 配置axios
-axios.defaults.baseURL = 'http://localhost:3000/api'
-axios.interceptors.request.use(config => {
-  const token = localStorage.getItem('token')
-  if (token) {
-    config.headers.Authorization = `Bearer ${token}`
-  }
-  return config
-})
-
-Vue.prototype.$http = axios
-
-new Vue({
-  router,
-  store,
-  render: h => h(App)
+import Vue from 'vue'
+import App from './App.vue'
+import router from './router'
+import store from './store'
+import ElementUI from 'element-ui'
+import 'element-ui/lib/theme-chalk/index.css'
+import './assets/css/global.css'
+import axios from 'axios'
+
+Vue.config.productionTip = false
+Vue.use(ElementUI)
+
+// 配置axios
+axios.defaults.baseURL = 'http://localhost:3000/api'
+axios.interceptors.request.use(config => {
+  const token = localStorage.getItem('token')
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`
+  }
+  return config
+})
+
+Vue.prototype.$http = axios
+
+new Vue({
+  router,
+  store,
+  render: h => h(App)
 }).$mount('#app') 
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+测试公共夹具
+
+每个测试使用临时目录中独立的 SQLite 数据库和实例目录，
+密码哈希在请求线程中以最低强度计算，测试不需要进程池。
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, setup_database
+from models import db, MonitorPoint
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'BCRYPT_LOG_ROUNDS': 4,
+        'PASSWORD_HASH_WORKERS': 0,
+        'INGEST_MODE': 'sync'
+    }, instance_path=str(tmp_path / 'instance'))
+    with app.app_context():
+        setup_database()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': '111'})
+    return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+
+@pytest.fixture
+def monitor_point(app):
+    point = MonitorPoint(name='测试监测点', latitude=35.0, longitude=116.0)
+    db.session.add(point)
+    db.session.commit()
+    return point
\ No newline at end of file
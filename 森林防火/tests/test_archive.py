@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+import archive
+import ingest
+from models import MonitorPoint, MonitorRecord, db
+
+def _add_record(point_id, timestamp):
+    db.session.add(MonitorRecord(
+        monitor_point_id=point_id, timestamp=timestamp,
+        wind_speed=3.0, temperature=25.0, humidity=50.0
+    ))
+
+def test_records_listing_reports_archive_cutoff(app, client, auth_headers, monitor_point):
+    now = datetime.utcnow()
+    _add_record(monitor_point.id, now - timedelta(days=100))
+    _add_record(monitor_point.id, now - timedelta(hours=1))
+    db.session.commit()
+
+    response = client.get('/api/monitor/records', headers=auth_headers)
+    assert len(response.get_json()) == 2
+    assert 'X-Archived-Before' not in response.headers
+
+    archive.archive_records(90)
+    cutoff = archive.archive_cutoff(90)
+    assert archive.archived_before() == cutoff
+
+    response = client.get('/api/monitor/records', headers=auth_headers)
+    assert len(response.get_json()) == 1
+    assert response.headers['X-Archived-Before'] == cutoff.strftime('%Y-%m-%d %H:%M:%S')
+    # 归档的记录仍可通过历史接口获取
+    assert len(archive.read_history(monitor_point.id)) == 2
+
+def test_archive_cutoff_only_moves_forward(app, monitor_point):
+    now = datetime.utcnow()
+    _add_record(monitor_point.id, now - timedelta(days=100))
+    _add_record(monitor_point.id, now - timedelta(days=50))
+    db.session.commit()
+
+    archive.archive_records(30)
+    archive.archive_records(90)
+    assert archive.archived_before() == archive.archive_cutoff(30)
+def test_point_with_archived_data_cannot_be_deleted(app, client, auth_headers, monitor_point):
+    point_id = monitor_point.id
+    ingest.commit_rows([{
+        'monitor_point_id': point_id,
+        'timestamp': datetime.utcnow() - timedelta(days=200),
+        'wind_speed': 3.0, 'temperature': 25.0, 'humidity': 50.0
+    }])
+    archive.archive_records(90)
+    assert MonitorRecord.query.count() == 0
+
+    response = client.delete(f'/api/monitor/points/{point_id}', headers=auth_headers)
+    assert response.status_code == 400
+    assert MonitorPoint.query.get(point_id) is not None
+
+    response = client.get('/api/monitor/latest', headers=auth_headers)
+    assert response.status_code == 200
+    assert [item['monitor_point_id'] for item in response.get_json()] == [point_id]
+
+def test_point_without_data_can_be_deleted(app, client, auth_headers, monitor_point):
+    response = client.delete(f'/api/monitor/points/{monitor_point.id}', headers=auth_headers)
+    assert response.status_code == 200
+    assert MonitorPoint.query.count() == 0
\ No newline at end of file
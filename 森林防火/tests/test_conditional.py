@@ -0,0 +1,69 @@
+import os
+from flask import current_app
+import conditional
+from cache_versions import get_version, VERSION_DIR
+from spatial_index import POINTS_VERSION, invalidate_spatial_index
+
+def _points(client, headers=None):
+    return client.get('/api/monitor/points', headers=headers)
+
+def test_etag_returns_304(client, monitor_point):
+    invalidate_spatial_index()
+    response = _points(client)
+    etag = response.headers['ETag']
+    assert _points(client, {'If-None-Match': etag}).status_code == 304
+
+    invalidate_spatial_index()
+    assert _points(client, {'If-None-Match': etag}).status_code == 200
+
+def test_no_last_modified_within_the_changing_second(client, monitor_point, monkeypatch):
+    """修改发生在当前这一秒内时不返回 Last-Modified，避免同一秒内的后续修改被 If-Modified-Since 误判为未修改"""
+    invalidate_spatial_index()
+    mtime = get_version(POINTS_VERSION)[1] / 1e9
+    monkeypatch.setattr(conditional.time, 'time', lambda: mtime)
+    response = _points(client)
+    assert 'Last-Modified' not in response.headers
+    assert 'ETag' in response.headers
+
+def _set_points_mtime(seconds):
+    """把监测点版本文件的修改时间设为指定时刻 (模拟在该时刻修改了监测点)"""
+    path = os.path.join(current_app.instance_path, VERSION_DIR, POINTS_VERSION)
+    os.utime(path, ns=(int(seconds * 1e9), int(seconds * 1e9)))
+
+def test_if_modified_since(client, monitor_point, monkeypatch):
+    invalidate_spatial_index()
+    now = [1700000000.0]
+    monkeypatch.setattr(conditional.time, 'time', lambda: now[0])
+
+    # 在 T+0.3 修改，T+2 时请求
+    _set_points_mtime(1700000000.3)
+    now[0] = 1700000002.0
+    last_modified = _points(client).headers['Last-Modified']
+    assert _points(client, {'If-Modified-Since': last_modified}).status_code == 304
+
+    # 之后再修改，If-Modified-Since 判断为已修改
+    _set_points_mtime(1700000002.5)
+    now[0] = 1700000004.0
+    assert _points(client, {'If-Modified-Since': last_modified}).status_code == 200
+
+def test_same_second_changes_are_not_hidden(client, monitor_point, monkeypatch):
+    """同一秒内先后两次修改: 第一次修改后这一秒内返回的响应不带 Last-Modified，之后不会被误判为未修改"""
+    invalidate_spatial_index()
+    now = [1700000000.4]
+    monkeypatch.setattr(conditional.time, 'time', lambda: now[0])
+
+    _set_points_mtime(1700000000.3)
+    assert 'Last-Modified' not in _points(client).headers
+
+    _set_points_mtime(1700000000.7)
+    now[0] = 1700000002.0
+    response = _points(client)
+    assert response.headers['Last-Modified'] == 'Tue, 14 Nov 2023 22:13:21 GMT'
+
+def test_etag_takes_precedence_over_if_modified_since(client, monitor_point, monkeypatch):
+    invalidate_spatial_index()
+    mtime = get_version(POINTS_VERSION)[1] / 1e9
+    monkeypatch.setattr(conditional.time, 'time', lambda: mtime + 2)
+    last_modified = _points(client).headers['Last-Modified']
+    response = _points(client, {'If-None-Match': '"stale"', 'If-Modified-Since': last_modified})
+    assert response.status_code == 200
\ No newline at end of file
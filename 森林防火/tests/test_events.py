@@ -0,0 +1,43 @@
+import queue
+from datetime import datetime
+import events
+import ingest
+
+def _broker(app, monkeypatch):
+    broker = events.ReadingBroker()
+    broker._app = app
+    subscriber = queue.Queue()
+    broker._subscribers.add(subscriber)
+
+    loads = []
+    original = broker._load
+    def counting_load():
+        loads.append(1)
+        return original()
+    monkeypatch.setattr(broker, '_load', counting_load)
+    return broker, subscriber, loads
+
+def test_poll_skips_database_when_versions_unchanged(app, monitor_point, monkeypatch):
+    point_id = monitor_point.id
+    broker, subscriber, loads = _broker(app, monkeypatch)
+
+    broker._poll()
+    assert len(loads) == 1
+    assert subscriber.get_nowait().startswith('event: snapshot')
+
+    # 版本号没有变化: 不查询数据库
+    broker._poll()
+    broker._poll()
+    assert len(loads) == 1
+
+    # 写入新数据后版本号变化，重新读取并推送
+    ingest.commit_rows([{
+        'monitor_point_id': point_id,
+        'wind_speed': 3.0,
+        'temperature': 20.0,
+        'humidity': 50.0,
+        'timestamp': datetime(2024, 1, 1)
+    }])
+    broker._poll()
+    assert len(loads) == 2
+    assert subscriber.get_nowait().startswith('event: reading')
\ No newline at end of file
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+import archive
+import ingest
+from models import MonitorPoint, db
+
+def _ingest(point_id, timestamps):
+    ingest.commit_rows([{
+        'monitor_point_id': point_id,
+        'timestamp': timestamp,
+        'wind_speed': 3.0,
+        'temperature': 20.0 + i,
+        'humidity': 50.0
+    } for i, timestamp in enumerate(timestamps)])
+
+def _export(client, auth_headers, query):
+    response = client.get(f'/api/export/records?{query}', headers=auth_headers)
+    assert response.status_code == 200
+    return response
+
+def test_csv_export_includes_archived_rows(app, client, auth_headers, monitor_point):
+    now = datetime.utcnow().replace(microsecond=0)
+    old = [now - timedelta(days=200), now - timedelta(days=150)]
+    recent = [now - timedelta(hours=2), now - timedelta(hours=1)]
+    _ingest(monitor_point.id, old + recent)
+    assert archive.archive_records(90) == {monitor_point.id: 2}
+
+    response = _export(client, auth_headers, 'format=csv')
+    assert response.mimetype == 'text/csv'
+    assert 'attachment; filename=records_' in response.headers['Content-Disposition']
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['id', 'monitor_point_id', 'timestamp', 'wind_speed', 'temperature', 'humidity']
+    # 归档数据在前，按时间顺序
+    assert [row[2] for row in rows[1:]] == [t.strftime('%Y-%m-%d %H:%M:%S') for t in old + recent]
+    assert [float(row[4]) for row in rows[1:]] == [20.0, 21.0, 22.0, 23.0]
+
+def test_ndjson_export_filters_by_time_and_point(app, client, auth_headers, monitor_point):
+    other = MonitorPoint(name='另一个监测点', latitude=36.0, longitude=117.0)
+    db.session.add(other)
+    db.session.commit()
+
+    now = datetime.utcnow().replace(microsecond=0)
+    _ingest(monitor_point.id, [now - timedelta(days=200), now - timedelta(days=120), now - timedelta(hours=1)])
+    _ingest(other.id, [now - timedelta(days=130)])
+    archive.archive_records(90)
+
+    since = (now - timedelta(days=160)).strftime('%Y-%m-%d %H:%M:%S')
+    response = _export(client, auth_headers, f'format=ndjson&point_id={monitor_point.id}&since={since}')
+    assert response.mimetype == 'application/x-ndjson'
+
+    items = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [item['monitor_point_id'] for item in items] == [monitor_point.id] * 2
+    assert [item['temperature'] for item in items] == [21.0, 22.0]
+    assert items[0]['timestamp'] == (now - timedelta(days=120)).strftime('%Y-%m-%d %H:%M:%S')
+
+def test_export_rejects_unknown_format(client, auth_headers):
+    response = client.get('/api/export/records?format=xml', headers=auth_headers)
+    assert response.status_code == 400
+
+def test_parquet_export_includes_archived_rows(app, client, auth_headers, monitor_point):
+    pq = pytest.importorskip('pyarrow.parquet')
+    now = datetime.utcnow().replace(microsecond=0)
+    _ingest(monitor_point.id, [now - timedelta(days=200), now - timedelta(hours=1)])
+    archive.archive_records(90)
+
+    response = _export(client, auth_headers, 'format=parquet')
+    table = pq.read_table(io.BytesIO(response.get_data()))
+    assert table.column('temperature').to_pylist() == [20.0, 21.0]
+    assert table.column('timestamp').to_pylist() == [now - timedelta(days=200), now - timedelta(hours=1)]
\ No newline at end of file
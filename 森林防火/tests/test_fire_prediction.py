@@ -0,0 +1,10 @@
+import warnings
+import numpy as np
+from fire_prediction import FirePredictor
+
+def test_round_area_matches_builtin_round_without_warnings():
+    values = np.array([1.005, 2.675, 0.125, 1e13 + 0.5, 1e300, 1.7e308, -1.7e308, 0.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = FirePredictor._round_area(values)
+    assert result.tolist() == [round(float(value), 2) for value in values]
\ No newline at end of file
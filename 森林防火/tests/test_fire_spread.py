@@ -0,0 +1,24 @@
+import pytest
+import fire_spread
+
+def _simulate(snapshot_minutes, seed):
+    return fire_spread.simulate_spread(
+        35.0, 116.0, wind_speed=8.0, humidity=25.0, temperature=32.0, wind_direction=270.0,
+        hours=3.0, grid_size=400, snapshot_minutes=snapshot_minutes, seed=seed
+    )
+
+@pytest.mark.parametrize('seed', range(3))
+def test_burned_area_independent_of_snapshot_interval(seed):
+    """快照间隔只影响输出，不影响模拟的步长和过火面积"""
+    results = [_simulate(minutes, seed) for minutes in (1.0, 10.0, 60.0)]
+    assert len({result['step_minutes'] for result in results}) == 1
+    assert len({result['burned_area_km2'] for result in results}) == 1
+
+def test_snapshots_follow_interval():
+    result = _simulate(60.0, 0)
+    minutes = [snapshot['minutes'] for snapshot in result['snapshots']]
+    assert minutes == sorted(minutes)
+    assert minutes[-1] == 180.0 or result['reached_boundary']
+    # 每个快照在到达快照时刻后的第一步生成
+    for boundary, actual in zip((60.0, 120.0), minutes):
+        assert boundary <= actual < boundary + result['step_minutes']
\ No newline at end of file
@@ -0,0 +1,50 @@
+from datetime import datetime
+import numpy as np
+import heatmap
+import ingest
+
+def _tile_for(latitude, longitude, z):
+    """包含指定坐标的瓦片坐标"""
+    n = 2 ** z
+    x = int((longitude + 180) / 360 * n)
+    lat = np.radians(latitude)
+    y = int((1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2 * n)
+    return x, y
+
+def _add_reading(point):
+    ingest.commit_rows([{
+        'monitor_point_id': point.id,
+        'wind_speed': 12.0,
+        'temperature': 35.0,
+        'humidity': 20.0,
+        'timestamp': datetime(2024, 1, 1)
+    }])
+
+def test_json_tile_values(app, monitor_point):
+    _add_reading(monitor_point)
+    x, y = _tile_for(monitor_point.latitude, monitor_point.longitude, 8)
+    tile = heatmap.get_tile(8, x, y, 'json', 16)
+
+    assert tile['size'] == 16
+    values = [value for row in tile['values'] for value in row]
+    assert len(values) == 256
+    covered = [value for value in values if value is not None]
+    assert covered and all(isinstance(value, float) and 0 <= value <= 3 for value in covered)
+    assert all(round(value, 3) == value for value in covered)
+
+    # 再次读取命中缓存，结果相同
+    assert heatmap.get_tile(8, x, y, 'json', 16) == tile
+
+def test_tile_cache_is_bounded_by_bytes(app, monitor_point, monkeypatch):
+    _add_reading(monitor_point)
+    # 只够缓存两个 64×64 的 float32 网格
+    monkeypatch.setattr(heatmap, 'TILE_CACHE_BYTES', 2 * 64 * 64 * 4)
+    x, y = _tile_for(monitor_point.latitude, monitor_point.longitude, 6)
+    for dx in range(4):
+        heatmap.get_tile(6, x + dx, y, 'json', 64)
+
+    cache = app.extensions['heatmap_cache']
+    assert len(cache['tiles']) == 2
+    assert cache['bytes'] == sum(tile.nbytes for tile in cache['tiles'].values()) <= heatmap.TILE_CACHE_BYTES
+    # 最近使用的瓦片保留在缓存中
+    assert (6, x + 3, y, 'json', 64) in cache['tiles']
\ No newline at end of file
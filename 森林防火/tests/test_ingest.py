@@ -0,0 +1,57 @@
+from datetime import datetime
+import ingest
+import latest_readings
+from models import MonitorRecord, LatestReading
+
+def test_commit_rows_survives_notification_failure(app, monitor_point, monkeypatch):
+    """提交后的通知失败不应抛出，否则后台写入重试会重复写入已提交的记录"""
+    def broken():
+        raise OSError('instance directory is read-only')
+    monkeypatch.setattr(latest_readings, 'mark_changed', broken)
+
+    rows = [{
+        'monitor_point_id': monitor_point.id,
+        'wind_speed': 3.0,
+        'temperature': 20.0,
+        'humidity': 50.0,
+        'timestamp': datetime(2024, 1, 1, 12, minute)
+    } for minute in range(3)]
+    ingest.commit_rows(rows)
+
+    assert MonitorRecord.query.count() == 3
+def test_latest_reading_keeps_newest(app, monitor_point):
+    def row(hour, temperature):
+        return {
+            'monitor_point_id': monitor_point.id,
+            'wind_speed': 3.0,
+            'temperature': temperature,
+            'humidity': 50.0,
+            'timestamp': datetime(2024, 1, 1, hour)
+        }
+
+    # 第一条数据新建快照，较新的数据覆盖快照，较旧的补录数据不覆盖
+    ingest.commit_rows([row(12, 20.0)])
+    ingest.commit_rows([row(14, 24.0)])
+    ingest.commit_rows([row(13, 22.0)])
+
+    snapshot = LatestReading.query.one()
+    assert snapshot.timestamp == datetime(2024, 1, 1, 14)
+    assert snapshot.temperature == 24.0
+def test_ndjson_errors_report_line_numbers(client, auth_headers, monitor_point):
+    lines = [
+        '{"monitor_point_id": %d, "wind_speed": 3, "temperature": 20, "humidity": 50}' % monitor_point.id,
+        '',
+        'not json',
+        '   ',
+        '{"monitor_point_id": %d, "wind_speed": "abc", "temperature": 20, "humidity": 50}' % monitor_point.id,
+    ]
+    response = client.post(
+        '/api/monitor/records/batch',
+        data='\n'.join(lines),
+        content_type='application/x-ndjson',
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    result = response.get_json()
+    assert result['inserted'] == 1
+    assert [error['index'] for error in result['errors']] == [2, 4]
\ No newline at end of file
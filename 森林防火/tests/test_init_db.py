@@ -0,0 +1,29 @@
+import init_db
+from migrations import MIGRATIONS
+from models import SchemaMigration, User, MonitorPoint
+
+def test_init_database_recreates_database(tmp_path):
+    db_path = tmp_path / 'forest_fire.db'
+    config = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'BCRYPT_LOG_ROUNDS': 4,
+        'PASSWORD_HASH_WORKERS': 0
+    }
+    # 上次运行留下的数据库文件和 WAL 文件
+    stale = b'stale database file'
+    for suffix in ('', '-wal', '-shm'):
+        (tmp_path / f'forest_fire.db{suffix}').write_bytes(stale)
+
+    init_db.init_database(config, instance_path=str(tmp_path))
+
+    for suffix in ('', '-wal', '-shm'):
+        path = tmp_path / f'forest_fire.db{suffix}'
+        assert not path.exists() or not path.read_bytes().startswith(stale)
+
+    app = init_db.create_app(config, instance_path=str(tmp_path))
+    with app.app_context():
+        # 数据迁移已记录，之后执行 upgrade-db 不会重复回填
+        assert {m.name for m in SchemaMigration.query} == {name for name, _ in MIGRATIONS}
+        assert User.query.count() == 2
+        assert MonitorPoint.query.count() == 4
\ No newline at end of file
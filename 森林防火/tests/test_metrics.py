@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+import metrics
+from models import db
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def _write(directory, pid, value):
+    with open(os.path.join(directory, f'{pid}.json'), 'w') as f:
+        json.dump({
+            'pid': pid,
+            'counters': [['http_requests_total', [['status', '200']], value]],
+            'histograms': [],
+            'gauges': [['ingest_queue_depth', [], 7]]
+        }, f)
+
+def _total(counters):
+    return counters.get(('http_requests_total', (('status', '200'),)), 0)
+
+def test_dead_worker_files_are_merged(app):
+    directory = os.path.join(app.instance_path, metrics.METRICS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    first, second = _dead_pid(), _dead_pid()
+    _write(directory, first, 3)
+    _write(directory, second, 4)
+
+    counters, _, gauges = metrics.collect(app.instance_path)
+    assert _total(counters) == 7
+    # 已退出 worker 的仪表值不计入
+    assert ('ingest_queue_depth', ()) not in gauges
+
+    names = set(os.listdir(directory))
+    assert metrics.RETIRED_FILE in names
+    assert f'{first}.json' not in names and f'{second}.json' not in names
+
+    # 合并后总数不变，之后退出的 worker 继续累加
+    third = _dead_pid()
+    _write(directory, third, 5)
+    counters, _, _ = metrics.collect(app.instance_path)
+    assert _total(counters) == 12
+    counters, _, _ = metrics.collect(app.instance_path)
+    assert _total(counters) == 12
+
+def test_reused_pid_file_is_merged_before_overwrite(app, monkeypatch):
+    directory = os.path.join(app.instance_path, metrics.METRICS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    _write(directory, os.getpid(), 9)
+    monkeypatch.setattr(metrics, '_owned_pid', None)
+
+    metrics.dump(app.instance_path)
+    counters, _, _ = metrics.collect(app.instance_path)
+    assert _total(counters) >= 9
+
+def test_failed_statement_does_not_leak_start_time(app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+        assert connection.info.get('metrics_query_start') == {}
+        connection.execute(text('SELECT 1'))
+        assert connection.info.get('metrics_query_start') == {}
\ No newline at end of file
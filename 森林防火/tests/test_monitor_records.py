@@ -0,0 +1,63 @@
+from models import MonitorRecord, LatestReading, MonitorRollupHourly
+
+def test_create_record_with_string_values(client, auth_headers, monitor_point):
+    """看板表单提交的数值是字符串，应转换后写入"""
+    payload = {
+        'monitor_point_id': str(monitor_point.id),
+        'wind_speed': '5.5',
+        'temperature': '28',
+        'humidity': '40.2'
+    }
+    for _ in range(2):
+        response = client.post('/api/monitor/records', json=payload, headers=auth_headers)
+        assert response.status_code == 201
+
+    record = response.get_json()['record']
+    assert record['monitor_point_id'] == monitor_point.id
+    assert record['wind_speed'] == 5.5
+    assert MonitorRecord.query.count() == 2
+    # 字符串形式的监测点ID不应产生重复的最新数据快照
+    assert LatestReading.query.count() == 1
+    assert LatestReading.query.one().humidity == 40.2
+
+def test_create_record_rejects_non_numeric_values(client, auth_headers, monitor_point):
+    payload = {'monitor_point_id': monitor_point.id, 'wind_speed': 'abc', 'temperature': 28, 'humidity': 40}
+    response = client.post('/api/monitor/records', json=payload, headers=auth_headers)
+    assert response.status_code == 400
+    assert MonitorRecord.query.count() == 0
+
+def test_create_record_unknown_point(client, auth_headers):
+    payload = {'monitor_point_id': 999, 'wind_speed': 1, 'temperature': 2, 'humidity': 3}
+    response = client.post('/api/monitor/records', json=payload, headers=auth_headers)
+    assert response.status_code == 404
+def _create_record(client, auth_headers, point_id):
+    payload = {'monitor_point_id': point_id, 'wind_speed': 5, 'temperature': 28, 'humidity': 40}
+    response = client.post('/api/monitor/records', json=payload, headers=auth_headers)
+    return response.get_json()['record']['id']
+
+def test_update_record_converts_string_values(client, auth_headers, monitor_point):
+    record_id = _create_record(client, auth_headers, monitor_point.id)
+    payload = {'monitor_point_id': str(monitor_point.id), 'temperature': '31.5'}
+    response = client.put(f'/api/monitor/records/{record_id}', json=payload, headers=auth_headers)
+    assert response.status_code == 200
+
+    record = MonitorRecord.query.get(record_id)
+    assert record.temperature == 31.5
+    assert record.wind_speed == 5.0
+    assert LatestReading.query.one().temperature == 31.5
+    assert MonitorRollupHourly.query.one().temperature_max == 31.5
+
+def test_update_record_rejects_non_numeric_values(client, auth_headers, monitor_point):
+    record_id = _create_record(client, auth_headers, monitor_point.id)
+    for payload in ({'humidity': 'abc'}, {'wind_speed': None}, {'monitor_point_id': 'x'}):
+        response = client.put(f'/api/monitor/records/{record_id}', json=payload, headers=auth_headers)
+        assert response.status_code == 400
+
+    record = MonitorRecord.query.get(record_id)
+    assert (record.wind_speed, record.humidity) == (5.0, 40.0)
+    assert LatestReading.query.one().humidity == 40.0
+
+def test_update_record_unknown_point(client, auth_headers, monitor_point):
+    record_id = _create_record(client, auth_headers, monitor_point.id)
+    response = client.put(f'/api/monitor/records/{record_id}', json={'monitor_point_id': 999}, headers=auth_headers)
+    assert response.status_code == 404
\ No newline at end of file
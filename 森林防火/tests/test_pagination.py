@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime
+import pagination
+from models import MonitorRecord, db
+
+def _insert_records(point_id, timestamps):
+    db.session.execute(MonitorRecord.__table__.insert(), [{
+        'monitor_point_id': point_id,
+        'timestamp': timestamp,
+        'wind_speed': 3.0,
+        'temperature': 25.0,
+        'humidity': 50.0
+    } for timestamp in timestamps])
+    db.session.commit()
+
+def test_records_with_null_timestamp_are_skipped(client, auth_headers, monitor_point):
+    _insert_records(monitor_point.id, [datetime(2024, 1, 1), None, None])
+
+    response = client.get('/api/monitor/records?limit=2', headers=auth_headers)
+    assert response.status_code == 200
+    assert [record['timestamp'] for record in response.get_json()] == ['2024-01-01 00:00:00']
+    assert 'X-Next-Cursor' not in response.headers
+def test_cursor_round_trip():
+    timestamp = datetime(2024, 3, 1, 8, 30, 15, 123456)
+    cursor = pagination.encode_cursor(timestamp, 42)
+    assert '=' not in cursor
+    assert pagination.decode_cursor(cursor) == (timestamp, 42)
+
+    for invalid in ('', 'not-a-cursor', pagination.encode_cursor(timestamp, 42)[:-3]):
+        with pytest.raises(ValueError):
+            pagination.decode_cursor(invalid)
+
+def test_pages_cover_ties_without_duplicates(client, auth_headers, monitor_point):
+    # 同一时间的多条记录按ID区分，翻页时既不重复也不遗漏
+    _insert_records(monitor_point.id, [datetime(2024, 1, 1, 12)] * 5 + [datetime(2024, 1, 1, 11)] * 2)
+    expected = [record.id for record in MonitorRecord.query.order_by(
+        MonitorRecord.timestamp.desc(), MonitorRecord.id.desc())]
+
+    seen = []
+    url = '/api/monitor/records?limit=2'
+    while True:
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 2
+        seen += [record['id'] for record in page]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        assert f'cursor={cursor}' in response.headers['Link']
+        url = f'/api/monitor/records?limit=2&cursor={cursor}'
+
+    assert seen == expected
+
+def test_since_until_and_invalid_cursor(client, auth_headers, monitor_point):
+    _insert_records(monitor_point.id, [datetime(2024, 1, day) for day in range(1, 6)])
+
+    response = client.get('/api/monitor/records?since=2024-01-02&until=2024-01-04', headers=auth_headers)
+    assert [record['timestamp'] for record in response.get_json()] == [
+        '2024-01-03 00:00:00', '2024-01-02 00:00:00'
+    ]
+
+    response = client.get('/api/monitor/records?cursor=garbage', headers=auth_headers)
+    assert response.status_code == 400
\ No newline at end of file
@@ -0,0 +1,81 @@
+import threading
+import bcrypt
+import pytest
+import password_hashing
+from password_hashing import PasswordHasher, HashingUnavailable
+from models import User, db
+
+def test_inline_hash_and_check(app):
+    # PASSWORD_HASH_WORKERS=0: 在请求线程中计算
+    assert password_hashing.hasher.workers == 0
+    pw_hash = password_hashing.hash_password('secret')
+    assert pw_hash.startswith('$2b$04$')
+    assert password_hashing.check_password(pw_hash, 'secret')
+    assert not password_hashing.check_password(pw_hash, 'wrong')
+    assert not password_hashing.check_password('not-a-hash', 'secret')
+    assert not password_hashing.check_password(pw_hash, '')
+
+def test_login_rehashes_with_configured_rounds(app, client):
+    old_hash = bcrypt.hashpw(b'secret', bcrypt.gensalt(5)).decode('utf-8')
+    db.session.add(User(username='operator', password=old_hash, email='operator@example.com', role='user'))
+    db.session.commit()
+
+    response = client.post('/api/auth/login', json={'username': 'operator', 'password': 'secret'})
+    assert response.status_code == 200
+    new_hash = User.query.filter_by(username='operator').one().password
+    assert new_hash.startswith('$2b$04$')
+    assert password_hashing.check_password(new_hash, 'secret')
+
+    response = client.post('/api/auth/login', json={'username': 'operator', 'password': 'wrong'})
+    assert response.status_code == 401
+
+def test_inline_rejects_when_capacity_is_full():
+    hasher = PasswordHasher()
+    hasher.configure(0, 1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    thread = threading.Thread(target=hasher.run, args=(slow,))
+    thread.start()
+    started.wait(5)
+    try:
+        with pytest.raises(HashingUnavailable):
+            hasher.run(slow)
+    finally:
+        release.set()
+        thread.join()
+
+    assert hasher.run(lambda: 'ok') == 'ok'
+    stats = hasher.stats()
+    assert (stats['rejected'], stats['completed'], stats['pending']) == (1, 2, 0)
+
+def test_busy_hasher_returns_503(app, client, monkeypatch):
+    def busy(*args, **kwargs):
+        raise HashingUnavailable()
+    monkeypatch.setattr(password_hashing.hasher, 'run', busy)
+
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': '111'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_process_pool_hash_and_check():
+    hasher = PasswordHasher()
+    hasher.configure(1, 2)
+    try:
+        pw_hash = hasher.run(password_hashing._hash, 'secret', 4, timeout=60)
+        assert hasher.run(password_hashing._check, pw_hash, 'secret', timeout=60)
+        assert not hasher.run(password_hashing._check, pw_hash, 'wrong', timeout=60)
+
+        # 等待超时返回 HashingUnavailable，任务结束后才让出名额
+        with pytest.raises(HashingUnavailable):
+            hasher.run(password_hashing._hash, 'secret', 14, timeout=0.01)
+        assert hasher.stats()['timeouts'] == 1
+    finally:
+        hasher._executor.shutdown(wait=True)
+
+    stats = hasher.stats()
+    assert (stats['workers'], stats['pending'], stats['completed']) == (1, 0, 4)
\ No newline at end of file
@@ -0,0 +1,39 @@
+from datetime import datetime
+import ingest
+from models import MonitorRollupHourly, MonitorRollupDaily
+
+def _row(point_id, timestamp, wind_speed, temperature, humidity):
+    return {
+        'monitor_point_id': point_id,
+        'timestamp': timestamp,
+        'wind_speed': wind_speed,
+        'temperature': temperature,
+        'humidity': humidity
+    }
+
+def test_ingest_into_existing_and_new_buckets(app, monitor_point):
+    ingest.commit_rows([
+        _row(monitor_point.id, datetime(2024, 1, 1, 12, 0), 3.0, 20.0, 50.0),
+        _row(monitor_point.id, datetime(2024, 1, 1, 12, 10), 5.0, 22.0, 40.0)
+    ])
+    # 12 点的时间桶已存在，13 点的是新时间桶
+    ingest.commit_rows([
+        _row(monitor_point.id, datetime(2024, 1, 1, 12, 30), 1.0, 25.0, 45.0),
+        _row(monitor_point.id, datetime(2024, 1, 1, 13, 0), 7.0, 18.0, 60.0)
+    ])
+
+    noon = MonitorRollupHourly.query.get((monitor_point.id, datetime(2024, 1, 1, 12)))
+    assert noon.count == 3
+    assert (noon.wind_speed_min, noon.wind_speed_max, noon.wind_speed_sum) == (1.0, 5.0, 9.0)
+    assert (noon.temperature_min, noon.temperature_max) == (20.0, 25.0)
+    assert (noon.humidity_min, noon.humidity_max) == (40.0, 50.0)
+
+    one_pm = MonitorRollupHourly.query.get((monitor_point.id, datetime(2024, 1, 1, 13)))
+    assert one_pm.count == 1
+    assert (one_pm.wind_speed_min, one_pm.wind_speed_max, one_pm.wind_speed_sum) == (7.0, 7.0, 7.0)
+
+    day = MonitorRollupDaily.query.get((monitor_point.id, datetime(2024, 1, 1)))
+    assert day.count == 4
+    assert (day.wind_speed_min, day.wind_speed_max, day.wind_speed_sum) == (1.0, 7.0, 16.0)
+    assert (day.temperature_min, day.temperature_max) == (18.0, 25.0)
+    assert (day.humidity_min, day.humidity_max, day.humidity_sum) == (40.0, 60.0, 195.0)
\ No newline at end of file
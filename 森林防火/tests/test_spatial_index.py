@@ -0,0 +1,93 @@
+import numpy as np
+from models import MonitorPoint, db
+from spatial_index import GridIndex, haversine_km, invalidate_spatial_index
+
+def _add_points(*locations):
+    for i, (lat, lon) in enumerate(locations, MonitorPoint.query.count()):
+        db.session.add(MonitorPoint(name=f'监测点{i}', latitude=lat, longitude=lon))
+    db.session.commit()
+    invalidate_spatial_index()
+
+def _bbox_names(client, **params):
+    response = client.get('/api/monitor/points/bbox', query_string=params)
+    assert response.status_code == 200
+    return sorted(point['name'] for point in response.get_json())
+
+def test_bbox_wraps_longitudes(app, client):
+    _add_points((10.0, 175.0), (10.0, -175.0), (10.0, 0.0), (10.0, 150.0))
+
+    # 跨越180度经线
+    assert _bbox_names(client, min_lat=0, max_lat=50, min_lon=170, max_lon=-170) == ['监测点0', '监测点1']
+    # 地图平移后超出 [-180, 180) 的经度
+    assert _bbox_names(client, min_lat=0, max_lat=50, min_lon=170, max_lon=190) == ['监测点0', '监测点1']
+    assert _bbox_names(client, min_lat=0, max_lat=50, min_lon=-190, max_lon=-170) == ['监测点0', '监测点1']
+    # min_lon > max_lon 且超出范围: 从 200 (-160) 向东到 100
+    assert _bbox_names(client, min_lat=0, max_lat=50, min_lon=200, max_lon=100) == ['监测点2']
+    # 从 -170 向东到 -190 (170)
+    assert _bbox_names(client, min_lat=0, max_lat=50, min_lon=-170, max_lon=-190) == ['监测点2', '监测点3']
+    # 经度跨度超过360度
+    assert len(_bbox_names(client, min_lat=0, max_lat=50, min_lon=-500, max_lon=500)) == 4
+
+def test_bbox_rejects_invalid_coordinates(app, client):
+    for params in (
+        {'min_lat': 0, 'max_lat': 50, 'min_lon': 'nan', 'max_lon': 10},
+        {'min_lat': 0, 'max_lat': 50, 'min_lon': 0, 'max_lon': 'inf'},
+        {'min_lat': -100, 'max_lat': 50, 'min_lon': 0, 'max_lon': 10},
+    ):
+        response = client.get('/api/monitor/points/bbox', query_string=params)
+        assert response.status_code == 400
+def test_grid_index_bbox_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = [
+        {'id': i, 'latitude': float(lat), 'longitude': float(lon)}
+        for i, (lat, lon) in enumerate(zip(rng.uniform(-60, 60, 500), rng.uniform(-180, 180, 500)))
+    ]
+    index = GridIndex(points)
+
+    for min_lat, max_lat, min_lon, max_lon in ((-10, 10, -20, 20), (30, 31, 100.05, 100.35), (-5, 5, 170, -170)):
+        def inside(point):
+            lon = point['longitude']
+            lon_ok = min_lon <= lon <= max_lon if min_lon <= max_lon else lon >= min_lon or lon <= max_lon
+            return min_lat <= point['latitude'] <= max_lat and lon_ok
+        expected = [point['id'] for point in points if inside(point)]
+        assert [point['id'] for point in index.within_bbox(min_lat, min_lon, max_lat, max_lon)] == expected
+
+def test_grid_index_nearest_matches_brute_force():
+    rng = np.random.default_rng(1)
+    lats, lons = rng.uniform(-80, 80, 300), rng.uniform(-180, 180, 300)
+    points = [{'id': i, 'latitude': float(lat), 'longitude': float(lon)} for i, (lat, lon) in enumerate(zip(lats, lons))]
+    index = GridIndex(points)
+
+    # 包括靠近180度经线和极点的位置
+    for lat, lon in ((0.0, 0.0), (35.0, 179.9), (-20.0, -179.95), (89.0, 45.0)):
+        distances = haversine_km(lat, lon, lats, lons)
+        expected = list(np.argsort(distances, kind='stable')[:5])
+        results = index.nearest(lat, lon, 5)
+        assert [point['id'] for point, _ in results] == expected
+        assert [round(d, 6) for _, d in results] == [round(float(distances[i]), 6) for i in expected]
+
+def test_nearest_endpoint(app, client):
+    _add_points((35.0, 116.0), (35.1, 116.0), (36.0, 116.0), (10.0, -179.9))
+
+    response = client.get('/api/monitor/points/nearest', query_string={'lat': 35.0, 'lon': 116.01, 'n': 2})
+    assert response.status_code == 200
+    results = response.get_json()
+    assert [point['name'] for point in results] == ['监测点0', '监测点1']
+    assert results[0]['distance_km'] < results[1]['distance_km']
+
+    # 跨越180度经线的最近点
+    response = client.get('/api/monitor/points/nearest', query_string={'lat': 10.0, 'lon': 179.95, 'n': 1})
+    assert [point['name'] for point in response.get_json()] == ['监测点3']
+
+    # 限制最大距离
+    response = client.get('/api/monitor/points/nearest', query_string={'lat': 35.0, 'lon': 116.0, 'n': 5, 'max_distance_km': 20})
+    assert [point['name'] for point in response.get_json()] == ['监测点0', '监测点1']
+
+    response = client.get('/api/monitor/points/nearest', query_string={'lat': 95, 'lon': 0})
+    assert response.status_code == 400
+
+def test_index_rebuilds_after_points_change(app, client):
+    _add_points((35.0, 116.0))
+    assert len(_bbox_names(client, min_lat=30, max_lat=40, min_lon=110, max_lon=120)) == 1
+    _add_points((36.0, 117.0))
+    assert len(_bbox_names(client, min_lat=30, max_lat=40, min_lon=110, max_lon=120)) == 2
\ No newline at end of file
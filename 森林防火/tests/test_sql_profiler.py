@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from models import db
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'profiler.db'}",
+        'SQL_PROFILER': True
+    }, instance_path=str(tmp_path / 'instance'))
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def test_failed_statement_does_not_leak_start_time(profiled_app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+        assert connection.info.get('profiler_query_start') == {}
+        connection.execute(text('SELECT 1'))
+        assert connection.info.get('profiler_query_start') == {}
\ No newline at end of file
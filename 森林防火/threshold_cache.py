@@ -0,0 +1,45 @@
+"""
+当前生效火灾阈值的进程内缓存
+
+阈值几乎不变，却在每次预测时都要读取。这里把最新的 FireThreshold 缓存在进程内，
+并通过 cache_versions 中的版本文件感知其他 worker 的修改：
+每次读取只做一次 os.stat，只有版本号变化时才重新查询数据库。
+"""
+import threading
+from flask import current_app
+from models import FireThreshold
+from cache_versions import get_version, bump_version
+
+# 阈值缓存对应的版本名
+THRESHOLD_VERSION = 'fire_threshold'
+
+_lock = threading.Lock()
+
+def _get_cache():
+    """获取当前应用的缓存状态 (每个应用实例单独缓存)"""
+    return current_app.extensions.setdefault('threshold_cache', {'version': None, 'threshold': None})
+
+def get_active_threshold():
+    """
+    获取当前生效的阈值设置
+
+    返回:
+    - threshold: 阈值字典 (与 FireThreshold.to_dict() 相同)，数据库中没有阈值设置时返回 None
+    """
+    cache = _get_cache()
+    version = get_version(THRESHOLD_VERSION)
+
+    if cache['version'] != version:
+        with _lock:
+            if cache['version'] != version:
+                threshold = FireThreshold.query.order_by(FireThreshold.id.desc()).first()
+                cache['threshold'] = threshold.to_dict() if threshold else None
+                cache['version'] = version
+
+    threshold = cache['threshold']
+    return dict(threshold) if threshold else None
+
+def invalidate_threshold_cache():
+    """阈值修改并提交后调用，使所有 worker 的阈值缓存失效"""
+    bump_version(THRESHOLD_VERSION)
+    _get_cache()['version'] = None
\ No newline at end of file
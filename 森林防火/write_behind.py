@@ -0,0 +1,217 @@
+"""
+监测数据的后台批量写入 (write-behind)
+
+同步写入模式下每个 POST /api/monitor/records 请求都要等待一次事务提交 (磁盘 fsync)。
+启用异步写入 (INGEST_MODE=async) 后，接口只校验数据并放入进程内的有界队列，立即返回 202，
+每个工作进程的一个后台线程把队列中的数据攒成一批 (达到 WRITE_BEHIND_BATCH_SIZE 条，
+或第一条数据等待超过 WRITE_BEHIND_FLUSH_INTERVAL_MS)，在一个事务中写入。
+
+- 背压: 队列已满时请求最多等待 WRITE_BEHIND_ENQUEUE_TIMEOUT_MS，仍无空间则返回 503，
+  客户端按 Retry-After 重试；一批数据要么全部入队，要么全部拒绝
+- 写入失败时重试 FLUSH_RETRIES 次，仍失败的一批数据会被丢弃并记录日志
+- 进程退出时 (gunicorn 正常停止 worker、开发服务器 Ctrl+C) 先写完队列中的数据
+- 返回 202 时数据尚未写入，直到写入前 /api/monitor/latest 等接口看不到这些数据；
+  进程被强制杀死时队列中的数据会丢失
+"""
+import atexit
+import threading
+import time
+from collections import deque
+from models import db
+import metrics
+from ingest import existing_point_ids, commit_rows
+
+# 写入失败时的重试次数和重试间隔 (秒)
+FLUSH_RETRIES = 3
+RETRY_DELAY = 0.5
+
+# 进程退出时等待队列写完的最长时间 (秒)
+DRAIN_TIMEOUT = 20.0
+
+class WriteBehindQueue:
+    """进程内的有界写入队列，由一个后台线程按批写入数据库"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._items = deque()
+        self._thread = None
+        self._app = None
+        self._stopping = False
+        self.capacity = 50000
+        self.batch_size = 500
+        self.flush_interval = 0.2
+        # 统计信息
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def start(self, app):
+        """按应用配置启动后台写入线程 (已启动时直接返回)"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._app = app
+            self.capacity = app.config['WRITE_BEHIND_QUEUE_SIZE']
+            self.batch_size = app.config['WRITE_BEHIND_BATCH_SIZE']
+            self.flush_interval = app.config['WRITE_BEHIND_FLUSH_INTERVAL_MS'] / 1000
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, rows, timeout=0.0):
+        """
+        把已校验的监测记录放入队列
+
+        参数:
+        - rows: ingest.validate_readings 返回的字典列表
+        - timeout: 队列空间不足时最多等待的秒数
+
+        返回:
+        - 是否已入队；队列已满或正在停止时返回 False，此时一条也不会入队
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._stopping and len(self._items) + len(rows) > self.capacity:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or len(rows) > self.capacity:
+                    self.rejected += len(rows)
+                    return False
+                self._cond.wait(remaining)
+
+            if self._stopping:
+                self.rejected += len(rows)
+                return False
+
+            self._items.extend(rows)
+            self.accepted += len(rows)
+            self._cond.notify_all()
+            return True
+
+    def _next_batch(self):
+        """等待并取出下一批数据，停止且队列为空时返回 None"""
+        with self._cond:
+            while not self._items and not self._stopping:
+                self._cond.wait()
+            if not self._items:
+                return None
+
+            # 从第一条数据起最多等待一个刷新间隔，攒满一批或停止时立即写入
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._items) < self.batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(self.batch_size, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            # 唤醒等待队列空间的请求
+            self._cond.notify_all()
+            return batch
+
+    def _flush(self, rows):
+        """在一个事务中写入一批数据，丢弃入队后监测点已被删除的记录"""
+        with self._app.app_context():
+            try:
+                known_points = existing_point_ids({row['monitor_point_id'] for row in rows})
+                valid_rows = [row for row in rows if row['monitor_point_id'] in known_points]
+                if valid_rows:
+                    commit_rows(valid_rows)
+            finally:
+                db.session.remove()
+        return valid_rows
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            for attempt in range(1, FLUSH_RETRIES + 1):
+                try:
+                    written = self._flush(batch)
+                    break
+                except Exception as e:
+                    print(f"后台写入监测数据时发生错误 (第{attempt}次): {str(e)}")
+                    if attempt == FLUSH_RETRIES:
+                        written = []
+                        print(f"后台写入失败，已丢弃 {len(batch)} 条监测记录")
+                    else:
+                        time.sleep(RETRY_DELAY * attempt)
+
+            with self._cond:
+                self.batches += 1
+                self.written += len(written)
+                self.dropped += len(batch) - len(written)
+                self._cond.notify_all()
+
+    def stop(self, timeout=DRAIN_TIMEOUT):
+        """停止接收新数据，等待后台线程写完队列中的数据"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+            if thread.is_alive():
+                print(f"后台写入未在 {timeout:g} 秒内完成，剩余 {len(self._items)} 条监测记录未写入")
+
+    def flush(self, timeout=DRAIN_TIMEOUT):
+        """等待当前队列中的数据全部写入 (不停止接收)，返回是否已写完"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            target = self.accepted
+            while self.written + self.dropped < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stats(self):
+        with self._cond:
+            return {
+                'queued': len(self._items),
+                'capacity': self.capacity,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'written': self.written,
+                'dropped': self.dropped,
+                'batches': self.batches
+            }
+
+# 每个工作进程一个写入队列
+writer = WriteBehindQueue()
+
+# 进程正常退出前写完队列中的数据
+atexit.register(writer.stop)
+
+def _collect_metrics():
+    stats = writer.stats()
+    return {
+        ('ingest_queue_depth', ()): stats['queued'],
+        ('ingest_queue_capacity', ()): stats['capacity'],
+        ('ingest_queue_accepted_total', ()): stats['accepted'],
+        ('ingest_queue_rejected_total', ()): stats['rejected'],
+        ('ingest_queue_written_total', ()): stats['written'],
+        ('ingest_queue_dropped_total', ()): stats['dropped']
+    }
+
+metrics.registry.register_collector(_collect_metrics)
+
+def enabled(app):
+    return app.config['INGEST_MODE'] == 'async'
+
+def enqueue(app, rows):
+    """
+    把已校验的监测记录放入本进程的写入队列 (必要时启动后台线程)
+
+    返回:
+    - 是否已入队
+    """
+    writer.start(app)
+    return writer.submit(rows, app.config['WRITE_BEHIND_ENQUEUE_TIMEOUT_MS'] / 1000)
\ No newline at end of file
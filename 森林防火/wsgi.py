@@ -0,0 +1,11 @@
+"""
+生产环境 WSGI 入口
+
+每个 worker 进程导入本模块时创建一个应用实例，不访问数据库。
+首次部署或升级代码后，先执行一次 FLASK_APP=app.py flask init-db，再启动 worker，例如:
+
+    gunicorn -w 4 -k gthread --threads 32 -b 0.0.0.0:5000 wsgi:app
+"""
+from app import create_app
+
+app = create_app()
\ No newline at end of file